@@ -1,3 +1,15 @@
 # Import and export the FastAPI app for Vercel
 # Vercel automatically detects and serves ASGI applications
+import os
+
+# Create the MongoDB client on first use instead of during startup, so cold
+# starts that only hit /health never wait for MongoDB
+os.environ.setdefault("MONGO_PREWARM", "false")
+
+from app.config.database import db
 from app.main import app
+
+# Warm serverless instances keep module state between invocations, so keep the
+# MongoDB client (and its connection pool) open instead of rebuilding it on
+# every lifespan cycle
+db.reuse_client = True
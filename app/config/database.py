@@ -1,32 +1,191 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
 from typing import Optional
+import asyncio
 import os
+import time
+
+from app.config.indexes import ensure_indexes
+from app.utils.metrics import METRICS_ENABLED, mongo_command_listener
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Track connection pool activity for the readiness probe"""
+
+    def __init__(self):
+        self.open_connections = 0
+        self.checked_out = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkout_failures = 0
+        self.pools_cleared = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.pools_cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.open_connections += 1
+        self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.open_connections -= 1
+        self.connections_closed += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+    def stats(self) -> dict:
+        return {
+            "open_connections": self.open_connections,
+            "checked_out": self.checked_out,
+            "connections_created": self.connections_created,
+            "connections_closed": self.connections_closed,
+            "checkout_failures": self.checkout_failures,
+            "pools_cleared": self.pools_cleared,
+        }
 
 
 class Database:
     client: Optional[AsyncIOMotorClient] = None
-    
-    
+    # Keep the client open across lifespan cycles (serverless invocations)
+    reuse_client: bool = False
+    pool_stats: PoolStatsListener = PoolStatsListener()
+    # Index check started by a lazily created client
+    index_task: Optional[asyncio.Task] = None
+
+
 db = Database()
 
+MONGODB_DATABASE = os.getenv("MONGODB_DATABASE", "todolist_db")
+
+# Connect, warm the pool and check indexes during startup. When false, the
+# client is created by the first request that needs the database and indexes
+# are checked in the background, so cold starts serve sooner.
+MONGO_PREWARM = os.getenv("MONGO_PREWARM", "true").lower() == "true"
+
+
+# Environment variable -> MongoClient option. Options that are not set keep
+# the driver defaults.
+POOL_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+    "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+}
+
+
+def get_client_options() -> dict:
+    """Build MongoClient pool and timeout options from the environment"""
+    options = {}
+    for env_name, option in POOL_OPTIONS.items():
+        value = os.getenv(env_name)
+        if value:
+            options[option] = int(value)
+    return options
+
 
 async def get_database():
-    """Get the MongoDB database instance"""
-    return db.client.todolist_db
+    """Get the MongoDB database instance, creating the client on first use"""
+    if db.client is None:
+        create_client()
+        db.index_task = asyncio.create_task(ensure_indexes_in_background())
+    return db.client[MONGODB_DATABASE]
 
 
-async def connect_to_mongo():
-    """Create database connection"""
+def create_client():
+    """Create the MongoDB client; connections are opened by the first command"""
     mongodb_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     # Log connection without credentials
     safe_url = mongodb_url.split('@')[-1] if '@' in mongodb_url else mongodb_url
     print(f"Connecting to MongoDB at {safe_url}")
-    db.client = AsyncIOMotorClient(mongodb_url)
+    options = get_client_options()
+    event_listeners = [db.pool_stats]
+    if METRICS_ENABLED:
+        event_listeners.append(mongo_command_listener)
+    db.client = AsyncIOMotorClient(
+        mongodb_url,
+        event_listeners=event_listeners,
+        **options
+    )
     print("Connected to MongoDB successfully")
 
 
+async def ensure_indexes_in_background():
+    """Check indexes for a client created on first use"""
+    try:
+        await ensure_indexes(db.client[MONGODB_DATABASE])
+    except PyMongoError as e:
+        print(f"MongoDB index check failed: {e}")
+
+
+async def connect_to_mongo():
+    """Create database connection, unless MONGO_PREWARM defers it to first use"""
+    if db.client is not None:
+        # Reuse the client from a previous invocation
+        return
+    if not MONGO_PREWARM:
+        return
+
+    create_client()
+    try:
+        await warm_up_pool(get_client_options().get("minPoolSize", 0))
+        await ensure_indexes(db.client[MONGODB_DATABASE])
+    except PyMongoError as e:
+        print(f"MongoDB warmup failed: {e}")
+
+
+async def warm_up_pool(min_pool_size: int):
+    """Select a server and open ``min_pool_size`` connections ahead of traffic"""
+    started = time.perf_counter()
+    await db.client.admin.command("ping")
+    if min_pool_size > 1:
+        # Concurrent commands each check out their own connection
+        await asyncio.gather(*(
+            db.client.admin.command("ping") for _ in range(min_pool_size - 1)
+        ))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"MongoDB warmup completed in {elapsed_ms:.1f}ms")
+
+
+async def ping_mongo() -> float:
+    """Ping the MongoDB server and return the round trip time in milliseconds"""
+    await get_database()
+    started = time.perf_counter()
+    await db.client.admin.command("ping")
+    return (time.perf_counter() - started) * 1000
+
+
 async def close_mongo_connection():
     """Close database connection"""
-    if db.client:
+    if db.client and not db.reuse_client:
+        if db.index_task is not None:
+            db.index_task.cancel()
+            db.index_task = None
         db.client.close()
+        db.client = None
         print("MongoDB connection closed")
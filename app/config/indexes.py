@@ -0,0 +1,134 @@
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+import os
+
+
+# Seconds a finished background job stays queryable before MongoDB removes it
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "86400"))
+
+
+# Indexes declared for each collection. Names are fixed so that startup can
+# detect drift between the declaration and what exists in the database.
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+    ],
+    "todos": [
+        # Every todo query is scoped to its owner, so each index leads with
+        # userId and per-user query cost does not grow with other users' data.
+        # Keyset pagination on (createdAt, _id)
+        IndexModel(
+            [("userId", ASCENDING), ("createdAt", ASCENDING), ("_id", ASCENDING)],
+            name="userId_createdAt_id",
+        ),
+        # Completion filter combined with keyset pagination; also serves the
+        # per-user completion counts
+        IndexModel(
+            [("userId", ASCENDING), ("completed", ASCENDING),
+             ("createdAt", ASCENDING), ("_id", ASCENDING)],
+            name="userId_completed_createdAt_id",
+        ),
+        # Anchored, case-sensitive prefix search on title
+        IndexModel([("userId", ASCENDING), ("title", ASCENDING)], name="userId_title"),
+        # Full-text search with relevance ranking; $text queries must match
+        # userId exactly to use the prefix
+        IndexModel(
+            [("userId", ASCENDING), ("title", TEXT), ("description", TEXT)],
+            name="userId_title_description_text",
+            weights={"title": 3, "description": 1},
+        ),
+    ],
+    # Refresh tokens are looked up by their hash, stored as _id
+    "refresh_tokens": [
+        # Revoke all of a user's sessions
+        IndexModel([("userId", ASCENDING)], name="userId"),
+        # Revoke every token descended from one login
+        IndexModel([("family", ASCENDING)], name="family"),
+        # Remove tokens once they expire
+        IndexModel([("expiresAt", ASCENDING)], name="expiresAt_ttl", expireAfterSeconds=0),
+    ],
+    "jobs": [
+        # A user's most recent jobs
+        IndexModel([("userId", ASCENDING), ("createdAt", ASCENDING)], name="userId_createdAt"),
+        # Remove finished jobs; running jobs have no finishedAt and are kept
+        IndexModel(
+            [("finishedAt", ASCENDING)],
+            name="finishedAt_ttl",
+            expireAfterSeconds=JOB_RETENTION_SECONDS,
+        ),
+    ],
+}
+
+
+async def ensure_indexes(database):
+    """Create the declared indexes (no-op if they already exist) and report drift"""
+    for collection_name, models in INDEXES.items():
+        for model in models:
+            # One at a time, so a conflicting index does not block the others
+            try:
+                await database[collection_name].create_indexes([model])
+            except OperationFailure as e:
+                print(f"Failed to create index {collection_name}.{model.document['name']}: {e}")
+
+    drift = await verify_indexes(database)
+    for message in drift:
+        print(f"Index drift: {message}")
+    if not drift:
+        print("MongoDB indexes verified")
+
+
+async def verify_indexes(database) -> list:
+    """Compare declared indexes with the database and describe any differences"""
+    drift = []
+    for collection_name, models in INDEXES.items():
+        existing = await database[collection_name].index_information()
+
+        for model in models:
+            spec = model.document
+            name = spec["name"]
+            actual = existing.get(name)
+            if actual is None:
+                drift.append(f"{collection_name}.{name} is missing")
+                continue
+
+            declared_key = list(spec["key"].items())
+            if TEXT in spec["key"].values():
+                # Text indexes are stored under internal _fts/_ftsx keys, so
+                # compare their other fields plus the weighted fields instead
+                declared_key = [
+                    (field, direction) for field, direction in declared_key if direction != TEXT
+                ] + sorted(spec.get("weights") or {
+                    field: 1 for field, direction in declared_key if direction == TEXT
+                })
+                actual_key = [
+                    (field, int(direction)) for field, direction in actual["key"]
+                    if field not in ("_fts", "_ftsx") and direction != TEXT
+                ] + sorted(actual.get("weights", {}))
+            else:
+                actual_key = [
+                    (field, direction if isinstance(direction, str) else int(direction))
+                    for field, direction in actual["key"]
+                ]
+            if actual_key != declared_key:
+                drift.append(
+                    f"{collection_name}.{name} has key {actual_key}, expected {declared_key}"
+                )
+            if actual.get("expireAfterSeconds") != spec.get("expireAfterSeconds"):
+                drift.append(
+                    f"{collection_name}.{name} has expireAfterSeconds="
+                    f"{actual.get('expireAfterSeconds')}, "
+                    f"expected {spec.get('expireAfterSeconds')}"
+                )
+            if actual.get("unique", False) != spec.get("unique", False):
+                drift.append(
+                    f"{collection_name}.{name} has unique={actual.get('unique', False)}, "
+                    f"expected unique={spec.get('unique', False)}"
+                )
+
+        declared_names = {model.document["name"] for model in models}
+        for name in existing:
+            if name != "_id_" and name not in declared_names:
+                drift.append(f"{collection_name}.{name} is not declared")
+
+    return drift
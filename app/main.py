@@ -1,9 +1,25 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
+from pymongo.errors import PyMongoError
 
-from app.config.database import connect_to_mongo, close_mongo_connection
-from app.routers import todo, auth
+from app.config.database import (
+    db,
+    connect_to_mongo,
+    close_mongo_connection,
+    get_client_options,
+    ping_mongo
+)
+from app.routers import todo, auth, jobs
+from app.utils.events import event_bus
+from app.utils.cache import todo_cache
+from app.utils.auth import password_hash_metrics, user_cache
+from app.utils.compression import COMPRESSION_ENABLED, CompressionMiddleware
+from app.utils.metrics import METRICS_ENABLED, MetricsMiddleware, registry
+from app.utils.ratelimit import RateLimitMiddleware, rate_limiter
+from app.utils.writebehind import toggle_queue
+from app.utils.jobs import job_runner
 
 
 @asynccontextmanager
@@ -11,8 +27,15 @@ async def lifespan(app: FastAPI):
     """Manage application lifespan events"""
     # Startup
     await connect_to_mongo()
+    await event_bus.start()
+    await toggle_queue.start()
     yield
     # Shutdown
+    # Interrupt running jobs, which may still publish events
+    await job_runner.stop()
+    # Drain queued toggles while the event bus and MongoDB are still up
+    await toggle_queue.stop()
+    await event_bus.stop()
     await close_mongo_connection()
 
 
@@ -23,6 +46,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rate limiting and load shedding, inside CORS so rejections carry CORS
+# headers. Probes and the long-lived event stream do not count towards the
+# in-flight cap.
+app.add_middleware(
+    RateLimitMiddleware,
+    routes=app.routes,
+    exempt_paths=("/health", "/health/ready", "/api/todos/events"),
+)
+
 # Configure CORS
 # NOTE: Using allow_origins=["*"] for development to avoid CORS issues from local frontend.
 # For production, replace with a restricted list of allowed origins.
@@ -36,11 +68,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "Retry-After", "Location"],
 )
 
+if COMPRESSION_ENABLED:
+    # Inside metrics, so recorded response sizes are the bytes sent
+    app.add_middleware(CompressionMiddleware)
+
+if METRICS_ENABLED:
+    # Outermost, so latency includes every other middleware
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(todo.router)
+app.include_router(jobs.router)
 
 
 @app.get("/")
@@ -59,6 +101,59 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: pings MongoDB and reports connection pool statistics"""
+    pool = {**get_client_options(), **db.pool_stats.stats()}
+    try:
+        ping_ms = await ping_mongo()
+    except PyMongoError as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "mongo": {"error": str(e)}, "pool": pool}
+        )
+
+    return {
+        "status": "ready",
+        "mongo": {"ping_ms": round(ping_ms, 2)},
+        "pool": pool
+    }
+
+
+def collect_runtime_stats() -> dict:
+    """Report connection pool, cache, event feed and hashing statistics as gauges"""
+    gauges = {}
+    for prefix, stats in (
+        ("mongodb_pool", db.pool_stats.stats()),
+        ("todo_cache", todo_cache.stats()),
+        ("user_cache", user_cache.stats()),
+        ("password_hash", password_hash_metrics),
+        ("todo_events", event_bus.stats()),
+        ("rate_limit", rate_limiter.stats()),
+        ("write_behind", toggle_queue.stats()),
+        ("jobs", job_runner.stats()),
+    ):
+        for name, value in stats.items():
+            # Nested counters, such as per-operation hash timings
+            values = value.items() if isinstance(value, dict) else [(None, value)]
+            for suffix, value in values:
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges["_".join(filter(None, (prefix, name, suffix)))] = value
+    return gauges
+
+
+if METRICS_ENABLED:
+    registry.add_collector(collect_runtime_stats)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics in text exposition format"""
+        return Response(
+            content=registry.render(),
+            media_type="text/plain; version=0.0.4"
+        )
+
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8080)
+    from app.server import main
+    main()
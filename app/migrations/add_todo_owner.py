@@ -0,0 +1,100 @@
+"""
+Assign an owner to todos created before todos were scoped to users.
+
+Once per-user scoping is deployed, todos without a userId are not visible to
+anyone. This migration assigns them to one existing user in _id order, one
+batch at a time, so it never holds a long-running write or floods the oplog.
+It then drops the indexes that predate per-user scoping and creates the
+declared ones. It can be interrupted and re-run; only todos still missing a
+userId are updated.
+
+Usage:
+    MONGODB_URL=mongodb://localhost:27017 python -m app.migrations.add_todo_owner \\
+        --owner-email admin@example.com
+    python -m app.migrations.add_todo_owner --owner-email admin@example.com --dry-run
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config.database import MONGODB_DATABASE
+from app.config.indexes import ensure_indexes
+
+
+# Todo indexes that did not lead with userId
+LEGACY_INDEXES = ["createdAt_id", "completed_createdAt_id", "title", "title_description_text"]
+
+
+async def backfill_owner(todos, owner_id, batch_size: int, pause: float) -> int:
+    """Set userId on every todo missing one and return the number updated"""
+    updated = 0
+    last_id = None
+    while True:
+        query = {"userId": {"$exists": False}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = await todos.find(query, {"_id": 1}).sort("_id", 1).limit(
+            batch_size
+        ).to_list(length=batch_size)
+        if not batch:
+            return updated
+
+        ids = [todo["_id"] for todo in batch]
+        result = await todos.update_many(
+            {"_id": {"$in": ids}, "userId": {"$exists": False}},
+            {"$set": {"userId": owner_id}}
+        )
+        updated += result.modified_count
+        last_id = ids[-1]
+        print(f"Updated {updated} todos (last _id {last_id})")
+        if pause:
+            await asyncio.sleep(pause)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--owner-email", required=True,
+                        help="Existing user who becomes the owner of unowned todos")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause-ms", type=float, default=0,
+                        help="Pause between batches to limit the load on the server")
+    parser.add_argument("--keep-legacy-indexes", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    database = client[MONGODB_DATABASE]
+    try:
+        owner = await database.users.find_one({"email": args.owner_email}, {"_id": 1})
+        if owner is None:
+            raise SystemExit(f"No user with email {args.owner_email}")
+
+        unowned = await database.todos.count_documents({"userId": {"$exists": False}})
+        print(f"{unowned} todos without an owner will be assigned to {args.owner_email}")
+        if args.dry_run:
+            return
+
+        started = time.perf_counter()
+        updated = await backfill_owner(
+            database.todos, owner["_id"], args.batch_size, args.pause_ms / 1000
+        )
+        print(f"Backfilled {updated} todos in {time.perf_counter() - started:.1f}s")
+
+        if not args.keep_legacy_indexes:
+            existing = await database.todos.index_information()
+            for name in LEGACY_INDEXES:
+                if name in existing:
+                    await database.todos.drop_index(name)
+                    print(f"Dropped index todos.{name}")
+        # Only one text index is allowed per collection, so the new one can
+        # only be created once the legacy one is gone
+        await ensure_indexes(database)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
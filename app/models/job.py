@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    """Model for background job API responses"""
+    id: str
+    type: str
+    status: Literal["pending", "running", "completed", "failed", "interrupted"]
+    params: Dict[str, Any] = {}
+    processed: int
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    createdAt: datetime
+    updatedAt: datetime
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": "6561a2f0c1d2e3f4a5b6c7d8",
+                "type": "delete_todos",
+                "status": "running",
+                "params": {"mode": "batched"},
+                "processed": 4000,
+                "total": 25000,
+                "result": None,
+                "error": None,
+                "createdAt": "2025-11-24T10:00:00",
+                "updatedAt": "2025-11-24T10:00:03",
+                "startedAt": "2025-11-24T10:00:00",
+                "finishedAt": None
+            }
+        }
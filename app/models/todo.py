@@ -1,8 +1,15 @@
 from datetime import datetime
-from typing import Optional, Any
+from typing import Optional, Any, List, Literal, Union, Annotated
 from pydantic import BaseModel, Field, GetCoreSchemaHandler
 from pydantic_core import core_schema
 from bson import ObjectId
+import os
+
+
+# Maximum number of operations accepted by a single bulk request. Enforced
+# while the body is validated, so an oversized batch is rejected before its
+# operations are parsed into models.
+BULK_MAX_OPERATIONS = int(os.getenv("BULK_MAX_OPERATIONS", "500"))
 
 
 class PyObjectId(ObjectId):
@@ -54,6 +61,11 @@ class TodoUpdate(BaseModel):
     completed: Optional[bool] = None
 
 
+class TodoToggle(BaseModel):
+    """Model for setting only the completion status of a Todo"""
+    completed: bool
+
+
 class TodoInDB(TodoBase):
     """Model representing a Todo in the database"""
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
@@ -93,3 +105,110 @@ class TodoResponse(BaseModel):
                 "updatedAt": "2025-11-24T10:00:00"
             }
         }
+
+
+class BulkCreateOperation(BaseModel):
+    """Bulk operation that creates a new Todo"""
+    op: Literal["create"]
+    data: TodoCreate
+
+
+class BulkUpdateOperation(BaseModel):
+    """Bulk operation that updates an existing Todo"""
+    op: Literal["update"]
+    id: str
+    data: TodoUpdate
+
+
+class BulkDeleteOperation(BaseModel):
+    """Bulk operation that deletes a Todo"""
+    op: Literal["delete"]
+    id: str
+
+
+BulkOperation = Annotated[
+    Union[BulkCreateOperation, BulkUpdateOperation, BulkDeleteOperation],
+    Field(discriminator="op")
+]
+
+
+class BulkRequest(BaseModel):
+    """Model for a batch of mixed create, update and delete operations"""
+    operations: List[BulkOperation] = Field(..., min_length=1, max_length=BULK_MAX_OPERATIONS)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "operations": [
+                    {"op": "create", "data": {"title": "Learn FastAPI"}},
+                    {"op": "update", "id": "507f1f77bcf86cd799439011", "data": {"completed": True}},
+                    {"op": "delete", "id": "507f1f77bcf86cd799439012"}
+                ]
+            }
+        }
+
+
+class BulkItemResult(BaseModel):
+    """Outcome of a single operation in a bulk request"""
+    index: int
+    op: str
+    id: Optional[str] = None
+    status: int
+    error: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    """Model for bulk operation API responses"""
+    created: int
+    updated: int
+    deleted: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+class ImportRowError(BaseModel):
+    """A row of an import that was not inserted"""
+    line: int
+    error: str
+
+
+class ImportResponse(BaseModel):
+    """Summary of a todo import"""
+    format: Literal["ndjson", "csv"]
+    processed: int
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+    error: Optional[str] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "format": "csv",
+                "processed": 3,
+                "imported": 2,
+                "failed": 1,
+                "errors": [
+                    {"line": 3, "error": "title: String should have at least 1 character"}
+                ],
+                "error": None
+            }
+        }
+
+
+class TodoStatsResponse(BaseModel):
+    """Model for todo statistics API responses"""
+    total: int
+    completed: int
+    active: int
+    reconciledAt: Optional[datetime] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "total": 42,
+                "completed": 10,
+                "active": 32,
+                "reconciledAt": "2025-11-24T10:00:00"
+            }
+        }
@@ -94,6 +94,14 @@ class Token(BaseModel):
     """Model for JWT token response"""
     access_token: str
     token_type: str = "bearer"
+    # Seconds until the access token expires
+    expires_in: Optional[int] = None
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    """Model for exchanging or revoking a refresh token"""
+    refresh_token: str = Field(..., min_length=1, max_length=200)
 
 
 class TokenData(BaseModel):
@@ -1,13 +1,20 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from datetime import datetime, timezone
+from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
-from app.models.user import UserCreate, UserLogin, UserResponse, Token
+from app.models.user import UserCreate, UserLogin, UserResponse, Token, RefreshRequest
 from app.utils.auth import (
-    get_password_hash, 
-    verify_password, 
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token, 
     get_current_user,
+    issue_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
+    revoke_user_refresh_tokens,
+    invalidate_cached_user,
     user_helper
 )
 from app.config.database import get_database
@@ -29,27 +36,14 @@ async def register(user: UserCreate):
     """
     db = await get_database()
     
-    # Check if user with email already exists
-    existing_user = await db.users.find_one({"email": user.email})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Check if username already exists
-    existing_username = await db.users.find_one({"username": user.username})
-    if existing_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
-        )
-    
     # Hash the password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     
     # Create user document
-    now = datetime.now(timezone.utc)
+    # Naive UTC truncated to milliseconds, as MongoDB returns it, so the
+    # response matches what /me and login return later
+    now = datetime.utcnow()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
     user_dict = {
         "email": user.email,
         "username": user.username,
@@ -58,11 +52,27 @@ async def register(user: UserCreate):
         "updatedAt": now
     }
     
-    # Insert user into database
-    result = await db.users.insert_one(user_dict)
-    created_user = await db.users.find_one({"_id": result.inserted_id})
+    # Insert user into database; uniqueness of email and username is
+    # enforced by the unique indexes on the users collection
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError as e:
+        key_pattern = (e.details or {}).get("keyPattern", {})
+        if "username" in key_pattern:
+            detail = "Username already taken"
+        else:
+            detail = "Email already registered"
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
     
-    return user_helper(created_user)
+    # A lookup cached for an earlier account with this email would point at
+    # the old _id
+    invalidate_cached_user(user.email)
+
+    # insert_one sets the generated _id on user_dict
+    return user_helper(user_dict)
 
 
 @router.post("/login", response_model=Token)
@@ -72,7 +82,8 @@ async def login(user_credentials: UserLogin):
     - **email**: User email address
     - **password**: User password
     
-    Returns a JWT access token for authentication
+    Returns a JWT access token for authentication and a refresh token for
+    obtaining new access tokens without the password
     """
     db = await get_database()
     
@@ -87,7 +98,7 @@ async def login(user_credentials: UserLogin):
         )
     
     # Verify password
-    if not verify_password(user_credentials.password, user["hashed_password"]):
+    if not await verify_password_async(user_credentials.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -96,8 +107,67 @@ async def login(user_credentials: UserLogin):
     
     # Create access token
     access_token = create_access_token(data={"sub": user["email"]})
+    refresh_token = await issue_refresh_token(db, user["_id"], user["email"])
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "refresh_token": refresh_token
+    }
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest):
+    """
+    Exchange a refresh token for a new access token and refresh token
+    - **refresh_token**: Refresh token from login or the previous refresh
+
+    The refresh token can only be used once. Reusing a replaced token
+    revokes the whole session.
+    """
+    db = await get_database()
+    rotated = await rotate_refresh_token(db, request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    refresh_token, email = rotated
+    return {
+        "access_token": create_access_token(data={"sub": email}),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "refresh_token": refresh_token
+    }
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: RefreshRequest):
+    """
+    Revoke the session a refresh token belongs to
+    - **refresh_token**: Refresh token of the session
+
+    Access tokens already issued stay valid until they expire.
+    """
+    db = await get_database()
+    await revoke_refresh_token(db, request.refresh_token)
+    return None
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(current_user: UserResponse = Depends(get_current_user)):
+    """
+    Revoke every refresh token of the current user, signing out all sessions
+
+    Access tokens already issued stay valid until they expire.
+    """
+    db = await get_database()
+    await revoke_user_refresh_tokens(db, ObjectId(current_user.id))
+    invalidate_cached_user(current_user.email)
+    return None
 
 
 @router.get("/me", response_model=UserResponse)
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, HTTPException, status, Query, Depends
+from typing import List
+from bson import ObjectId
+
+from app.models.job import JobResponse
+from app.models.user import UserResponse
+from app.utils.auth import get_current_user
+from app.utils.jobs import job_runner
+
+
+router = APIRouter(
+    prefix="/api/jobs",
+    tags=["jobs"]
+)
+
+
+def job_helper(job) -> dict:
+    """Convert MongoDB job document to dict"""
+    return {
+        "id": str(job["_id"]),
+        "type": job["type"],
+        "status": job["status"],
+        "params": job.get("params") or {},
+        "processed": job.get("processed", 0),
+        "total": job.get("total"),
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "createdAt": job["createdAt"],
+        "updatedAt": job["updatedAt"],
+        "startedAt": job.get("startedAt"),
+        "finishedAt": job.get("finishedAt")
+    }
+
+
+@router.get("", response_model=List[JobResponse])
+async def get_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Get the current user's most recent background jobs, newest first
+    - **limit**: Maximum number of jobs to return
+    """
+    jobs = await job_runner.list_jobs(current_user.id, limit)
+    return [job_helper(job) for job in jobs]
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Get the status and progress of a background job
+    - **job_id**: The ID returned when the job was started
+    """
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID format"
+        )
+
+    job = await job_runner.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with id {job_id} not found"
+        )
+
+    return job_helper(job)
@@ -1,10 +1,114 @@
-from fastapi import APIRouter, HTTPException, status, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Query, Request, Response, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, List, Literal, Optional, Tuple, Union
 from datetime import datetime
-from bson import ObjectId
+from bson import ObjectId, SON
+from pymongo import InsertOne, UpdateOne, DeleteOne, ReturnDocument
+from pymongo.errors import BulkWriteError
+import asyncio
+import json
+import os
+import re
+import tempfile
 
-from app.models.todo import TodoCreate, TodoUpdate, TodoResponse
+from app.models.todo import (
+    TodoCreate,
+    TodoUpdate,
+    TodoToggle,
+    TodoResponse,
+    BulkRequest,
+    BulkResponse,
+    ImportResponse,
+    TodoStatsResponse
+)
+from app.models.job import JobResponse
+from app.models.user import UserResponse
 from app.config.database import get_database
+from app.config.indexes import ensure_indexes
+from app.utils.auth import get_current_user
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    RELEVANCE_SORT,
+    InvalidCursorError,
+    keyset_filter,
+    keyset_sort,
+    encode_cursor
+)
+from app.utils.serialization import dumps, encode_todo, decode_todo
+from app.utils.cache import todo_cache
+from app.utils.stats import todo_stats
+from app.utils.events import (
+    DROPPED_TODOS_PREFIX,
+    event_bus,
+    TooManySubscribersError,
+    TooManyUserSubscribersError,
+)
+from app.utils.writebehind import toggle_queue
+from app.utils.jobs import JobProgress, TooManyJobsError, job_runner
+from app.utils.imports import ImportFormatError, parse_todos
+from app.routers.jobs import job_helper
+from app.utils.etag import (
+    todo_collection_version,
+    todo_etag,
+    etag_matches,
+    cache_headers
+)
+
+
+# Number of documents fetched per MongoDB batch when streaming exports
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+# Return list responses as pre-serialized JSON, skipping response_model
+# re-validation (todo_helper already produces the TodoResponse shape).
+# When disabled, pages are decoded and go through response_model again.
+FAST_RESPONSES = os.getenv("FAST_RESPONSES", "true").lower() == "true"
+
+# Seconds between keep-alive comments on idle event streams
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+
+# Conditional GET support for list endpoints. The version token is kept per
+# process, so disable this when several workers serve the same clients.
+LIST_ETAGS = os.getenv("LIST_ETAGS", "true").lower() == "true"
+
+# Todos removed per batch by delete-all jobs, and the pause between batches
+# that keeps the oplog and I/O burst from degrading other queries
+DELETE_BATCH_SIZE = int(os.getenv("DELETE_BATCH_SIZE", "1000"))
+DELETE_BATCH_PAUSE_MS = float(os.getenv("DELETE_BATCH_PAUSE_MS", "100"))
+
+# Allow delete-all to drop and recreate the todos collection when the user
+# owns every todo in it (single-user deployments)
+DELETE_ALLOW_DROP = os.getenv("DELETE_ALLOW_DROP", "false").lower() == "true"
+
+# Rows inserted per insert_many call by imports, and the number of those
+# calls a single import keeps in flight
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+IMPORT_MAX_CONCURRENT_BATCHES = int(os.getenv("IMPORT_MAX_CONCURRENT_BATCHES", "4"))
+
+# Imports whose Content-Length is at most this many bytes run during the
+# request; larger uploads, and uploads without a Content-Length, are stored
+# in a temporary file and imported by a background job
+IMPORT_INLINE_MAX_BYTES = int(os.getenv("IMPORT_INLINE_MAX_BYTES", str(1024 * 1024)))
+
+# Largest accepted import upload
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(100 * 1024 * 1024)))
+
+# Row errors listed in an import summary; further errors are only counted
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+
+# Bytes read from a stored upload at a time by import jobs
+IMPORT_READ_SIZE = 64 * 1024
+
+# Fields needed to serialize a todo
+TODO_PROJECTION = {
+    "title": 1,
+    "description": 1,
+    "completed": 1,
+    "createdAt": 1,
+    "updatedAt": 1
+}
 
 
 router = APIRouter(
@@ -25,49 +129,681 @@ def todo_helper(todo) -> dict:
     }
 
 
+async def find_todo_page(
+    db,
+    query: dict,
+    request: Request,
+    response: Response,
+    limit: int,
+    sort: str,
+    cursor: Optional[str],
+    headers: dict,
+    user_id: str
+) -> Union[Response, List[dict]]:
+    """
+    Fetch one page of todos using keyset pagination on (sort field, _id)
+
+    The cursor for the following page is returned in the X-Next-Cursor
+    response header; the header is omitted on the last page. Only the fields
+    in TODO_PROJECTION are fetched. ``headers`` are added to the response.
+
+    Pages are served through the todo cache, keyed by the request URL within
+    the user's current list generation, which every write by the user bumps.
+    """
+    try:
+        page_filter = keyset_filter(cursor, sort)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    async def load_page() -> bytes:
+        # Fetch one extra document to find out whether another page exists
+        if sort == RELEVANCE_SORT:
+            # Text search: rank by textScore, which is only available in an
+            # aggregation once the $text match has run
+            pipeline = [
+                {"$match": query},
+                {"$project": {**TODO_PROJECTION, "score": {"$meta": "textScore"}}},
+            ]
+            if page_filter:
+                pipeline.append({"$match": page_filter})
+            pipeline.append({"$sort": SON(keyset_sort(sort))})
+            pipeline.append({"$limit": limit + 1})
+            documents = await db.todos.aggregate(pipeline).to_list(length=limit + 1)
+        else:
+            documents = await db.todos.find({**query, **page_filter}, TODO_PROJECTION).sort(
+                keyset_sort(sort)
+            ).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = b""
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = encode_cursor(documents[-1], sort).encode()
+
+        # Cached pages are stored as "<next cursor>\n<JSON body>"
+        return next_cursor + b"\n" + dumps([todo_helper(todo) for todo in documents])
+
+    generation = await todo_cache.generation(f"list:{user_id}")
+    cache_key = f"list:{user_id}:{generation}:{request.url.path}?{request.query_params}"
+    next_cursor, body = (await todo_cache.get_or_load(cache_key, load_page)).split(b"\n", 1)
+
+    headers = dict(headers)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor.decode()
+
+    if FAST_RESPONSES:
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    response.headers.update(headers)
+    return json.loads(body)
+
+
+async def notify_todo_change(
+    event_type: str,
+    user_id: str,
+    todo_ids: Optional[List[str]] = None
+):
+    """
+    Propagate a successful write to the list ETag version, the read cache and
+    the event feed
+    - **event_type**: `created`, `updated`, `deleted`, `cleared` or `bulk`
+    - **user_id**: Owner of the affected todos
+    - **todo_ids**: IDs of the affected todos
+    """
+    todo_ids = todo_ids or []
+    todo_collection_version.bump()
+
+    if event_type == "cleared":
+        await todo_cache.bump(f"list:{user_id}", f"item:{user_id}")
+    else:
+        await todo_cache.bump(f"list:{user_id}")
+        if event_type != "created":
+            # Each todo has its own generation; bumping it (rather than
+            # deleting the entry) also discards a read that was in flight
+            await todo_cache.bump(*(f"item:{user_id}:{todo_id}" for todo_id in todo_ids))
+
+    if event_type == "bulk":
+        # One event for the whole batch keeps subscriber queues from overflowing
+        event_bus.publish(event_type, user_id=user_id, ids=todo_ids)
+    else:
+        event_bus.publish(event_type, todo_ids[0] if todo_ids else None, user_id)
+
+
+async def notify_toggles_written(written: List[tuple]):
+    """Propagate a write-behind flush of (todo ID, user ID) completion toggles"""
+    todo_ids_by_user = {}
+    for todo_id, user_id in written:
+        todo_ids_by_user.setdefault(user_id, []).append(todo_id)
+    for user_id, todo_ids in todo_ids_by_user.items():
+        # The previous completion states are unknown, so recount on the next read
+        todo_stats.invalidate(user_id)
+        await notify_todo_change("bulk", user_id, todo_ids)
+
+
+toggle_queue.on_flush = notify_toggles_written
+
+
+def check_list_etag(request: Request, user_id: str) -> Union[Response, dict]:
+    """
+    Evaluate If-None-Match for a list request
+
+    List ETags combine the collection version, which every write bumps, with
+    the user and the query string. Returns a 304 response when the client's
+    copy is still current, otherwise the cache headers to send with the full
+    response.
+    """
+    if not LIST_ETAGS:
+        return {}
+    etag = todo_collection_version.etag(user_id, request.url.path, str(request.query_params))
+    headers = cache_headers(etag, todo_collection_version.last_modified)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return headers
+
+
 @router.get("", response_model=List[TodoResponse])
-async def get_todos(completed: Optional[bool] = Query(None)):
+async def get_todos(
+    request: Request,
+    response: Response,
+    completed: Optional[bool] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    sort: Literal["createdAt", "-createdAt"] = Query("createdAt"),
+    cursor: Optional[str] = Query(None),
+    current_user: UserResponse = Depends(get_current_user)
+):
     """
-    Get all todos with optional filtering by completion status
+    Get the current user's todos with optional filtering by completion status
     - **completed**: Optional filter (true for completed, false for active)
+    - **limit**: Maximum number of todos to return (default: 100, max: 1000)
+    - **sort**: `createdAt` (oldest first) or `-createdAt` (newest first)
+    - **cursor**: Value of the X-Next-Cursor header from the previous page
+
+    Supports conditional requests: send the ETag from a previous response in
+    If-None-Match to get 304 Not Modified while no todo has changed.
     """
+    # Make queued completion toggles visible first
+    await toggle_queue.flush_pending()
+    
+    headers = check_list_etag(request, current_user.id)
+    if isinstance(headers, Response):
+        return headers
+    
     db = await get_database()
     
     # Build query filter
-    query = {}
+    query = {"userId": ObjectId(current_user.id)}
     if completed is not None:
         query["completed"] = completed
     
-    todos = []
-    async for todo in db.todos.find(query):
-        todos.append(todo_helper(todo))
-    
-    return todos
+    return await find_todo_page(
+        db, query, request, response, limit, sort, cursor, headers, current_user.id
+    )
 
 
 @router.get("/search", response_model=List[TodoResponse])
-async def search_todos(title: str = Query(..., min_length=1)):
+async def search_todos(
+    request: Request,
+    response: Response,
+    title: str = Query(..., min_length=1, max_length=200),
+    mode: Literal["text", "prefix"] = Query("text"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    sort: Literal["createdAt", "-createdAt"] = Query("createdAt"),
+    cursor: Optional[str] = Query(None),
+    current_user: UserResponse = Depends(get_current_user)
+):
     """
-    Search todos by title using case-insensitive regex
+    Search the current user's todos by title and description
     - **title**: Search query string
+    - **mode**: `text` (full-text search on title and description, ranked by
+      relevance) or `prefix` (case-sensitive title prefix match)
+    - **limit**: Maximum number of todos to return (default: 100, max: 1000)
+    - **sort**: Ordering for prefix mode, `createdAt` (oldest first) or
+      `-createdAt` (newest first); text mode is always ordered by relevance
+    - **cursor**: Value of the X-Next-Cursor header from the previous page
+
+    Supports conditional requests with If-None-Match, like GET /api/todos.
     """
-    db = await get_database()
+    # Make queued completion toggles visible first
+    await toggle_queue.flush_pending()
+    
+    headers = check_list_etag(request, current_user.id)
+    if isinstance(headers, Response):
+        return headers
     
-    # Case-insensitive search using regex
-    query = {"title": {"$regex": title, "$options": "i"}}
+    db = await get_database()
     
-    todos = []
-    async for todo in db.todos.find(query):
-        todos.append(todo_helper(todo))
+    user_id = ObjectId(current_user.id)
+    if mode == "text":
+        # Full-text search backed by the (userId, title/description) text index
+        query = {"userId": user_id, "$text": {"$search": title}}
+        sort = RELEVANCE_SORT
+    else:
+        # Anchored, escaped prefix match that can use the (userId, title) index
+        query = {"userId": user_id, "title": {"$regex": f"^{re.escape(title)}"}}
     
-    return todos
+    return await find_todo_page(
+        db, query, request, response, limit, sort, cursor, headers, current_user.id
+    )
+
+
+@router.get("/export")
+async def export_todos(
+    format: Literal["ndjson"] = Query("ndjson"),
+    completed: Optional[bool] = Query(None),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Stream all of the current user's todos as newline-delimited JSON
+    - **format**: Export format (currently only `ndjson`)
+    - **completed**: Optional filter (true for completed, false for active)
+
+    Documents are read from MongoDB in batches and written to the client as
+    they arrive, so memory use does not grow with the collection size.
+    """
+    await toggle_queue.flush_pending()
+    db = await get_database()
+
+    query = {"userId": ObjectId(current_user.id)}
+    if completed is not None:
+        query["completed"] = completed
+
+    async def generate():
+        cursor = db.todos.find(query, TODO_PROJECTION).sort("_id", 1).batch_size(
+            EXPORT_BATCH_SIZE
+        )
+        chunk = []
+        async for todo in cursor:
+            chunk.append(dumps(todo_helper(todo)) + b"\n")
+            if len(chunk) >= EXPORT_BATCH_SIZE:
+                yield b"".join(chunk)
+                chunk = []
+        if chunk:
+            yield b"".join(chunk)
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="todos.ndjson"'}
+    )
+
+
+@router.get("/events")
+async def stream_todo_events(
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Stream changes to the current user's todos as Server-Sent Events
+
+    Each create, update or delete is sent as a `todo` event whose data is a
+    JSON object with `type` (`created`, `updated`, `deleted`, `cleared` or
+    `bulk`) and the affected `id`. A client that falls too far behind gets a
+    `resync` event and the stream is closed; it should reload the list and
+    reconnect.
+    """
+    try:
+        subscription = event_bus.subscribe(current_user.id)
+    except TooManyUserSubscribersError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    except TooManySubscribersError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+
+    async def generate():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=EVENT_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if subscription.overflowed:
+                        yield b"event: resync\ndata: {}\n\n"
+                        return
+                    if await request.is_disconnected():
+                        return
+                    yield b": keep-alive\n\n"
+                    continue
+
+                yield b"id: %d\nevent: todo\ndata: %s\n\n" % (event["seq"], dumps(event))
+                if subscription.overflowed and subscription.queue.empty():
+                    yield b"event: resync\ndata: {}\n\n"
+                    return
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stats", response_model=TodoStatsResponse)
+async def get_todo_stats(
+    exact: bool = Query(False),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Get total, completed and active counts of the current user's todos
+    - **exact**: Recount from the database instead of using the cached counters
+
+    Counters are maintained in-process by the write endpoints and reconciled
+    against the database periodically, so reads do not touch MongoDB.
+    """
+    await toggle_queue.flush_pending()
+    stats = todo_stats.for_user(current_user.id)
+    if exact or not stats.initialized:
+        db = await get_database()
+        return await stats.recount(db, {"userId": ObjectId(current_user.id)})
+
+    return stats.snapshot()
+
+
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_todos(
+    bulk: BulkRequest,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Apply a batch of create, update and delete operations to the current user's todos
+    - **operations**: List of operations, each with an `op` of `create`, `update` or `delete`
+
+    Operations are executed as a single unordered bulk write, so they may be
+    applied in any order. Each operation gets its own result entry with an
+    HTTP-style status code and, on failure, an error message.
+    """
+    await toggle_queue.flush_pending()
+
+    db = await get_database()
+    user_id = ObjectId(current_user.id)
+    now = datetime.utcnow()
+    results = [
+        {"index": index, "op": operation.op, "id": None, "status": 200, "error": None}
+        for index, operation in enumerate(bulk.operations)
+    ]
+
+    # Validate IDs up front and look up which targets exist in one round trip
+    target_ids = set()
+    for operation, result in zip(bulk.operations, results):
+        if operation.op == "create":
+            continue
+        result["id"] = operation.id
+        if not ObjectId.is_valid(operation.id):
+            result["status"] = status.HTTP_400_BAD_REQUEST
+            result["error"] = "Invalid todo ID format"
+        elif ObjectId(operation.id) in target_ids:
+            # A second operation on the same todo would be counted twice
+            result["status"] = status.HTTP_400_BAD_REQUEST
+            result["error"] = "Todo ID appears more than once in the batch"
+        else:
+            target_ids.add(ObjectId(operation.id))
+
+    existing = {}
+    if target_ids:
+        async for todo in db.todos.find(
+            {"_id": {"$in": list(target_ids)}, "userId": user_id},
+            {"_id": 1, "completed": 1}
+        ):
+            existing[todo["_id"]] = todo["completed"]
+
+    requests = []
+    request_indexes = []
+    stats_deltas = {}
+    for index, (operation, result) in enumerate(zip(bulk.operations, results)):
+        if result["error"]:
+            continue
+
+        if operation.op == "create":
+            todo_id = ObjectId()
+            result["id"] = str(todo_id)
+            result["status"] = status.HTTP_201_CREATED
+            requests.append(InsertOne({
+                "_id": todo_id,
+                "userId": user_id,
+                "title": operation.data.title,
+                "description": operation.data.description,
+                "completed": operation.data.completed,
+                "createdAt": now,
+                "updatedAt": now
+            }))
+            request_indexes.append(index)
+            stats_deltas[index] = (1, int(operation.data.completed))
+            continue
+
+        todo_id = ObjectId(operation.id)
+        if todo_id not in existing:
+            result["status"] = status.HTTP_404_NOT_FOUND
+            result["error"] = f"Todo with id {operation.id} not found"
+            continue
+
+        if operation.op == "update":
+            update_data = operation.data.model_dump(exclude_unset=True)
+            if not update_data:
+                continue
+            update_data["updatedAt"] = now
+            requests.append(UpdateOne({"_id": todo_id, "userId": user_id}, {"$set": update_data}))
+            if "completed" in update_data:
+                stats_deltas[index] = (
+                    0, int(update_data["completed"]) - int(existing[todo_id])
+                )
+        else:
+            result["status"] = status.HTTP_204_NO_CONTENT
+            requests.append(DeleteOne({"_id": todo_id, "userId": user_id}))
+            stats_deltas[index] = (-1, -int(existing[todo_id]))
+        request_indexes.append(index)
+
+    written = {"nInserted": 0, "nMatched": 0, "nRemoved": 0}
+    if requests:
+        try:
+            written = (await db.todos.bulk_write(requests, ordered=False)).bulk_api_result
+        except BulkWriteError as e:
+            written = e.details
+            for write_error in e.details.get("writeErrors", []):
+                result = results[request_indexes[write_error["index"]]]
+                result["status"] = status.HTTP_500_INTERNAL_SERVER_ERROR
+                result["error"] = write_error.get("errmsg", "Write failed")
+        finally:
+            changed_ids = [results[index]["id"] for index in request_indexes
+                           if not results[index]["error"]]
+            await notify_todo_change("bulk", current_user.id, changed_ids)
+
+    # The deltas assume every write hit the todo read above. If the bulk
+    # result disagrees, a concurrent write got in between; recount instead.
+    expected = {"create": 0, "update": 0, "delete": 0}
+    for index in request_indexes:
+        if not results[index]["error"]:
+            expected[results[index]["op"]] += 1
+    if (written["nInserted"], written["nMatched"], written["nRemoved"]) == (
+        expected["create"], expected["update"], expected["delete"]
+    ):
+        for index, (total_delta, completed_delta) in stats_deltas.items():
+            if not results[index]["error"]:
+                todo_stats.apply(current_user.id, total_delta, completed_delta)
+    else:
+        todo_stats.invalidate(current_user.id)
+
+    return {
+        "created": written["nInserted"],
+        "updated": written["nMatched"],
+        "deleted": written["nRemoved"],
+        "failed": sum(1 for r in results if r["error"]),
+        "results": results
+    }
+
+
+async def insert_imported_todos(
+    user_id: str,
+    rows: AsyncIterator[Tuple[int, Union[TodoCreate, str]]],
+    format: str,
+    progress: Optional[JobProgress] = None
+) -> dict:
+    """
+    Insert the valid rows of an import for a user and return the summary
+
+    Rows are inserted IMPORT_BATCH_SIZE at a time with unordered insert_many
+    calls, up to IMPORT_MAX_CONCURRENT_BATCHES of them in flight; parsing
+    waits while that many are outstanding. A row that fails validation or
+    insertion is recorded with its line number. An ImportFormatError stops
+    the import after the rows before it have been inserted.
+    """
+    db = await get_database()
+    owner = ObjectId(user_id)
+    summary = {"format": format, "processed": 0, "imported": 0, "failed": 0, "errors": [], "error": None}
+
+    def add_error(line: int, error: str):
+        summary["failed"] += 1
+        if len(summary["errors"]) < IMPORT_MAX_ERRORS:
+            summary["errors"].append({"line": line, "error": error})
+
+    async def insert_batch(batch: List[Tuple[int, dict]]):
+        failed = {}
+        try:
+            await db.todos.insert_many([todo for _, todo in batch], ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed[write_error["index"]] = write_error.get("errmsg", "Write failed")
+
+        inserted = [todo for index, (_, todo) in enumerate(batch) if index not in failed]
+        for index, error in failed.items():
+            add_error(batch[index][0], error)
+        summary["imported"] += len(inserted)
+        todo_stats.apply(user_id, len(inserted), sum(int(todo["completed"]) for todo in inserted))
+        if inserted:
+            await notify_todo_change("bulk", user_id, [str(todo["_id"]) for todo in inserted])
+        if progress is not None:
+            await progress.report(summary["imported"] + summary["failed"])
+
+    pending = set()
+
+    async def submit(batch: List[Tuple[int, dict]]):
+        nonlocal pending
+        if len(pending) >= IMPORT_MAX_CONCURRENT_BATCHES:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        pending.add(asyncio.create_task(insert_batch(batch)))
+
+    batch = []
+    try:
+        try:
+            async for line, row in rows:
+                summary["processed"] += 1
+                if isinstance(row, str):
+                    add_error(line, row)
+                    continue
+                now = datetime.utcnow()
+                batch.append((line, {
+                    "_id": ObjectId(),
+                    "userId": owner,
+                    "title": row.title,
+                    "description": row.description,
+                    "completed": row.completed,
+                    "createdAt": now,
+                    "updatedAt": now
+                }))
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    await submit(batch)
+                    batch = []
+        except ImportFormatError as e:
+            summary["error"] = str(e)
+        if batch:
+            await submit(batch)
+        if pending:
+            await asyncio.gather(*pending)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    # Concurrent batches finish in any order
+    summary["errors"].sort(key=lambda error: error["line"])
+    return summary
+
+
+async def import_stored_upload(user_id: str, upload, format: str, progress: JobProgress) -> dict:
+    """Import an upload stored in a temporary file"""
+    async def chunks():
+        while True:
+            # The file may have spilled to disk; read it off the event loop
+            chunk = await run_in_threadpool(upload.read, IMPORT_READ_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    return await insert_imported_todos(
+        user_id, parse_todos(chunks(), format), format, progress
+    )
+
+
+@router.post(
+    "/import",
+    response_model=ImportResponse,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobResponse}}
+)
+async def import_todos(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = Query(None),
+    background: bool = Query(False),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Import todos for the current user from an NDJSON or CSV request body
+    - **format**: `ndjson` (one todo object per line) or `csv` (a header row
+      with a `title` column and optional `description` and `completed`
+      columns); taken from the Content-Type (`text/csv`) when omitted
+    - **background**: Run the import as a background job regardless of size
+
+    The body is parsed and validated against TodoCreate as it arrives, and
+    valid rows are inserted in batches. Returns a summary listing the rows
+    that were rejected. Uploads larger than IMPORT_INLINE_MAX_BYTES, or sent
+    without a Content-Length, are imported by a background job: the response
+    is then 202 with the job, whose result holds the summary once finished.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if content_type.split(";")[0].strip() == "text/csv" else "ndjson"
+
+    content_length = request.headers.get("content-length")
+    size = int(content_length) if content_length and content_length.isdigit() else None
+    if size is not None and size > IMPORT_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Imports are limited to {IMPORT_MAX_BYTES} bytes"
+        )
+
+    if not background and size is not None and size <= IMPORT_INLINE_MAX_BYTES:
+        summary = await insert_imported_todos(
+            current_user.id, parse_todos(request.stream(), format), format
+        )
+        if summary["error"] and not summary["processed"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=summary["error"]
+            )
+        return summary
+
+    # Store the upload so the job can read it after the response is sent
+    upload = tempfile.SpooledTemporaryFile(max_size=IMPORT_INLINE_MAX_BYTES)
+    try:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > IMPORT_MAX_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Imports are limited to {IMPORT_MAX_BYTES} bytes"
+                )
+            await run_in_threadpool(upload.write, chunk)
+        upload.seek(0)
+
+        # The job removes the file when it ends, however it ends
+        job = await job_runner.submit(
+            "import_todos",
+            current_user.id,
+            lambda progress: import_stored_upload(current_user.id, upload, format, progress),
+            params={"format": format, "bytes": received},
+            cleanup=upload.close
+        )
+    except TooManyJobsError as e:
+        upload.close()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+    except BaseException:
+        upload.close()
+        raise
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(job_helper(job)),
+        headers={"Location": f"/api/jobs/{job['_id']}"}
+    )
 
 
 @router.get("/{todo_id}", response_model=TodoResponse)
-async def get_todo(todo_id: str):
+async def get_todo(
+    todo_id: str,
+    request: Request,
+    response: Response,
+    current_user: UserResponse = Depends(get_current_user)
+):
     """
-    Get a specific todo by ID
+    Get a specific todo of the current user by ID
     - **todo_id**: The ID of the todo to retrieve
+
+    Supports conditional requests: send the ETag from a previous response in
+    If-None-Match to get 304 Not Modified while the todo is unchanged.
     """
     if not ObjectId.is_valid(todo_id):
         raise HTTPException(
@@ -75,8 +811,22 @@ async def get_todo(todo_id: str):
             detail="Invalid todo ID format"
         )
     
-    db = await get_database()
-    todo = await db.todos.find_one({"_id": ObjectId(todo_id)})
+    async def load_todo() -> Optional[bytes]:
+        db = await get_database()
+        todo = await db.todos.find_one(
+            {"_id": ObjectId(todo_id), "userId": ObjectId(current_user.id)},
+            TODO_PROJECTION
+        )
+        return encode_todo(todo) if todo is not None else None
+    
+    user_generation, item_generation = await todo_cache.generations(
+        f"item:{current_user.id}", f"item:{current_user.id}:{todo_id}"
+    )
+    data = await todo_cache.get_or_load(
+        f"item:{current_user.id}:{user_generation}:{todo_id}:{item_generation}", load_todo
+    )
+    # Apply completion toggles that are still queued
+    todo = toggle_queue.overlay(decode_todo(data), current_user.id) if data is not None else None
     
     if todo is None:
         raise HTTPException(
@@ -84,21 +834,33 @@ async def get_todo(todo_id: str):
             detail=f"Todo with id {todo_id} not found"
         )
     
+    headers = cache_headers(todo_etag(todo), todo["updatedAt"])
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
     return todo_helper(todo)
 
 
 @router.post("", response_model=TodoResponse, status_code=status.HTTP_201_CREATED)
-async def create_todo(todo: TodoCreate):
+async def create_todo(
+    todo: TodoCreate,
+    current_user: UserResponse = Depends(get_current_user)
+):
     """
-    Create a new todo
+    Create a new todo owned by the current user
     - **title**: Title of the todo (required)
     - **description**: Description of the todo (optional)
     - **completed**: Completion status (default: false)
     """
     db = await get_database()
     
+    # Truncate to milliseconds, the precision MongoDB stores, so the response
+    # matches what later reads return
     now = datetime.utcnow()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
     todo_dict = {
+        "userId": ObjectId(current_user.id),
         "title": todo.title,
         "description": todo.description,
         "completed": todo.completed,
@@ -106,16 +868,23 @@ async def create_todo(todo: TodoCreate):
         "updatedAt": now
     }
     
-    result = await db.todos.insert_one(todo_dict)
-    created_todo = await db.todos.find_one({"_id": result.inserted_id})
+    # insert_one sets the generated _id on todo_dict, so the response can be
+    # built without reading the document back
+    await db.todos.insert_one(todo_dict)
+    todo_stats.apply(current_user.id, 1, int(todo.completed))
+    await notify_todo_change("created", current_user.id, [str(todo_dict["_id"])])
     
-    return todo_helper(created_todo)
+    return todo_helper(todo_dict)
 
 
 @router.put("/{todo_id}", response_model=TodoResponse)
-async def update_todo(todo_id: str, todo_update: TodoUpdate):
+async def update_todo(
+    todo_id: str,
+    todo_update: TodoUpdate,
+    current_user: UserResponse = Depends(get_current_user)
+):
     """
-    Update an existing todo
+    Update an existing todo of the current user
     - **todo_id**: The ID of the todo to update
     - **title**: New title (optional)
     - **description**: New description (optional)
@@ -127,34 +896,113 @@ async def update_todo(todo_id: str, todo_update: TodoUpdate):
             detail="Invalid todo ID format"
         )
     
+    # A queued toggle must not overwrite this update when it is flushed
+    await toggle_queue.flush_pending()
     db = await get_database()
     
-    # Check if todo exists
-    existing_todo = await db.todos.find_one({"_id": ObjectId(todo_id)})
+    # Build update document with only provided fields
+    update_data = {k: v for k, v in todo_update.model_dump(exclude_unset=True).items()}
+    
+    # Update in a single round trip. The previous version is returned so the
+    # stats counters can see whether the completion status changed; $set is
+    # deterministic, so the new version is the old one with update_data applied.
+    todo_filter = {"_id": ObjectId(todo_id), "userId": ObjectId(current_user.id)}
+    if update_data:
+        now = datetime.utcnow()
+        update_data["updatedAt"] = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        existing_todo = await db.todos.find_one_and_update(
+            todo_filter,
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE
+        )
+    else:
+        existing_todo = await db.todos.find_one(todo_filter)
+    
     if existing_todo is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Todo with id {todo_id} not found"
         )
     
-    # Build update document with only provided fields
-    update_data = {k: v for k, v in todo_update.model_dump(exclude_unset=True).items()}
-    
+    updated_todo = {**existing_todo, **update_data}
     if update_data:
-        update_data["updatedAt"] = datetime.utcnow()
-        await db.todos.update_one(
-            {"_id": ObjectId(todo_id)},
-            {"$set": update_data}
-        )
+        await notify_todo_change("updated", current_user.id, [todo_id])
+    if updated_todo["completed"] != existing_todo["completed"]:
+        todo_stats.apply(current_user.id, 0, 1 if updated_todo["completed"] else -1)
     
-    updated_todo = await db.todos.find_one({"_id": ObjectId(todo_id)})
     return todo_helper(updated_todo)
 
 
+@router.patch(
+    "/{todo_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={202: {"description": "Change queued (write-behind enabled)"}}
+)
+async def toggle_todo(
+    todo_id: str,
+    toggle: TodoToggle,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Set the completion status of a todo of the current user
+    - **todo_id**: The ID of the todo to update
+    - **completed**: New completion status
+
+    When write-behind is enabled the change is queued, repeated toggles of the
+    same todo are collapsed, and the request is acknowledged with 202 Accepted
+    once the todo is known to exist, before the change is written. Otherwise
+    it is applied immediately.
+    """
+    if not ObjectId.is_valid(todo_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid todo ID format"
+        )
+    
+    now = datetime.utcnow()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    
+    db = await get_database()
+    if toggle_queue.enabled:
+        # Check the todo exists and is the user's before acknowledging; a
+        # queued toggle was checked when it was queued, and deletes flush
+        # the queue first
+        if not toggle_queue.is_queued(todo_id, current_user.id) and await db.todos.find_one(
+            {"_id": ObjectId(todo_id), "userId": ObjectId(current_user.id)}, {"_id": 1}
+        ) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Todo with id {todo_id} not found"
+            )
+        toggle_queue.enqueue(todo_id, current_user.id, toggle.completed, now)
+        return Response(status_code=status.HTTP_202_ACCEPTED)
+    
+    existing_todo = await db.todos.find_one_and_update(
+        {"_id": ObjectId(todo_id), "userId": ObjectId(current_user.id)},
+        {"$set": {"completed": toggle.completed, "updatedAt": now}},
+        projection={"completed": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    
+    if existing_todo is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Todo with id {todo_id} not found"
+        )
+    
+    if existing_todo["completed"] != toggle.completed:
+        todo_stats.apply(current_user.id, 0, 1 if toggle.completed else -1)
+    await notify_todo_change("updated", current_user.id, [todo_id])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.delete("/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_todo(todo_id: str):
+async def delete_todo(
+    todo_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
     """
-    Delete a specific todo
+    Delete a specific todo of the current user
     - **todo_id**: The ID of the todo to delete
     """
     if not ObjectId.is_valid(todo_id):
@@ -163,27 +1011,160 @@ async def delete_todo(todo_id: str):
             detail="Invalid todo ID format"
         )
     
+    # The stats delta needs the completion status including queued toggles
+    await toggle_queue.flush_pending()
     db = await get_database()
     
-    result = await db.todos.delete_one({"_id": ObjectId(todo_id)})
+    deleted_todo = await db.todos.find_one_and_delete(
+        {"_id": ObjectId(todo_id), "userId": ObjectId(current_user.id)},
+        projection={"completed": 1}
+    )
     
-    if result.deleted_count == 0:
+    if deleted_todo is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Todo with id {todo_id} not found"
         )
     
+    todo_stats.apply(current_user.id, -1, -int(deleted_todo["completed"]))
+    await notify_todo_change("deleted", current_user.id, [todo_id])
     return None
 
 
-@router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_all_todos():
+async def delete_todos_in_batches(user_id: str, progress: JobProgress) -> dict:
     """
-    Delete all todos
-    
-    WARNING: This endpoint is intended for development/testing only.
-    In production, this should be protected with proper authentication/authorization.
+    Delete a user's todos created before the job started, DELETE_BATCH_SIZE
+    at a time with a pause between batches
     """
     db = await get_database()
-    await db.todos.delete_many({})
-    return None
+    query = {"userId": ObjectId(user_id), "createdAt": {"$lte": datetime.utcnow()}}
+    total = await db.todos.count_documents(query)
+    await progress.report(0, total)
+
+    deleted = 0
+    while True:
+        # Served by the userId_createdAt_id index; deleted todos drop out of
+        # the range, so each batch starts at the front again
+        batch = await db.todos.find(query, {"_id": 1}).sort(
+            [("createdAt", 1), ("_id", 1)]
+        ).limit(DELETE_BATCH_SIZE).to_list(length=DELETE_BATCH_SIZE)
+        if not batch:
+            break
+
+        result = await db.todos.delete_many(
+            {"_id": {"$in": [todo["_id"] for todo in batch]}, "userId": ObjectId(user_id)}
+        )
+        if not result.deleted_count:
+            break
+        deleted += result.deleted_count
+
+        # Readers must not see deleted todos while the job runs
+        todo_stats.invalidate(user_id)
+        todo_collection_version.bump()
+        await todo_cache.bump(f"list:{user_id}", f"item:{user_id}")
+        await progress.report(deleted)
+        await asyncio.sleep(DELETE_BATCH_PAUSE_MS / 1000)
+
+    todo_stats.invalidate(user_id)
+    await notify_todo_change("cleared", user_id)
+    return {"deleted": deleted}
+
+
+async def has_other_owners(db, user_id: str) -> bool:
+    """Return whether the collection holds todos not owned by the user"""
+    other = await db.todos.find_one({"userId": {"$ne": ObjectId(user_id)}}, {"_id": 1})
+    return other is not None
+
+
+async def drop_todos(user_id: str, progress: JobProgress) -> dict:
+    """
+    Drop the todos collection and recreate its indexes
+
+    The collection is first renamed aside, so todos another user creates
+    between the ownership check and the drop land in a new collection. Any
+    that reached the old one before the rename are copied back, then the
+    renamed collection is dropped.
+    """
+    db = await get_database()
+    # Checked again in case another user created a todo since the request
+    if await has_other_owners(db, user_id):
+        raise RuntimeError("The collection contains other users' todos")
+
+    dropped = db[f"{DROPPED_TODOS_PREFIX}{progress.job_id}"]
+    await db.todos.rename(dropped.name)
+    await ensure_indexes(db)
+    total = await dropped.estimated_document_count()
+    await progress.report(0, total)
+
+    others = dropped.find({"userId": {"$ne": ObjectId(user_id)}})
+    restored = 0
+    while batch := await others.to_list(length=DELETE_BATCH_SIZE):
+        try:
+            await db.todos.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Only duplicates of todos already restored can conflict
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+        restored += len(batch)
+    if restored:
+        print(f"Drop of todos restored {restored} todos of other users")
+    await dropped.drop()
+    await progress.report(total)
+
+    todo_stats.reset(user_id)
+    await notify_todo_change("cleared", user_id)
+    return {"deleted": total - restored}
+
+
+@router.delete(
+    "",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def delete_all_todos(
+    response: Response,
+    mode: Literal["batched", "drop"] = Query("batched"),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Start a background job deleting all of the current user's todos
+    - **mode**: `batched` deletes in throttled batches; `drop` drops and
+      recreates the collection, allowed only when DELETE_ALLOW_DROP is set and
+      the user owns every todo
+
+    Returns the job; poll `/api/jobs/{id}` (the Location header) for progress.
+    """
+    # The deletes must not race queued toggles
+    await toggle_queue.flush_pending()
+    db = await get_database()
+
+    if mode == "drop":
+        if not DELETE_ALLOW_DROP:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Drop mode is disabled"
+            )
+        if await has_other_owners(db, current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Drop mode is only allowed when all todos belong to the current user"
+            )
+        work = drop_todos
+    else:
+        work = delete_todos_in_batches
+
+    try:
+        job = await job_runner.submit(
+            "delete_todos",
+            current_user.id,
+            lambda progress: work(current_user.id, progress),
+            params={"mode": mode}
+        )
+    except TooManyJobsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+
+    response.headers["Location"] = f"/api/jobs/{job['_id']}"
+    return job_helper(job)
@@ -0,0 +1,261 @@
+"""
+Production server entrypoint.
+
+Runs app.main:app under uvicorn with uvloop and httptools, sizing the number
+of worker processes from the available CPUs and memory. Workers share one
+listening socket and are restarted when they exit, so MAX_REQUESTS recycles
+them one at a time without dropping connections. Each worker imports the
+application itself and so creates its own MongoDB client.
+
+Usage:
+    python -m app.server
+    WEB_CONCURRENCY=4 MAX_REQUESTS=10000 python -m app.server
+"""
+import importlib.util
+import math
+import multiprocessing
+import os
+import random
+import signal
+import threading
+import time
+from typing import Optional
+
+import uvicorn
+
+# Workers are started fresh rather than forked, and receive the listening
+# socket from the supervisor
+multiprocessing.allow_connection_pickling()
+spawn = multiprocessing.get_context("spawn")
+
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8080"))
+# Worker processes; sized from CPUs and memory when unset
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0"))
+# Memory budget per worker used to cap the worker count
+WORKER_MEMORY_MB = int(os.getenv("WORKER_MEMORY_MB", "150"))
+# Memory available to the server; detected from the cgroup or host when unset
+SERVER_MEMORY_MB = int(os.getenv("SERVER_MEMORY_MB", "0"))
+# Seconds an idle keep-alive connection stays open
+KEEP_ALIVE_SECONDS = int(os.getenv("KEEP_ALIVE_SECONDS", "5"))
+# Pending connections the kernel queues before refusing new ones
+BACKLOG = int(os.getenv("BACKLOG", "2048"))
+# Connections plus tasks per worker before new requests get 503; 0 disables
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "0"))
+# Requests after which a worker exits and is replaced; 0 disables. A random
+# 0-MAX_REQUESTS_JITTER is added per worker so they do not recycle together.
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", "0"))
+MAX_REQUESTS_JITTER = int(os.getenv("MAX_REQUESTS_JITTER", "0"))
+# Seconds a stopping worker waits for in-flight requests
+GRACEFUL_TIMEOUT_SECONDS = int(os.getenv("GRACEFUL_TIMEOUT_SECONDS", "30"))
+
+
+def read_file(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and cgroup quotas"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    quota, period = None, None
+    cpu_max = read_file("/sys/fs/cgroup/cpu.max")
+    if cpu_max and not cpu_max.startswith("max"):
+        quota, period = (int(value) for value in cpu_max.split()[:2])
+    else:
+        # cgroup v1
+        cfs_quota = read_file("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+        cfs_period = read_file("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        if cfs_quota and cfs_period and int(cfs_quota) > 0:
+            quota, period = int(cfs_quota), int(cfs_period)
+    if quota and period:
+        cpus = min(cpus, max(1, math.ceil(quota / period)))
+    return cpus
+
+
+def available_memory_mb() -> Optional[int]:
+    """Memory available to this process in MB, or None if unknown"""
+    if SERVER_MEMORY_MB:
+        return SERVER_MEMORY_MB
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        limit = read_file(path)
+        # Unlimited cgroups report "max" or a huge number
+        if limit and limit.isdigit() and int(limit) < 1 << 50:
+            return int(limit) // (1024 * 1024)
+    meminfo = read_file("/proc/meminfo")
+    if meminfo:
+        for line in meminfo.splitlines():
+            if line.startswith("MemTotal:"):
+                return int(line.split()[1]) // 1024
+    return None
+
+
+def worker_count() -> int:
+    """Workers to run: WEB_CONCURRENCY, else one per CPU within the memory budget"""
+    if WEB_CONCURRENCY:
+        return WEB_CONCURRENCY
+    workers = available_cpus()
+    memory_mb = available_memory_mb()
+    if memory_mb is not None:
+        workers = min(workers, max(1, memory_mb // WORKER_MEMORY_MB))
+    return workers
+
+
+def configure_worker_environment(workers: int):
+    """
+    Adjust defaults for state that is kept per process
+
+    Set before the workers start, which inherit the environment. Explicit
+    settings are left alone.
+    """
+    if workers == 1:
+        return
+    if os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true":
+        # Queued toggles are only visible to the worker that accepted them, so
+        # a read served by another worker would miss the client's own write
+        raise SystemExit(
+            f"WRITE_BEHIND_ENABLED=true needs a single worker, but {workers} would start; "
+            "set WEB_CONCURRENCY=1 or disable write-behind"
+        )
+    # List ETag versions only see writes made by their own worker, so another
+    # worker could answer 304 for a stale list
+    os.environ.setdefault("LIST_ETAGS", "false")
+    if os.getenv("TODO_CACHE_BACKEND", "memory") == "memory":
+        # Per-worker caches are not invalidated by other workers' writes
+        os.environ.setdefault("TODO_CACHE_ENABLED", "false")
+    # Stats counters only see their own worker's writes; recount them often
+    os.environ.setdefault("TODO_STATS_RECONCILE_SECONDS", "5")
+    if os.getenv("EVENT_BACKEND", "memory") == "memory":
+        print("EVENT_BACKEND=memory: event streams only see writes made by their own worker")
+    if os.getenv("RATE_LIMIT_BACKEND", "memory") == "memory":
+        print(f"RATE_LIMIT_BACKEND=memory: each of the {workers} workers applies the limits separately")
+
+
+def loop_setup() -> str:
+    if importlib.util.find_spec("uvloop") is not None:
+        return "uvloop"
+    print("uvloop is not installed, using the asyncio event loop")
+    return "asyncio"
+
+
+def http_setup() -> str:
+    if importlib.util.find_spec("httptools") is not None:
+        return "httptools"
+    print("httptools is not installed, using h11")
+    return "h11"
+
+
+def build_config(workers: int) -> uvicorn.Config:
+    """Build the uvicorn configuration for one worker"""
+    limit_max_requests = None
+    if MAX_REQUESTS:
+        limit_max_requests = MAX_REQUESTS + random.randint(0, MAX_REQUESTS_JITTER)
+    return uvicorn.Config(
+        "app.main:app",
+        host=HOST,
+        port=PORT,
+        workers=workers,
+        loop=loop_setup(),
+        http=http_setup(),
+        timeout_keep_alive=KEEP_ALIVE_SECONDS,
+        backlog=BACKLOG,
+        limit_concurrency=LIMIT_CONCURRENCY or None,
+        limit_max_requests=limit_max_requests,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT_SECONDS,
+        proxy_headers=True,
+    )
+
+
+def run_worker(config: uvicorn.Config, sockets: list):
+    """Entry point of a worker process, serving on the inherited sockets"""
+    config.configure_logging()
+    uvicorn.Server(config).run(sockets=sockets)
+
+
+class WorkerSupervisor:
+    """
+    Keep ``workers`` uvicorn worker processes running on a shared socket
+
+    A worker that exits, after MAX_REQUESTS or a crash, is replaced. SIGINT
+    and SIGTERM stop all workers gracefully.
+    """
+
+    # Workers that die sooner than this after starting are restarted with
+    # a delay, so a crash on startup does not spin
+    MIN_UPTIME_SECONDS = 5
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.config = build_config(workers)
+        self.socket = None
+        self.processes = []
+        self.should_exit = threading.Event()
+        self.restarts = 0
+
+    def spawn(self):
+        # A fresh config gives each worker its own max-requests jitter
+        config = build_config(self.workers)
+        process = spawn.Process(target=run_worker, kwargs={"config": config, "sockets": [self.socket]})
+        process.start()
+        self.processes.append((process, time.monotonic()))
+
+    def handle_signal(self, signum, frame):
+        self.should_exit.set()
+
+    def run(self):
+        self.config.configure_logging()
+        self.socket = self.config.bind_socket()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self.handle_signal)
+
+        print(f"Starting {self.workers} workers on {HOST}:{PORT} (parent pid {os.getpid()})")
+        for _ in range(self.workers):
+            self.spawn()
+
+        while not self.should_exit.wait(0.5):
+            for process, started in list(self.processes):
+                if process.is_alive():
+                    continue
+                self.processes.remove((process, started))
+                print(f"Worker {process.pid} exited with code {process.exitcode}, restarting")
+                if time.monotonic() - started < self.MIN_UPTIME_SECONDS:
+                    time.sleep(1)
+                self.restarts += 1
+                self.spawn()
+
+        self.shutdown()
+
+    def shutdown(self):
+        print("Stopping workers")
+        for process, _ in self.processes:
+            process.terminate()
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT_SECONDS + 5
+        for process, _ in self.processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self.socket.close()
+
+
+def main():
+    workers = worker_count()
+    configure_worker_environment(workers)
+    if workers == 1 and not MAX_REQUESTS:
+        # Nothing to supervise; serve from this process
+        uvicorn.Server(build_config(1)).run()
+        return
+    WorkerSupervisor(workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Profile application cold start.
+
+Starts fresh interpreters that import app.main under ``-X importtime``, run
+the lifespan startup and serve a first GET /health over raw ASGI, and reports:
+
+- phases_ms: interpreter start, import of app.main, lifespan startup and
+  the first request
+- packages_ms: import time (including module-level initialization) per
+  top-level package
+- app_modules_ms: import time of each app module, excluding its imports
+- slowest_modules: the modules with the largest own import time
+
+Times are medians over --runs interpreters, after one discarded run that
+may compile bytecode. Children run with MONGO_PREWARM=false unless
+--prewarm is given, so no database is needed.
+
+Usage:
+    python -m app.startup_profile
+    python -m app.startup_profile --runs 10 --top 30 --prewarm
+"""
+# Only the standard library is imported at module level so that the child
+# interpreter measures the application imports from a clean state
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def parse_importtime(output: str) -> list:
+    """Parse ``-X importtime`` output into (module, self us, cumulative us)"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+async def _serve_first_request(app):
+    """Send GET /health to the application and wait for the response"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app({
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }, receive, send)
+
+
+def measure_phases() -> dict:
+    """Time the startup phases in this interpreter (child mode)"""
+    import asyncio
+
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    async def start_and_serve():
+        async with app.router.lifespan_context(app):
+            started_up = time.perf_counter()
+            await _serve_first_request(app)
+            served = time.perf_counter()
+        return started_up, served
+
+    started_up, served = asyncio.run(start_and_serve())
+    return {
+        "import": (imported - started) * 1000,
+        "startup": (started_up - imported) * 1000,
+        "first_request": (served - started_up) * 1000,
+    }
+
+
+def run_child(prewarm: bool) -> dict:
+    """Profile one cold start in a fresh interpreter"""
+    env = dict(os.environ)
+    if not prewarm:
+        env["MONGO_PREWARM"] = "false"
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "app.startup_profile", "--child"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_ms = (time.perf_counter() - started) * 1000
+    # The last line of stdout is the child's report; the app may print before it
+    phases = json.loads(completed.stdout.strip().splitlines()[-1])
+    modules = [m for m in parse_importtime(completed.stderr) if m[0] != "app.startup_profile"]
+    phases["interpreter"] = max(
+        0.0, total_ms - phases["import"] - phases["startup"] - phases["first_request"]
+    )
+    return {"total": total_ms, "phases": phases, "modules": modules}
+
+
+def median_by_key(samples: list) -> dict:
+    """Median of each key over a list of {key: value} dicts"""
+    keys = {key for sample in samples for key in sample}
+    return {
+        key: round(statistics.median(sample.get(key, 0) for sample in samples), 2)
+        for key in sorted(keys)
+    }
+
+
+def profile(runs: int = 5, top: int = 20, prewarm: bool = False) -> dict:
+    """Profile ``runs`` cold starts and return the median report"""
+    run_child(prewarm)
+    results = [run_child(prewarm) for _ in range(runs)]
+
+    packages = []
+    app_modules = []
+    own_times = []
+    for result in results:
+        by_package = {}
+        by_app_module = {}
+        by_module = {}
+        for name, self_us, _ in result["modules"]:
+            package = name.split(".")[0]
+            by_package[package] = by_package.get(package, 0) + self_us / 1000
+            by_module[name] = self_us / 1000
+            if package == "app":
+                by_app_module[name] = self_us / 1000
+        packages.append(by_package)
+        app_modules.append(by_app_module)
+        own_times.append(by_module)
+
+    packages_ms = median_by_key(packages)
+    modules_ms = median_by_key(own_times)
+    return {
+        "runs": runs,
+        "prewarm": prewarm,
+        "total_ms": round(statistics.median(result["total"] for result in results), 2),
+        "phases_ms": median_by_key([result["phases"] for result in results]),
+        "packages_ms": dict(sorted(packages_ms.items(), key=lambda item: -item[1])[:top]),
+        "app_modules_ms": dict(sorted(median_by_key(app_modules).items(), key=lambda item: -item[1])),
+        "slowest_modules": dict(sorted(modules_ms.items(), key=lambda item: -item[1])[:top]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20,
+                        help="Number of packages and modules to list")
+    parser.add_argument("--prewarm", action="store_true",
+                        help="Keep MONGO_PREWARM from the environment (needs MongoDB)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_phases()))
+        return
+
+    print(json.dumps(profile(args.runs, args.top, args.prewarm), indent=2))
+
+
+if __name__ == "__main__":
+    main()
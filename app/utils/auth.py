@@ -1,18 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from bson import ObjectId
+import asyncio
+import hashlib
 import os
+import secrets
+import time
 
 from app.models.user import TokenData, UserResponse
 from app.config.database import get_database
+from app.utils.cache import TTLCache
 
 
-# Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context, created on first use. passlib and jose (with
+# cryptography) are imported lazily: only authentication needs them, and
+# importing them on every cold start delays requests that do not.
+_pwd_context = None
+
+
+def get_pwd_context():
+    """Return the password hashing context, creating it on first use"""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+
+# bcrypt runs in a dedicated thread pool so it never blocks the event loop.
+# Requests beyond PASSWORD_HASH_MAX_PENDING (running + queued) are rejected
+# immediately instead of piling up behind the pool.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_pending_hash_operations = 0
+password_hash_metrics = {
+    operation: {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+    for operation in ("hash", "verify")
+}
+password_hash_metrics["rejected"] = 0
 
 # OAuth2 configuration
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -30,19 +62,81 @@ if not SECRET_KEY:
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Refresh tokens are opaque random strings stored as SHA-256 hashes. Each use
+# replaces the token with a new one; presenting a replaced token again
+# revokes every token descended from the same login.
+REFRESH_TOKEN_EXPIRE_DAYS = float(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+# Authenticated user cache, keyed by token subject. Entries never outlive an
+# access token. Each worker has its own cache and only drops entries for
+# changes it makes itself; other workers, and changes made directly in the
+# database, are seen within USER_CACHE_TTL_SECONDS.
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL_SECONDS = min(
+    float(os.getenv("USER_CACHE_TTL_SECONDS", "60")),
+    ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+user_cache = TTLCache(max_size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+def _timed(operation: str, func, *args):
+    """Run a password hashing function and record how long it took"""
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics = password_hash_metrics[operation]
+        metrics["count"] += 1
+        metrics["total_seconds"] += elapsed
+        metrics["max_seconds"] = max(metrics["max_seconds"], elapsed)
+
+
+async def _run_password_operation(operation: str, func, *args):
+    """Run a password hashing function in the executor with admission control"""
+    global _pending_hash_operations
+    if _pending_hash_operations >= PASSWORD_HASH_MAX_PENDING:
+        password_hash_metrics["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent authentication requests, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    _pending_hash_operations += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            password_hash_executor, _timed, operation, func, *args
+        )
+    finally:
+        _pending_hash_operations -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop"""
+    return await _run_password_operation("verify", verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run_password_operation("hash", get_password_hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -55,6 +149,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserResponse:
     """Get the current authenticated user from JWT token"""
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -69,18 +165,117 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserResponse:
     except JWTError:
         raise credentials_exception
     
+    cached_user = user_cache.get(token_data.email)
+    if cached_user is not None:
+        return cached_user
+    
     db = await get_database()
     user = await db.users.find_one({"email": token_data.email})
     if user is None:
         raise credentials_exception
     
-    return UserResponse(
+    current_user = UserResponse(
         id=str(user["_id"]),
         email=user["email"],
         username=user["username"],
         createdAt=user["createdAt"],
         updatedAt=user["updatedAt"]
     )
+    user_cache.set(token_data.email, current_user)
+    return current_user
+
+
+def hash_refresh_token(token: str) -> str:
+    """Hash a refresh token for storage and lookup"""
+    # The token carries 256 random bits, so a fast unsalted hash suffices
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def issue_refresh_token(db, user_id: ObjectId, email: str,
+                              family: Optional[ObjectId] = None) -> str:
+    """
+    Create and store a refresh token for a user
+
+    ``family`` groups the tokens descended from one login; a new login
+    starts a new family.
+    """
+    token = secrets.token_urlsafe(32)
+    now = datetime.now(timezone.utc)
+    await db.refresh_tokens.insert_one({
+        "_id": hash_refresh_token(token),
+        "userId": user_id,
+        "email": email,
+        "family": family or ObjectId(),
+        "createdAt": now,
+        "expiresAt": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        "revokedAt": None,
+    })
+    return token
+
+
+async def rotate_refresh_token(db, token: str) -> Optional[tuple]:
+    """
+    Exchange a refresh token for a new one
+
+    Returns (new refresh token, email), or None when the token is unknown,
+    expired or revoked. A revoked token being presented means it was
+    stolen or replayed, so its whole family is revoked.
+    """
+    token_hash = hash_refresh_token(token)
+    now = datetime.now(timezone.utc)
+    stored = await db.refresh_tokens.find_one_and_update(
+        {"_id": token_hash, "revokedAt": None, "expiresAt": {"$gt": now}},
+        {"$set": {"revokedAt": now}}
+    )
+    if stored is None:
+        reused = await db.refresh_tokens.find_one(
+            {"_id": token_hash, "revokedAt": {"$ne": None}}, {"family": 1}
+        )
+        if reused is not None:
+            await revoke_refresh_token_family(db, reused["family"])
+        return None
+
+    new_token = await issue_refresh_token(db, stored["userId"], stored["email"], stored["family"])
+    return new_token, stored["email"]
+
+
+async def revoke_refresh_token_family(db, family: ObjectId):
+    """Revoke every token descended from one login"""
+    await db.refresh_tokens.update_many(
+        {"family": family, "revokedAt": None},
+        {"$set": {"revokedAt": datetime.now(timezone.utc)}}
+    )
+
+
+async def revoke_refresh_token(db, token: str) -> bool:
+    """Revoke the session a refresh token belongs to; False if the token is unknown"""
+    stored = await db.refresh_tokens.find_one({"_id": hash_refresh_token(token)}, {"family": 1})
+    if stored is None:
+        return False
+    await revoke_refresh_token_family(db, stored["family"])
+    return True
+
+
+async def revoke_user_refresh_tokens(db, user_id: ObjectId) -> int:
+    """Revoke every refresh token of a user and return how many were active"""
+    result = await db.refresh_tokens.update_many(
+        {"userId": user_id, "revokedAt": None},
+        {"$set": {"revokedAt": datetime.now(timezone.utc)}}
+    )
+    return result.modified_count
+
+
+def invalidate_cached_user(email: Optional[str] = None):
+    """
+    Drop cached user lookups after a user record changes
+
+    Call with the user's email (the token subject) to drop a single entry,
+    or with no argument to clear the whole cache.
+    """
+    if email is None:
+        user_cache.clear()
+    else:
+        user_cache.delete(email)
 
 
 def user_helper(user) -> dict:
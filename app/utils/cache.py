@@ -0,0 +1,286 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with per-entry expiry and LRU eviction
+
+    Entries expire ``ttl`` seconds after they are stored. When the cache is
+    full, the least recently used entry is evicted to make room.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key``, or None if absent or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store ``value`` under ``key``, evicting the oldest entry if full"""
+        if self.max_size <= 0:
+            return
+
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable):
+        """Remove ``key`` from the cache if present"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry from the cache"""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return size and hit/miss/eviction counters"""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def counter_ttl(ttl: float) -> float:
+    """
+    Lifetime of a generation counter after its last increment
+
+    Once every entry stored under a generation has expired, the counter can
+    be forgotten and start again from 0. Entries live ``ttl`` seconds, and a
+    load that read the old generation may store its entry somewhat after
+    the increment, hence the margin.
+    """
+    return 2 * ttl + 60
+
+
+class MemoryCacheBackend:
+    """Cache backend storing entries in a process-local TTLCache"""
+
+    name = "memory"
+    # Exceptions that mean the backend is unavailable (none for memory)
+    errors = ()
+
+    def __init__(self, max_size: int, ttl: float):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+        self._counter_ttl = counter_ttl(ttl)
+        # key -> (value, expires at)
+        self._counters = {}
+        self._sweep_at = 1024
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self._cache.set(key, value)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._cache.delete(key)
+
+    async def incr(self, *keys: str):
+        now = time.monotonic()
+        for key in keys:
+            value = self._get_counter(key, now)
+            self._counters[key] = (value + 1, now + self._counter_ttl)
+        if len(self._counters) >= self._sweep_at:
+            # Drop expired counters; they would read as 0 anyway
+            self._counters = {
+                key: entry for key, entry in self._counters.items() if entry[1] > now
+            }
+            self._sweep_at = max(1024, 2 * len(self._counters))
+
+    async def get_counters(self, *keys: str) -> list:
+        now = time.monotonic()
+        return [self._get_counter(key, now) for key in keys]
+
+    def _get_counter(self, key: str, now: float) -> int:
+        entry = self._counters.get(key)
+        if entry is None or entry[1] <= now:
+            return 0
+        return entry[0]
+
+    def stats(self) -> dict:
+        cache_stats = self._cache.stats()
+        return {
+            "backend": self.name,
+            "size": cache_stats["size"],
+            "max_size": cache_stats["max_size"],
+            "evictions": cache_stats["evictions"],
+            "counters": len(self._counters),
+        }
+
+
+class RedisCacheBackend:
+    """Cache backend for any Redis-protocol server, shared by all workers"""
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl: float, prefix: str = "todolist:"):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self._ttl = max(1, int(ttl))
+        self._counter_ttl = int(counter_ttl(self._ttl))
+        self._prefix = prefix
+        self.errors = (redis.RedisError,)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(self._prefix + key)
+
+    async def set(self, key: str, value: bytes):
+        await self._client.set(self._prefix + key, value, ex=self._ttl)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._client.delete(*(self._prefix + key for key in keys))
+
+    async def incr(self, *keys: str):
+        if not keys:
+            return
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(self._prefix + key)
+                pipe.expire(self._prefix + key, self._counter_ttl)
+            await pipe.execute()
+
+    async def get_counters(self, *keys: str) -> list:
+        values = await self._client.mget([self._prefix + key for key in keys])
+        return [int(value or 0) for value in values]
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class ReadThroughCache:
+    """
+    Read-through cache over a pluggable backend
+
+    Values are bytes. Keys can be scoped to a namespace generation, which
+    invalidates every key in the namespace at once when bumped. Backend
+    failures are counted and fall through to the loader.
+    """
+
+    def __init__(self, backend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get_or_load(self, key: str, loader) -> Optional[bytes]:
+        """Return the cached value for ``key``, loading and storing it on a miss"""
+        if not self.enabled:
+            return await loader()
+
+        try:
+            value = await self.backend.get(key)
+        except self.backend.errors:
+            self.errors += 1
+            return await loader()
+
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = await loader()
+        if value is not None:
+            try:
+                await self.backend.set(key, value)
+            except self.backend.errors:
+                self.errors += 1
+        return value
+
+    async def invalidate(self, *keys: str):
+        """Remove specific keys"""
+        if not self.enabled:
+            return
+        try:
+            await self.backend.delete(*keys)
+        except self.backend.errors:
+            self.errors += 1
+
+    async def generation(self, namespace: str) -> int:
+        """Current generation of a namespace, for building scoped keys"""
+        return (await self.generations(namespace))[0]
+
+    async def generations(self, *namespaces: str) -> list:
+        """Current generations of several namespaces, read in one round trip"""
+        if not self.enabled:
+            return [0] * len(namespaces)
+        try:
+            return await self.backend.get_counters(*(f"gen:{namespace}" for namespace in namespaces))
+        except self.backend.errors:
+            self.errors += 1
+            return [0] * len(namespaces)
+
+    async def bump(self, *namespaces: str):
+        """
+        Invalidate every key scoped to the given namespaces
+
+        Call after the write: a load that read the database before the write
+        stores its entry under the previous generation, which is no longer
+        read, so it cannot reinstate stale data.
+        """
+        if not self.enabled or not namespaces:
+            return
+        try:
+            await self.backend.incr(*(f"gen:{namespace}" for namespace in namespaces))
+        except self.backend.errors:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss/error counters plus backend statistics"""
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            **self.backend.stats(),
+        }
+
+
+# Read-through cache for todo reads. TODO_CACHE_ENABLED is the kill switch.
+TODO_CACHE_ENABLED = os.getenv("TODO_CACHE_ENABLED", "true").lower() == "true"
+TODO_CACHE_BACKEND = os.getenv("TODO_CACHE_BACKEND", "memory")
+TODO_CACHE_REDIS_URL = os.getenv("TODO_CACHE_REDIS_URL", "redis://localhost:6379/0")
+TODO_CACHE_SIZE = int(os.getenv("TODO_CACHE_SIZE", "2048"))
+TODO_CACHE_TTL_SECONDS = float(os.getenv("TODO_CACHE_TTL_SECONDS", "30"))
+
+
+def create_todo_cache() -> ReadThroughCache:
+    """Create the todo read cache selected by TODO_CACHE_BACKEND"""
+    if TODO_CACHE_BACKEND == "redis":
+        backend = RedisCacheBackend(TODO_CACHE_REDIS_URL, TODO_CACHE_TTL_SECONDS)
+    else:
+        backend = MemoryCacheBackend(TODO_CACHE_SIZE, TODO_CACHE_TTL_SECONDS)
+    return ReadThroughCache(backend, enabled=TODO_CACHE_ENABLED)
+
+
+todo_cache = create_todo_cache()
@@ -0,0 +1,232 @@
+from typing import Optional
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Compress responses for clients that send Accept-Encoding
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+# Responses smaller than this many bytes are sent as-is; compressing them
+# costs more CPU than the bytes saved are worth
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+# zlib level 1-9; higher is smaller and slower. Above 4, a 100-todo page
+# costs about twice the CPU for a few percent fewer bytes
+# (benchmarks/compression_benchmark.py)
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "4"))
+# Brotli quality 0-11, used when the brotli package is installed and the
+# client accepts br
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_BROTLI_ENABLED = os.getenv("COMPRESSION_BROTLI_ENABLED", "true").lower() == "true"
+
+# Content types worth compressing. Event streams are excluded: every event
+# must reach the client as soon as it is sent.
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+UNCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+
+class GzipEncoder:
+    """Incremental gzip encoder"""
+
+    name = "gzip"
+
+    def __init__(self, level: int):
+        # wbits 16 + MAX_WBITS writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far without ending the stream"""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    """Incremental brotli encoder"""
+
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def parse_accept_encoding(value: str) -> dict:
+    """Parse an Accept-Encoding header into {coding: q-value}"""
+    codings = {}
+    for item in value.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with brotli or gzip
+
+    The encoding is negotiated from Accept-Encoding, preferring brotli when
+    it is available. Complete responses below ``minimum_size`` are sent
+    unchanged. Streaming responses are compressed chunk by chunk and flushed
+    after every chunk, so clients receive data as the application produces
+    it; they are compressed regardless of size because the total is unknown.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+                 gzip_level: int = COMPRESSION_GZIP_LEVEL,
+                 brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+                 brotli_enabled: bool = COMPRESSION_BROTLI_ENABLED):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli_enabled = brotli_enabled and brotli is not None
+
+    def select_encoding(self, scope) -> Optional[str]:
+        """Return the encoding to use for the request, or None"""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                codings = parse_accept_encoding(value.decode("latin-1"))
+                break
+        else:
+            return None
+
+        wildcard = codings.get("*", 0)
+        if self.brotli_enabled and codings.get("br", wildcard) > 0:
+            return "br"
+        if codings.get("gzip", wildcard) > 0:
+            return "gzip"
+        return None
+
+    def create_encoder(self, encoding: str):
+        if encoding == "br":
+            return BrotliEncoder(self.brotli_quality)
+        return GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.select_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder = None
+        # "pending" until the first body message decides, then "compress"
+        # or "passthrough"
+        mode = "pending"
+
+        async def send_wrapper(message):
+            nonlocal start_message, encoder, mode
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                if not self.compressible(message):
+                    mode = "passthrough"
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or mode == "passthrough":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if mode == "pending":
+                if not more_body and len(body) < self.minimum_size:
+                    mode = "passthrough"
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                mode = "compress"
+                encoder = self.create_encoder(encoding)
+                headers = self.compressed_headers(start_message, encoding)
+                if more_body:
+                    data = encoder.compress(body) + encoder.flush()
+                else:
+                    data = encoder.compress(body) + encoder.finish()
+                    headers.append((b"content-length", str(len(data)).encode()))
+                await send({**start_message, "headers": headers})
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            if more_body:
+                data = encoder.compress(body) + encoder.flush()
+                if data:
+                    await send({"type": "http.response.body", "body": data, "more_body": True})
+            else:
+                data = encoder.compress(body) + encoder.finish()
+                await send({"type": "http.response.body", "body": data, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def compressible(start_message) -> bool:
+        """Whether a response, judged by its status and headers, may be compressed"""
+        if start_message["status"] < 200 or start_message["status"] in (204, 304):
+            return False
+        content_type = b""
+        for name, value in start_message.get("headers", []):
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        content_type = content_type.decode("latin-1").lower()
+        return (
+            content_type.startswith(COMPRESSIBLE_TYPES)
+            and not content_type.startswith(UNCOMPRESSIBLE_TYPES)
+        )
+
+    @staticmethod
+    def compressed_headers(start_message, encoding: str) -> list:
+        """Response headers for the compressed body, without Content-Length"""
+        headers = []
+        vary = None
+        for name, value in start_message.get("headers", []):
+            if name == b"content-length":
+                continue
+            if name == b"etag" and not value.startswith(b"W/"):
+                # The compressed bytes differ from the identity encoding;
+                # If-None-Match uses weak comparison, so revalidation still works
+                value = b"W/" + value
+            if name == b"vary":
+                vary = value
+                continue
+            headers.append((name, value))
+        if vary is None:
+            vary = b"Accept-Encoding"
+        elif b"accept-encoding" not in vary.lower():
+            vary += b", Accept-Encoding"
+        headers.append((b"vary", vary))
+        headers.append((b"content-encoding", encoding.encode()))
+        return headers
+
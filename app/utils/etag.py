@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+import hashlib
+import os
+
+
+# Clients may store responses but must revalidate them on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+class CollectionVersion:
+    """
+    Version token for a collection, bumped by every write
+
+    The token lives in process memory, so list ETags are only valid for the
+    process that issued them. The random nonce keeps tags from different
+    processes or restarts from ever matching.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.last_modified = datetime.now(timezone.utc)
+        self._nonce = os.urandom(8).hex()
+
+    def bump(self):
+        """Record that the collection has changed"""
+        self.version += 1
+        self.last_modified = datetime.now(timezone.utc)
+
+    def etag(self, *parts: str) -> str:
+        """Build an ETag for a query against the current collection version"""
+        key = ":".join([self._nonce, str(self.version), *parts])
+        return f'"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+todo_collection_version = CollectionVersion()
+
+
+def todo_etag(todo: dict) -> str:
+    """Build the ETag of a single todo from its _id and updatedAt"""
+    updated_ms = int(todo["updatedAt"].replace(tzinfo=timezone.utc).timestamp() * 1000)
+    return f'"{todo["_id"]}-{updated_ms:x}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def http_date(value: datetime) -> str:
+    """Format a datetime for the Last-Modified header"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def cache_headers(etag: str, last_modified: datetime) -> dict:
+    """Conditional request headers for a cacheable response"""
+    return {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": CACHE_CONTROL,
+    }
@@ -0,0 +1,244 @@
+from datetime import datetime
+from typing import Dict, Optional, Set
+import asyncio
+import os
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.config.database import get_database
+
+
+# "memory" fans out events published by this process; "changestream" reads
+# them from a MongoDB change stream (requires a replica set) so every worker
+# sees writes made by every other worker.
+EVENT_BACKEND = os.getenv("EVENT_BACKEND", "memory")
+# Events buffered per subscriber before it is considered too slow
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+EVENT_MAX_SUBSCRIBERS = int(os.getenv("EVENT_MAX_SUBSCRIBERS", "1000"))
+# Streams a single user may hold open in this process, so one user cannot
+# take every slot of EVENT_MAX_SUBSCRIBERS
+EVENT_MAX_SUBSCRIBERS_PER_USER = int(os.getenv("EVENT_MAX_SUBSCRIBERS_PER_USER", "10"))
+
+# A delete-all job in drop mode renames the todos collection to this prefix
+# plus its job ID before dropping it
+DROPPED_TODOS_PREFIX = "todos_drop_"
+
+
+class TooManySubscribersError(Exception):
+    """Raised when the subscriber limit has been reached"""
+
+
+class TooManyUserSubscribersError(TooManySubscribersError):
+    """Raised when a user already holds the maximum number of subscriptions"""
+
+
+class Subscription:
+    """
+    A subscriber's bounded event queue
+
+    When the queue is full the subscriber is marked as overflowed instead of
+    blocking the publisher; it should resynchronize from the list endpoint.
+    A subscription with a ``user_id`` only receives that user's events.
+    """
+
+    def __init__(self, max_size: int, user_id: Optional[str] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.overflowed = False
+        self.user_id = user_id
+
+    def offer(self, event: dict):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class InProcessEventBus:
+    """Fan out todo change events to subscribers in this process"""
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE,
+                 max_subscribers: int = EVENT_MAX_SUBSCRIBERS,
+                 max_subscribers_per_user: int = EVENT_MAX_SUBSCRIBERS_PER_USER):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.max_subscribers_per_user = max_subscribers_per_user
+        self.subscribers: Set[Subscription] = set()
+        # User ID -> open subscriptions of that user
+        self.user_subscribers: Dict[str, int] = {}
+        self.sequence = 0
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def subscribe(self, user_id: Optional[str] = None) -> Subscription:
+        if user_id is not None and (
+            self.user_subscribers.get(user_id, 0) >= self.max_subscribers_per_user
+        ):
+            raise TooManyUserSubscribersError(
+                f"At most {self.max_subscribers_per_user} event streams may be open per user"
+            )
+        if len(self.subscribers) >= self.max_subscribers:
+            raise TooManySubscribersError("Too many event subscribers")
+        subscription = Subscription(self.queue_size, user_id)
+        self.subscribers.add(subscription)
+        if user_id is not None:
+            self.user_subscribers[user_id] = self.user_subscribers.get(user_id, 0) + 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription not in self.subscribers:
+            return
+        self.subscribers.discard(subscription)
+        if subscription.user_id is not None:
+            remaining = self.user_subscribers[subscription.user_id] - 1
+            if remaining:
+                self.user_subscribers[subscription.user_id] = remaining
+            else:
+                del self.user_subscribers[subscription.user_id]
+        if subscription.overflowed:
+            self.dropped_subscribers += 1
+
+    def publish(self, event_type: str, todo_id: Optional[str] = None,
+                user_id: Optional[str] = None, **fields):
+        """Publish a change made by this process to a user's todos"""
+        self._dispatch(event_type, todo_id, user_id, **fields)
+
+    def _dispatch(self, event_type: str, todo_id: Optional[str] = None,
+                  user_id: Optional[str] = None, **fields):
+        """Deliver an event to the subscribers of ``user_id`` (all if None)"""
+        self.sequence += 1
+        self.published += 1
+        event = {
+            "seq": self.sequence,
+            "type": event_type,
+            "id": todo_id,
+            "at": datetime.utcnow().isoformat(),
+            **fields
+        }
+        for subscription in self.subscribers:
+            if user_id is None or subscription.user_id in (None, user_id):
+                subscription.offer(event)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+
+class ChangeStreamEventBus(InProcessEventBus):
+    """
+    Fan out todo change events read from a MongoDB change stream
+
+    Local publishes are ignored: every write, including this process's own,
+    arrives through the change stream. The owner of an updated or deleted
+    todo is read from the post- or pre-image; deletes are only delivered when
+    pre-images are enabled on the collection (MongoDB 6.0+). A delete-all job
+    renaming the collection aside is reported as ``cleared`` to the job's
+    owner; other renames and drops of the collection are not delivered.
+    """
+
+    # Change stream operation type -> event type
+    OPERATION_TYPES = {
+        "insert": "created",
+        "update": "updated",
+        "replace": "updated",
+        "delete": "deleted",
+        "rename": "cleared",
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token = None
+        # Renaming or dropping the collection ends the stream with an
+        # invalidate event, which can only be resumed with start_after
+        self._invalidated = False
+
+    def publish(self, event_type: str, todo_id: Optional[str] = None,
+                user_id: Optional[str] = None, **fields):
+        pass
+
+    async def start(self):
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _watch(self):
+        while True:
+            try:
+                db = await get_database()
+                resume = "start_after" if self._invalidated else "resume_after"
+                async with db.todos.watch(
+                    full_document="updateLookup",
+                    full_document_before_change="whenAvailable",
+                    **{resume: self._resume_token},
+                ) as stream:
+                    async for change in stream:
+                        self._resume_token = stream.resume_token
+                        self._invalidated = change["operationType"] == "invalidate"
+                        event = await self._event_for(db, change)
+                        if event is not None:
+                            self._dispatch(*event)
+            except PyMongoError as e:
+                print(f"Todo change stream failed, retrying: {e}")
+                if isinstance(e, OperationFailure):
+                    # The resume point is no longer usable; start from now
+                    self._resume_token = None
+                await asyncio.sleep(1)
+
+    async def _event_for(self, db, change: dict) -> Optional[tuple]:
+        """
+        Return the (type, todo ID, user ID) to dispatch for a change, or None
+
+        Changes whose owner cannot be determined are skipped, so that they
+        are never sent to other users.
+        """
+        event_type = self.OPERATION_TYPES.get(change["operationType"])
+        if event_type is None:
+            return None
+        if event_type == "cleared":
+            user_id = await self._drop_owner(db, change)
+            return None if user_id is None else (event_type, None, str(user_id))
+
+        todo_id = (change.get("documentKey") or {}).get("_id")
+        document = change.get("fullDocument") or change.get("fullDocumentBeforeChange") or {}
+        user_id = document.get("userId")
+        if user_id is None:
+            return None
+        return event_type, str(todo_id) if todo_id else None, str(user_id)
+
+    async def _drop_owner(self, db, change: dict) -> Optional[ObjectId]:
+        """Return the owner of the delete-all job that renamed the collection"""
+        target = (change.get("to") or {}).get("coll", "")
+        job_id = target[len(DROPPED_TODOS_PREFIX):]
+        if not target.startswith(DROPPED_TODOS_PREFIX) or not ObjectId.is_valid(job_id):
+            return None
+        job = await db.jobs.find_one({"_id": ObjectId(job_id)}, {"userId": 1})
+        return job and job.get("userId")
+
+    def stats(self) -> dict:
+        return {**super().stats(), "backend": "changestream"}
+
+
+def create_event_bus() -> InProcessEventBus:
+    """Create the event bus selected by EVENT_BACKEND"""
+    if EVENT_BACKEND == "changestream":
+        return ChangeStreamEventBus()
+    return InProcessEventBus()
+
+
+event_bus = create_event_bus()
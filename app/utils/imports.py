@@ -0,0 +1,135 @@
+from typing import AsyncIterator, List, Tuple, Union
+import codecs
+import csv
+import json
+import os
+
+from pydantic import ValidationError
+
+from app.models.todo import TodoCreate
+
+
+# Longest line (or quoted CSV record) accepted in an import, in characters.
+# A valid todo is far shorter; the limit keeps a body without newlines from
+# being buffered whole.
+IMPORT_MAX_LINE_LENGTH = int(os.getenv("IMPORT_MAX_LINE_LENGTH", "65536"))
+
+
+class ImportFormatError(ValueError):
+    """Raised when the rest of an upload cannot be parsed"""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Split a stream of UTF-8 byte chunks into (line number, line) pairs
+
+    Only the current partial line is kept between chunks. A byte order mark
+    is skipped and invalid bytes are replaced.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    line_number = 0
+    async for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            line_number += 1
+            yield line_number, line.rstrip("\r")
+        if len(pending) > IMPORT_MAX_LINE_LENGTH:
+            raise ImportFormatError(
+                f"Line {line_number + 1} is longer than {IMPORT_MAX_LINE_LENGTH} characters"
+            )
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_number + 1, pending.rstrip("\r")
+
+
+async def parse_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Union[dict, str]]]:
+    """Yield (line number, object or error message) for each non-blank line"""
+    async for line_number, line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, "Expected a JSON object"
+            continue
+        yield line_number, row
+
+
+def parse_csv_record(lines: List[str]) -> List[str]:
+    return next(csv.reader(["\n".join(lines)]))
+
+
+async def parse_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Union[dict, str]]]:
+    """
+    Yield (line number, row or error message) for each CSV record after the header
+
+    The header names the columns; it must include ``title``. Empty cells are
+    left out of the row, so the TodoCreate defaults apply. Quoted fields may
+    span lines; a record is complete once its quotes are balanced.
+    """
+    header = None
+    record: List[str] = []
+    record_line = 0
+    quotes = 0
+    async for line_number, line in iter_lines(chunks):
+        if not record:
+            record_line = line_number
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            if sum(len(part) for part in record) > IMPORT_MAX_LINE_LENGTH:
+                raise ImportFormatError(f"Unterminated quoted field starting on line {record_line}")
+            continue
+        lines, record, quotes = record, [], 0
+        if not any(part.strip() for part in lines):
+            continue
+
+        try:
+            values = parse_csv_record(lines)
+        except csv.Error as e:
+            if header is None:
+                raise ImportFormatError(f"Invalid CSV header: {e}")
+            yield record_line, f"Invalid CSV: {e}"
+            continue
+
+        if header is None:
+            header = [name.strip() for name in values]
+            if "title" not in header:
+                raise ImportFormatError("The CSV header must include a title column")
+            continue
+        if len(values) != len(header):
+            yield record_line, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield record_line, {name: value for name, value in zip(header, values) if value != ""}
+
+    if record:
+        raise ImportFormatError(f"Unterminated quoted field starting on line {record_line}")
+
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        if detail["loc"] else detail["msg"]
+        for detail in error.errors()
+    )
+
+
+async def parse_todos(
+    chunks: AsyncIterator[bytes],
+    format: str
+) -> AsyncIterator[Tuple[int, Union[TodoCreate, str]]]:
+    """Yield (line number, TodoCreate or error message) for each row of an upload"""
+    rows = parse_csv(chunks) if format == "csv" else parse_ndjson(chunks)
+    async for line_number, row in rows:
+        if isinstance(row, str):
+            yield line_number, row
+            continue
+        try:
+            yield line_number, TodoCreate.model_validate(row)
+        except ValidationError as e:
+            yield line_number, validation_message(e)
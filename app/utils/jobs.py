@@ -0,0 +1,235 @@
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Set
+import asyncio
+import os
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from app.config.database import get_database
+
+
+# Jobs a single user may have pending or running at once
+JOB_MAX_ACTIVE_PER_USER = int(os.getenv("JOB_MAX_ACTIVE_PER_USER", "2"))
+# Active jobs without progress for this long are assumed to have died with
+# their worker and no longer count towards the limit
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "300"))
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+INTERRUPTED = "interrupted"
+ACTIVE_STATUSES = (PENDING, RUNNING)
+
+
+class TooManyJobsError(Exception):
+    """Raised when a user already has the maximum number of active jobs"""
+
+
+class JobProgress:
+    """Handle passed to a job's work function for reporting progress"""
+
+    def __init__(self, job_id: ObjectId):
+        self.job_id = job_id
+        self.processed = 0
+        self.total: Optional[int] = None
+
+    async def report(self, processed: int, total: Optional[int] = None):
+        """Record the number of items processed so far (and the total if known)"""
+        self.processed = processed
+        fields = {"processed": processed, "updatedAt": datetime.utcnow()}
+        if total is not None:
+            self.total = total
+            fields["total"] = total
+        db = await get_database()
+        await db.jobs.update_one({"_id": self.job_id}, {"$set": fields})
+
+
+class JobRunner:
+    """
+    Run long operations as background tasks of this process
+
+    Job state is stored in the ``jobs`` collection, so any worker can report
+    the progress of a job started by another. A TTL index removes jobs
+    JOB_RETENTION_SECONDS after they finish. Jobs still running at shutdown
+    are cancelled and marked ``interrupted``.
+
+    Each active job holds one of its user's JOB_MAX_ACTIVE_PER_USER slots in
+    the ``job_slots`` collection. A slot's _id is "<user ID>:<number>", so
+    claiming one is a single insert that concurrent submits cannot both win.
+    """
+
+    def __init__(self):
+        self.tasks: Set[asyncio.Task] = set()
+        # Job ID -> slot, for jobs of this process that have not finished
+        self._slots: Dict[ObjectId, str] = {}
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def submit(
+        self,
+        job_type: str,
+        user_id: str,
+        work: Callable[[JobProgress], Awaitable[Optional[dict]]],
+        params: Optional[dict] = None,
+        cleanup: Optional[Callable[[], None]] = None
+    ) -> dict:
+        """
+        Record a job and start ``work`` in the background
+
+        ``work`` receives a JobProgress and may return a result document that
+        is stored with the job. ``cleanup`` is called once the job has ended,
+        even if it was cancelled or failed before ``work`` started. Returns
+        the new job document.
+        """
+        db = await get_database()
+        job_id = ObjectId()
+        slot = await self._claim_slot(db, user_id, job_id)
+        if slot is None:
+            raise TooManyJobsError(
+                f"At most {JOB_MAX_ACTIVE_PER_USER} jobs may be active at once"
+            )
+
+        now = datetime.utcnow()
+        job = {
+            "_id": job_id,
+            "userId": ObjectId(user_id),
+            "type": job_type,
+            "status": PENDING,
+            "params": params or {},
+            "processed": 0,
+            "total": None,
+            "result": None,
+            "error": None,
+            "createdAt": now,
+            "updatedAt": now,
+            "startedAt": None,
+            "finishedAt": None,
+        }
+        try:
+            await db.jobs.insert_one(job)
+        except BaseException:
+            await db.job_slots.delete_one({"_id": slot, "jobId": job_id})
+            raise
+        self._slots[job_id] = slot
+
+        task = asyncio.create_task(self._run(job["_id"], work))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        if cleanup is not None:
+            # A task cancelled before its first step never runs _run, so
+            # clean up from the task rather than inside it
+            task.add_done_callback(lambda _: cleanup())
+        self.started += 1
+        return job
+
+    async def _claim_slot(self, db, user_id: str, job_id: ObjectId) -> Optional[str]:
+        """Take a free slot of the user for a job; None when all are held"""
+        slot_ids = [f"{user_id}:{number}" for number in range(JOB_MAX_ACTIVE_PER_USER)]
+        for attempt in range(2):
+            for slot_id in slot_ids:
+                try:
+                    await db.job_slots.insert_one({
+                        "_id": slot_id,
+                        "userId": ObjectId(user_id),
+                        "jobId": job_id,
+                        "createdAt": datetime.utcnow(),
+                    })
+                    return slot_id
+                except DuplicateKeyError:
+                    continue
+            if attempt or not await self._release_stale_slots(db, slot_ids):
+                return None
+        return None
+
+    async def _release_stale_slots(self, db, slot_ids: list) -> int:
+        """
+        Free slots whose job has finished or stopped reporting progress
+
+        A job stops reporting when its worker dies; JOB_STALE_SECONDS after
+        its last update it no longer counts towards the limit.
+        """
+        slots = await db.job_slots.find({"_id": {"$in": slot_ids}}).to_list(length=None)
+        live = {
+            job["_id"] for job in await db.jobs.find({
+                "_id": {"$in": [slot["jobId"] for slot in slots]},
+                "status": {"$in": list(ACTIVE_STATUSES)},
+                "updatedAt": {"$gte": datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)},
+            }, {"_id": 1}).to_list(length=None)
+        }
+        released = 0
+        for slot in slots:
+            if slot["jobId"] not in live:
+                # Matching the job keeps a slot another submit just took
+                result = await db.job_slots.delete_one({"_id": slot["_id"], "jobId": slot["jobId"]})
+                released += result.deleted_count
+        return released
+
+    async def _run(self, job_id: ObjectId, work):
+        progress = JobProgress(job_id)
+        try:
+            await self._update(job_id, status=RUNNING, startedAt=datetime.utcnow())
+            result = await work(progress)
+        except asyncio.CancelledError:
+            await self._finish(job_id, INTERRUPTED, error="Server shut down before the job finished")
+            raise
+        except Exception as e:
+            self.failed += 1
+            print(f"Job {job_id} failed: {e}")
+            await self._finish(job_id, FAILED, error=str(e))
+        else:
+            self.completed += 1
+            await self._finish(job_id, COMPLETED, result=result)
+
+    async def _update(self, job_id: ObjectId, **fields):
+        db = await get_database()
+        await db.jobs.update_one(
+            {"_id": job_id},
+            {"$set": {**fields, "updatedAt": datetime.utcnow()}}
+        )
+
+    async def _finish(self, job_id: ObjectId, job_status: str, **fields):
+        try:
+            await self._update(job_id, status=job_status, finishedAt=datetime.utcnow(), **fields)
+            slot = self._slots.pop(job_id, None)
+            if slot is not None:
+                db = await get_database()
+                await db.job_slots.delete_one({"_id": slot, "jobId": job_id})
+        except PyMongoError as e:
+            # A slot left behind is freed once the job counts as stale
+            print(f"Failed to record the outcome of job {job_id}: {e}")
+
+    async def get(self, job_id: str, user_id: str) -> Optional[dict]:
+        """Return a job of the user, or None"""
+        db = await get_database()
+        return await db.jobs.find_one({"_id": ObjectId(job_id), "userId": ObjectId(user_id)})
+
+    async def list_jobs(self, user_id: str, limit: int) -> list:
+        """Return the user's most recent jobs, newest first"""
+        db = await get_database()
+        return await db.jobs.find({"userId": ObjectId(user_id)}).sort(
+            "createdAt", -1
+        ).limit(limit).to_list(length=limit)
+
+    async def stop(self):
+        """Cancel running jobs and wait for them to record their state"""
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Jobs cancelled before they started never reached _run
+        for job_id in list(self._slots):
+            await self._finish(job_id, INTERRUPTED, error="Server shut down before the job started")
+
+    def stats(self) -> dict:
+        return {
+            "running": len(self.tasks),
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+job_runner = JobRunner()
@@ -0,0 +1,295 @@
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+import os
+import threading
+import time
+
+from pymongo import monitoring
+
+
+# Serve /metrics and collect request and MongoDB command metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    """Base class for labelled metrics rendered in Prometheus text format"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 thread_safe: bool = True):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        # Metrics only updated and rendered on the event loop thread skip the
+        # lock when updated; ones updated from driver threads need it
+        self.thread_safe = thread_safe
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self._samples(),
+        ]
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._add(labels, amount)
+
+    def _add(self, labels: Tuple[str, ...], amount: float):
+        if not self.thread_safe:
+            self._values[labels] = self._values.get(labels, 0) + amount
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {value}"
+            for labels, value in values
+        ]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self._add(labels, -amount)
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS, thread_safe: bool = True):
+        super().__init__(name, documentation, labels, thread_safe)
+        self.buckets = buckets
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def series(self, *labels: str) -> List[float]:
+        """
+        Return the mutable series for ``labels``, creating it if needed
+
+        Callers on the event loop thread may keep it and record into it
+        directly with ``record``, skipping the label lookup per observation.
+        """
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            return series
+
+    def record(self, series: List[float], value: float):
+        """Add an observation to a series returned by ``series``"""
+        if not self.thread_safe:
+            # Index len(buckets) is the +Inf bucket
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+            return
+        with self._lock:
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            # Index len(buckets) is the +Inf bucket
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(series)) for labels, series in self._values.items()]
+
+        lines = []
+        for labels, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = _format_labels(self.label_names, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            le = _format_labels(self.label_names, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+            lines.append(f"{self.name}_sum{label_text} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics plus callbacks that report gauges at scrape time"""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], Dict[str, float]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Dict[str, float]]):
+        """Register a callback returning {metric name: value} gauges"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, value in collector().items():
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# HTTP metrics are only touched on the event loop, so they skip locking
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+    thread_safe=False,
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed",
+    ("method",),
+    thread_safe=False,
+))
+http_response_size = registry.register(Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size by route template",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS,
+    thread_safe=False,
+))
+mongo_command_duration = registry.register(Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency by collection and command",
+    ("collection", "command", "outcome"),
+    buckets=MONGO_LATENCY_BUCKETS,
+))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency, in-flight requests and
+    response sizes
+
+    Requests are labelled with the matched route template (for example
+    /api/todos/{todo_id}) rather than the raw path, to keep cardinality low.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # (method, route template, status) -> (duration series, size series),
+        # so a request costs one dict lookup instead of two labelled updates
+        self._series: Dict[tuple, tuple] = {}
+
+    def _series_for(self, method: str, template: str, status_code: int) -> tuple:
+        key = (method, template, status_code)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = (
+                http_request_duration.series(method, template, str(status_code)),
+                http_response_size.series(method, template),
+            )
+        return series
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec(method)
+            template = getattr(scope.get("route"), "path", None) or "unmatched"
+            series = self._series.get((method, template, status_code))
+            if series is None:
+                series = self._series_for(method, template, status_code)
+            duration_series, size_series = series
+            http_request_duration.record(duration_series, elapsed)
+            http_response_size.record(size_series, size)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Record MongoDB command durations by collection and command name"""
+
+    def __init__(self):
+        self._collections: Dict[Tuple[int, int], str] = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        command = event.command
+        if event.command_name == "getMore":
+            return str(command.get("collection", ""))
+        value = command.get(event.command_name)
+        return value if isinstance(value, str) else ""
+
+    def started(self, event):
+        self._collections[(event.request_id, event.operation_id)] = self._collection(event)
+
+    def _record(self, event, outcome: str):
+        collection = self._collections.pop((event.request_id, event.operation_id), "")
+        mongo_command_duration.observe(
+            event.duration_micros / 1_000_000, collection, event.command_name, outcome
+        )
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+
+mongo_command_listener = MongoCommandListener()
@@ -0,0 +1,89 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Tuple, Union
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+
+# Page size limits for list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Ordering used by full-text search results
+RELEVANCE_SORT = "relevance"
+
+# Supported sort orders, keyed by the public ``sort`` value. Each order is a
+# (field, direction) pair followed by _id as a unique tie-breaker.
+SORT_ORDERS = {
+    "createdAt": [("createdAt", ASCENDING), ("_id", ASCENDING)],
+    "-createdAt": [("createdAt", DESCENDING), ("_id", DESCENDING)],
+    RELEVANCE_SORT: [("score", DESCENDING), ("_id", ASCENDING)],
+}
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(todo: dict, sort: str) -> str:
+    """Encode the sort position of a document as an opaque cursor"""
+    field = SORT_ORDERS[sort][0][0]
+    value = todo[field]
+    payload = {
+        "v": value.isoformat() if isinstance(value, datetime) else value,
+        "i": str(todo["_id"]),
+        "s": sort,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Union[datetime, float], ObjectId]:
+    """Decode an opaque cursor back into its (sort value, _id) position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor_sort = payload["s"]
+        if cursor_sort != sort:
+            raise InvalidCursorError("Cursor does not match the requested sort order")
+        if sort == RELEVANCE_SORT:
+            value = float(payload["v"])
+        else:
+            value = datetime.fromisoformat(payload["v"])
+        todo_id = ObjectId(payload["i"])
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+
+    return value, todo_id
+
+
+def keyset_filter(cursor: Optional[str], sort: str) -> dict:
+    """
+    Build the filter that selects documents after the cursor position
+
+    Documents are ordered by (sort field, _id), so the filter only needs to
+    compare against the last document of the previous page.
+    """
+    if not cursor:
+        return {}
+
+    value, todo_id = decode_cursor(cursor, sort)
+    (field, field_direction), (_, id_direction) = SORT_ORDERS[sort]
+    field_op = "$gt" if field_direction == ASCENDING else "$lt"
+    id_op = "$gt" if id_direction == ASCENDING else "$lt"
+    return {
+        "$or": [
+            {field: {field_op: value}},
+            {field: value, "_id": {id_op: todo_id}},
+        ]
+    }
+
+
+def keyset_sort(sort: str) -> list:
+    """Sort specification matching the keyset filter"""
+    return SORT_ORDERS[sort]
@@ -0,0 +1,338 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import math
+import os
+import time
+
+from fastapi.responses import JSONResponse
+
+
+class MemoryRateLimitStore:
+    """
+    Token buckets held in process memory
+
+    Buckets are kept in LRU order and the least recently used is dropped when
+    ``max_keys`` is exceeded; a dropped bucket starts again full.
+    """
+
+    name = "memory"
+    # Exceptions that mean the store is unavailable (none for memory)
+    errors = ()
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    async def take(self, key: str, burst: int, rate: float) -> float:
+        """
+        Take a token from the bucket for ``key``
+
+        Returns 0 when a token was available, otherwise the seconds until one
+        will be.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(burst), now]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "buckets": len(self._buckets)}
+
+
+# Refill and take atomically so every worker sees the same bucket
+TAKE_SCRIPT = """
+local burst = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "ts", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitStore:
+    """Token buckets in any Redis-protocol server, shared by all workers"""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "todolist:ratelimit:"):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self._take = self._client.register_script(TAKE_SCRIPT)
+        self._prefix = prefix
+        self.errors = (redis.RedisError,)
+
+    async def take(self, key: str, burst: int, rate: float) -> float:
+        retry_after = await self._take(
+            keys=[self._prefix + key], args=[burst, rate, time.time()]
+        )
+        return float(retry_after)
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+def parse_limit(spec: str) -> Tuple[int, float]:
+    """Parse ``count/seconds`` into (burst, tokens per second)"""
+    count, _, seconds = spec.partition("/")
+    burst = int(count)
+    period = float(seconds or 1)
+    if burst <= 0 or period <= 0:
+        raise ValueError(f"Invalid rate limit {spec!r}: count and seconds must be positive")
+    return burst, burst / period
+
+
+def parse_rules(spec: str) -> Dict[Tuple[str, str], Tuple[int, float]]:
+    """
+    Parse ``METHOD /route/template=count/seconds`` rules separated by commas
+    """
+    rules = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, limit = item.rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        rules[(method.upper(), path.strip())] = parse_limit(limit)
+    return rules
+
+
+class RateLimiter:
+    """
+    Per-client, per-route token buckets plus a global in-flight request cap
+
+    Routes are identified by method and route template. Routes without a rule
+    use ``default_limit`` when one is set and are unlimited otherwise. Store
+    failures let the request through.
+    """
+
+    def __init__(self, store, rules: dict, default_limit: Optional[Tuple[int, float]] = None,
+                 max_in_flight: int = 0, enabled: bool = True):
+        self.store = store
+        self.rules = rules
+        self.default_limit = default_limit
+        self.max_in_flight = max_in_flight
+        self.enabled = enabled
+        self.in_flight = 0
+        self.limited = 0
+        self.shed = 0
+        self.errors = 0
+
+    def limit_for(self, method: str, template: Optional[str]) -> Optional[Tuple[int, float]]:
+        return self.rules.get((method, template), self.default_limit)
+
+    async def check(self, client: str, method: str, template: str,
+                    limit: Tuple[int, float]) -> float:
+        """Return 0 if the client may proceed, otherwise seconds to wait"""
+        burst, rate = limit
+        try:
+            retry_after = await self.store.take(f"{client}:{method} {template}", burst, rate)
+        except self.store.errors:
+            self.errors += 1
+            return 0.0
+        if retry_after:
+            self.limited += 1
+        return retry_after
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "limited": self.limited,
+            "shed": self.shed,
+            "errors": self.errors,
+            **self.store.stats(),
+        }
+
+
+def _retry_response(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying the rate limiter before routing
+
+    ``routes`` is the application's route list, used to resolve the route
+    template of each request the same way the router does.
+    """
+
+    def __init__(self, app, routes: list, limiter: "RateLimiter" = None,
+                 exempt_paths: Tuple[str, ...] = (), trust_forwarded: bool = None,
+                 trusted_hops: int = None, client_ip_header: str = None):
+        self.app = app
+        self.routes = routes
+        self.limiter = limiter or rate_limiter
+        self.exempt_paths = exempt_paths
+        self.trust_forwarded = RATE_LIMIT_TRUST_FORWARDED if trust_forwarded is None else trust_forwarded
+        self.trusted_hops = max(1, RATE_LIMIT_TRUSTED_HOPS if trusted_hops is None else trusted_hops)
+        header = RATE_LIMIT_CLIENT_IP_HEADER if client_ip_header is None else client_ip_header
+        self.client_ip_header = header.lower().encode("latin-1") if header else None
+        # Built on first use because routers are included after the
+        # middleware is added
+        self._static_routes = None
+        self._dynamic_routes = None
+
+    def _index_routes(self):
+        """
+        Map literal paths directly to their template and keep the routes
+        with path parameters for regex matching, preserving router order
+        """
+        static = {}
+        dynamic = []
+        for route in self.routes:
+            path_regex = getattr(route, "path_regex", None)
+            if path_regex is None:
+                continue
+            methods = getattr(route, "methods", None) or ()
+            if "{" in route.path:
+                dynamic.append((path_regex, methods, route.path))
+                continue
+            for method in methods:
+                # An earlier parameterized route would shadow this one
+                shadowed = any(
+                    method in earlier_methods and regex.match(route.path)
+                    for regex, earlier_methods, _ in dynamic
+                )
+                if not shadowed:
+                    static.setdefault((method, route.path), route.path)
+        self._static_routes = static
+        self._dynamic_routes = dynamic
+
+    def resolve_template(self, method: str, path: str) -> Optional[str]:
+        """Return the template of the route the router would pick"""
+        if self._static_routes is None:
+            self._index_routes()
+        template = self._static_routes.get((method, path))
+        if template is not None:
+            return template
+        for path_regex, methods, template in self._dynamic_routes:
+            if method in methods and path_regex.match(path):
+                return template
+        return None
+
+    def client_address(self, scope) -> str:
+        """
+        Address identifying the client
+
+        Behind proxies, clients can put anything in X-Forwarded-For, but each
+        trusted proxy appends the address it received the request from, so
+        the client is ``trusted_hops`` entries from the right. A header set
+        by the edge proxy (such as Fly-Client-IP) takes precedence.
+        """
+        client = scope["client"][0] if scope.get("client") else "unknown"
+        if not self.trust_forwarded:
+            return client
+        forwarded = []
+        for name, value in scope["headers"]:
+            if name == self.client_ip_header and value.strip():
+                return value.decode("latin-1").strip()
+            if name == b"x-forwarded-for":
+                forwarded.extend(value.decode("latin-1").split(","))
+        forwarded = [address.strip() for address in forwarded if address.strip()]
+        if not forwarded:
+            return client
+        return forwarded[max(0, len(forwarded) - self.trusted_hops)]
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter
+        if scope["type"] != "http" or not limiter.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        path = scope["path"]
+        template = self.resolve_template(method, path)
+        limit = limiter.limit_for(method, template)
+        if limit is not None:
+            client = self.client_address(scope)
+            retry_after = await limiter.check(client, method, template or path, limit)
+            if retry_after:
+                response = _retry_response(429, "Too many requests", retry_after)
+                await response(scope, receive, send)
+                return
+
+        if not limiter.max_in_flight or path in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if limiter.in_flight >= limiter.max_in_flight:
+            limiter.shed += 1
+            response = _retry_response(503, "Server is busy, please retry", 1)
+            await response(scope, receive, send)
+            return
+
+        limiter.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.in_flight -= 1
+
+
+# Rate limiting. RATE_LIMIT_ENABLED is the kill switch.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# "memory" keeps buckets per process; "redis" shares them across workers
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+RATE_LIMIT_RULES = os.getenv(
+    "RATE_LIMIT_RULES",
+    "POST /api/auth/login=10/60,"
+    "POST /api/auth/register=5/60,"
+    "POST /api/auth/refresh=30/60,"
+    "POST /api/todos/import=10/60,"
+    "GET /api/todos/search=60/60"
+)
+# Limit for every other route, e.g. "100/1"; unlimited when empty
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "")
+# Identify clients by forwarded addresses (behind a proxy) instead of the peer
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+# Proxies in front of the application that append to X-Forwarded-For; the
+# client is this many entries from the right
+RATE_LIMIT_TRUSTED_HOPS = int(os.getenv("RATE_LIMIT_TRUSTED_HOPS", "1"))
+# Header holding the client address set by the edge proxy, e.g. Fly-Client-IP;
+# used before X-Forwarded-For when present
+RATE_LIMIT_CLIENT_IP_HEADER = os.getenv("RATE_LIMIT_CLIENT_IP_HEADER", "")
+# Requests processed at once before new ones are shed with 503; 0 disables
+MAX_IN_FLIGHT_REQUESTS = int(os.getenv("MAX_IN_FLIGHT_REQUESTS", "0"))
+
+
+def create_rate_limiter() -> RateLimiter:
+    """Create the rate limiter configured by the RATE_LIMIT_* settings"""
+    if RATE_LIMIT_BACKEND == "redis":
+        store = RedisRateLimitStore(RATE_LIMIT_REDIS_URL)
+    else:
+        store = MemoryRateLimitStore()
+    return RateLimiter(
+        store,
+        parse_rules(RATE_LIMIT_RULES),
+        default_limit=parse_limit(RATE_LIMIT_DEFAULT) if RATE_LIMIT_DEFAULT else None,
+        max_in_flight=MAX_IN_FLIGHT_REQUESTS,
+        enabled=RATE_LIMIT_ENABLED,
+    )
+
+
+rate_limiter = create_rate_limiter()
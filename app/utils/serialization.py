@@ -0,0 +1,54 @@
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _json_default(value):
+    """Encode values the stdlib JSON encoder does not handle"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(data) -> bytes:
+    """
+    Serialize data to compact JSON bytes
+
+    Uses orjson when it is installed and falls back to the stdlib encoder.
+    Datetimes are written in ISO 8601 format either way.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default)
+    return json.dumps(
+        data,
+        default=_json_default,
+        ensure_ascii=False,
+        separators=(",", ":")
+    ).encode()
+
+
+def encode_todo(todo: dict) -> bytes:
+    """Serialize a MongoDB todo document for caching"""
+    return dumps({
+        "_id": str(todo["_id"]),
+        "title": todo["title"],
+        "description": todo.get("description"),
+        "completed": todo["completed"],
+        "createdAt": todo["createdAt"],
+        "updatedAt": todo["updatedAt"]
+    })
+
+
+def decode_todo(data: bytes) -> dict:
+    """Restore a MongoDB todo document serialized by encode_todo"""
+    todo = json.loads(data)
+    todo["_id"] = ObjectId(todo["_id"])
+    todo["createdAt"] = datetime.fromisoformat(todo["createdAt"])
+    todo["updatedAt"] = datetime.fromisoformat(todo["updatedAt"])
+    return todo
@@ -0,0 +1,146 @@
+from datetime import datetime
+from typing import Optional
+import os
+
+from app.utils.cache import TTLCache
+
+
+# Seconds after which a user's counters are recounted from MongoDB on the
+# next read
+TODO_STATS_RECONCILE_SECONDS = float(os.getenv("TODO_STATS_RECONCILE_SECONDS", "300"))
+# Number of users whose counters are kept in memory
+TODO_STATS_MAX_USERS = int(os.getenv("TODO_STATS_MAX_USERS", "10000"))
+
+
+class TodoStats:
+    """
+    In-process todo counters maintained by the write handlers
+
+    Reads are O(1). The counters only see writes made by this process, so
+    they are periodically reconciled against the collection.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.completed = 0
+        self.initialized = False
+        self.reconciled_at: Optional[datetime] = None
+        # Incremented by every change, so a recount can tell whether a write
+        # was applied while it was counting
+        self.version = 0
+
+    def apply(self, total_delta: int = 0, completed_delta: int = 0):
+        """Adjust the counters after a successful write"""
+        self.total += total_delta
+        self.completed += completed_delta
+        self.version += 1
+
+    def reset(self):
+        """Set the counters to zero after the collection has been emptied"""
+        self.total = 0
+        self.completed = 0
+        self.initialized = True
+        self.version += 1
+
+    def invalidate(self):
+        """Force the next read to recount from the collection"""
+        self.initialized = False
+        self.version += 1
+
+    async def recount(self, db, query: Optional[dict] = None) -> dict:
+        """
+        Count the todos matching ``query`` and return them as a snapshot
+
+        The counts replace the counters only if no change was applied while
+        counting: the count may or may not include that write, so keeping
+        it could lose or double count it. The counters then stay
+        uninitialized and the next read counts again.
+        """
+        version = self.version
+        total = 0
+        completed = 0
+        pipeline = [
+            {"$match": query or {}},
+            {"$group": {"_id": "$completed", "count": {"$sum": 1}}}
+        ]
+        async for group in db.todos.aggregate(pipeline):
+            total += group["count"]
+            if group["_id"] is True:
+                completed += group["count"]
+
+        counted_at = datetime.utcnow()
+        if self.version == version:
+            self.total = total
+            self.completed = completed
+            self.initialized = True
+            self.reconciled_at = counted_at
+        return {
+            "total": total,
+            "completed": completed,
+            "active": total - completed,
+            "reconciledAt": counted_at
+        }
+
+    def snapshot(self) -> dict:
+        """Return the current counters"""
+        return {
+            "total": self.total,
+            "completed": self.completed,
+            "active": self.total - self.completed,
+            "reconciledAt": self.reconciled_at
+        }
+
+
+class UserTodoStats:
+    """
+    Todo counters per user
+
+    Counters for the most recently active users are kept in a bounded cache.
+    An entry expires ``ttl`` seconds after it was created, so the next read
+    recounts that user's todos from the collection.
+    """
+
+    def __init__(self, max_users: int, ttl: float):
+        self._stats = TTLCache(max_size=max_users, ttl=ttl)
+
+    def for_user(self, user_id: str) -> TodoStats:
+        """Return the counters of a user, uninitialized if not cached"""
+        stats = self._stats.get(user_id)
+        if stats is None:
+            stats = TodoStats()
+            self._stats.set(user_id, stats)
+        return stats
+
+    def apply(self, user_id: str, total_delta: int = 0, completed_delta: int = 0):
+        """
+        Adjust a user's counters after a successful write
+
+        Counters that would leave the valid range missed a write, so they are
+        dropped and recounted on the next read instead of being served.
+        """
+        stats = self._stats.get(user_id)
+        if stats is None:
+            return
+        stats.apply(total_delta, completed_delta)
+        if stats.initialized and (stats.total < 0 or not 0 <= stats.completed <= stats.total):
+            stats.invalidate()
+            self._stats.delete(user_id)
+
+    def reset(self, user_id: str):
+        """Set a user's counters to zero after their todos have been deleted"""
+        self.for_user(user_id).reset()
+
+    def invalidate(self, user_id: str):
+        """Force the next read of a user's counters to recount"""
+        stats = self._stats.get(user_id)
+        if stats is not None:
+            # Also discards a recount in progress
+            stats.invalidate()
+            self._stats.delete(user_id)
+
+
+todo_stats = UserTodoStats(
+    max_users=TODO_STATS_MAX_USERS,
+    # Reconciliation happens by expiry; 0 keeps counters for a very long time
+    ttl=TODO_STATS_RECONCILE_SECONDS or float("inf")
+)
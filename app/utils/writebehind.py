@@ -0,0 +1,188 @@
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import os
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.config.database import get_database
+
+
+# Queue PATCH completion toggles in memory and write them in batches
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+# Maximum time a toggle waits before being written
+WRITE_BEHIND_FLUSH_MS = float(os.getenv("WRITE_BEHIND_FLUSH_MS", "250"))
+# Number of queued todos that triggers an immediate flush
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "500"))
+
+
+class ToggleQueue:
+    """
+    In-process write-behind buffer for todo completion toggles
+
+    Repeated toggles of the same todo collapse into the latest value. Pending
+    toggles are written with one unordered bulk_write when the queue reaches
+    ``max_pending`` entries or ``flush_ms`` after the first queued toggle.
+    ``on_flush`` is awaited with the (todo ID, user ID) pairs written by each
+    flush. Writes that fail with a database error stay queued and are retried
+    on the next flush; any other error drops the batch, since retrying it
+    would fail the same way.
+    """
+
+    def __init__(self, flush_ms: float = WRITE_BEHIND_FLUSH_MS,
+                 max_pending: int = WRITE_BEHIND_MAX_PENDING,
+                 enabled: bool = WRITE_BEHIND_ENABLED):
+        self.flush_interval = flush_ms / 1000
+        self.max_pending = max_pending
+        self.enabled = enabled
+        self.on_flush: Optional[Callable[[List[Tuple[str, str]]], Awaitable[None]]] = None
+        # (todo ID, owner user ID) -> (completed, updatedAt)
+        self.pending: Dict[Tuple[str, str], Tuple[bool, datetime]] = {}
+        # Entries taken by a flush that has not finished writing yet
+        self.flushing: Dict[Tuple[str, str], Tuple[bool, datetime]] = {}
+        self.queued = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.written = 0
+        # Toggles written that matched no todo (deleted since they were queued)
+        self.unmatched = 0
+        self.failures = 0
+        self.dropped = 0
+        self._lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, todo_id: str, user_id: str, completed: bool, updated_at: datetime):
+        """Queue a completion change, replacing any pending one for the todo"""
+        key = (todo_id, user_id)
+        if key in self.pending:
+            self.coalesced += 1
+        self.pending[key] = (completed, updated_at)
+        self.queued += 1
+        if self._wakeup is not None and (
+            len(self.pending) == 1 or len(self.pending) >= self.max_pending
+        ):
+            self._wakeup.set()
+
+    def is_queued(self, todo_id: str, user_id: str) -> bool:
+        """Whether a toggle of the user's todo is waiting to be written"""
+        key = (todo_id, user_id)
+        return key in self.pending or key in self.flushing
+
+    def overlay(self, todo: dict, user_id: str) -> dict:
+        """Apply a toggle that has not been written yet to a user's todo"""
+        key = (str(todo["_id"]), user_id)
+        change = self.pending.get(key) or self.flushing.get(key)
+        if change is None:
+            return todo
+        completed, updated_at = change
+        return {**todo, "completed": completed, "updatedAt": updated_at}
+
+    async def flush(self):
+        """Write every pending toggle now"""
+        async with self._lock:
+            if not self.pending:
+                return
+            self.flushing, self.pending = self.pending, {}
+            try:
+                requests = [
+                    # Matching the owner keeps toggles of other users' todos no-ops
+                    UpdateOne(
+                        {"_id": ObjectId(todo_id), "userId": ObjectId(user_id)},
+                        {"$set": {"completed": completed, "updatedAt": updated_at}}
+                    )
+                    for (todo_id, user_id), (completed, updated_at) in self.flushing.items()
+                ]
+                db = await get_database()
+                result = await db.todos.bulk_write(requests, ordered=False)
+            except (PyMongoError, asyncio.CancelledError):
+                # Includes cancellation on shutdown, so stop() can drain.
+                # Keep newer toggles queued after the flush started.
+                self.failures += 1
+                for key, change in self.flushing.items():
+                    self.pending.setdefault(key, change)
+                raise
+            except Exception:
+                self.failures += 1
+                self.dropped += len(self.flushing)
+                raise
+            finally:
+                written = list(self.flushing)
+                self.flushing = {}
+
+            self.flushes += 1
+            self.written += len(written)
+            unmatched = len(written) - result.matched_count
+            if unmatched:
+                self.unmatched += unmatched
+                print(f"Write-behind flush: {unmatched} of {len(written)} toggles matched no todo")
+            if self.on_flush is not None:
+                await self.on_flush(written)
+
+    async def flush_pending(self):
+        """Flush before a read or write that must see queued toggles"""
+        if self.pending or self.flushing:
+            await self.flush()
+
+    async def _run(self):
+        while True:
+            # Woken by the first toggle queued after a flush
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if len(self.pending) < self.max_pending:
+                # Collect more toggles unless the queue fills up first
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+            try:
+                await self.flush()
+            except PyMongoError as e:
+                print(f"Write-behind flush failed: {e}")
+                await asyncio.sleep(self.flush_interval)
+            except Exception as e:
+                # Keep the flusher alive for the toggles queued later
+                print(f"Write-behind flush failed, batch dropped: {e!r}")
+            if self.pending:
+                self._wakeup.set()
+
+    async def start(self):
+        """Start the background flusher if write-behind is enabled"""
+        if not self.enabled or self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background flusher and drain the queue"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        try:
+            await self.flush_pending()
+        except Exception as e:
+            print(f"Write-behind drain failed, {len(self.pending)} toggles lost: {e!r}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self.pending),
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "written": self.written,
+            "unmatched": self.unmatched,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+
+toggle_queue = ToggleQueue()
@@ -0,0 +1,338 @@
+"""
+HTTP load benchmark for the API with baseline regression checks.
+
+Seeds a dedicated benchmark database with synthetic users and todos spread
+over them, then drives the ASGI app in app.main in-process with concurrent
+async clients, each signed in as one of the users, across a weighted mix of
+endpoints. Reports throughput and p50/p95/p99 latency per endpoint as JSON.
+With --baseline, compares against a stored result and exits non-zero when
+any endpoint regresses by more than --threshold percent.
+
+--backend memory runs against an in-memory MongoDB stand-in (requires the
+mongomock-motor package) for quick relative comparisons; it does not support
+text search, so search uses prefix mode there. Absolute numbers are only
+meaningful against a real MongoDB server.
+
+Usage:
+    MONGODB_URL=mongodb://localhost:27017 python -m benchmarks.api_load_benchmark \\
+        --todos 100000 --concurrency 32 --requests 20000 --output results.json
+    python -m benchmarks.api_load_benchmark --baseline baseline.json --threshold 10
+    python -m benchmarks.api_load_benchmark --backend memory --todos 5000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.config import database
+from app.config.indexes import ensure_indexes
+from app.main import app
+from app.utils.auth import create_access_token, get_password_hash, issue_refresh_token
+from app.utils.ratelimit import rate_limiter
+from benchmarks.search_benchmark import SEED_BATCH_SIZE, WORDS, make_todo
+
+
+DEFAULT_MIX = "list=30,search=15,get=30,create=10,update=10,login=5"
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+PASSWORD = "benchmark-password"
+# Seeded todo ids per user kept in memory for get/update requests
+MAX_SAMPLED_IDS = 1000
+
+
+class LoadState:
+    """The user a simulated client is signed in as and that user's todos"""
+
+    def __init__(self, email: str, todo_ids: list, search_mode: str, refresh_token: str):
+        self.email = email
+        self.todo_ids = todo_ids
+        self.search_mode = search_mode
+        self.refresh_token = refresh_token
+        self.headers = {
+            "Authorization": f"Bearer {create_access_token(data={'sub': email})}"
+        }
+
+
+async def list_todos(client, rng, state):
+    completed = rng.choice(["", "&completed=true", "&completed=false"])
+    return await client.get(f"/api/todos?limit=20{completed}", headers=state.headers)
+
+
+async def search_todos(client, rng, state):
+    term = rng.choice(WORDS)
+    if state.search_mode == "prefix":
+        term = term.capitalize()
+    return await client.get(
+        "/api/todos/search",
+        params={"title": term, "mode": state.search_mode, "limit": 20},
+        headers=state.headers
+    )
+
+
+async def get_todo(client, rng, state):
+    return await client.get(f"/api/todos/{rng.choice(state.todo_ids)}", headers=state.headers)
+
+
+async def create_todo(client, rng, state):
+    title = " ".join(rng.choices(WORDS, k=rng.randint(2, 5))).capitalize()
+    return await client.post("/api/todos", json={"title": title}, headers=state.headers)
+
+
+async def update_todo(client, rng, state):
+    return await client.put(
+        f"/api/todos/{rng.choice(state.todo_ids)}",
+        json={"completed": rng.random() < 0.5},
+        headers=state.headers
+    )
+
+
+async def login(client, rng, state):
+    return await client.post(
+        "/api/auth/login",
+        json={"email": state.email, "password": PASSWORD}
+    )
+
+
+async def refresh(client, rng, state):
+    response = await client.post(
+        "/api/auth/refresh",
+        json={"refresh_token": state.refresh_token}
+    )
+    if response.status_code == 200:
+        # Refresh tokens are single use
+        state.refresh_token = response.json()["refresh_token"]
+    return response
+
+
+ENDPOINTS = {
+    "list": list_todos,
+    "search": search_todos,
+    "get": get_todo,
+    "create": create_todo,
+    "update": update_todo,
+    "login": login,
+    "refresh": refresh,
+}
+
+
+def parse_mix(mix: str) -> dict:
+    """Parse ``name=weight,...`` into a weight per endpoint"""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint {name!r}, expected one of {sorted(ENDPOINTS)}")
+        weights[name] = float(weight)
+    return weights
+
+
+async def seed(db, todos: int, users: int) -> dict:
+    """Replace the benchmark data and return sampled todo ids by user email"""
+    await db.todos.drop()
+    await db.users.drop()
+
+    # Hash once; every benchmark user shares the password
+    hashed_password = get_password_hash(PASSWORD)
+    now = datetime.utcnow()
+    emails = [f"bench{i}@example.com" for i in range(users)]
+    result = await db.users.insert_many([
+        {
+            "email": email,
+            "username": f"bench{i}",
+            "hashed_password": hashed_password,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        for i, email in enumerate(emails)
+    ])
+    user_ids = result.inserted_ids
+
+    todo_ids = {email: [] for email in emails}
+    start = datetime.utcnow() - timedelta(seconds=todos)
+    for offset in range(0, todos, SEED_BATCH_SIZE):
+        indexes = range(offset, min(offset + SEED_BATCH_SIZE, todos))
+        batch = [make_todo(i, start, user_ids[i % users]) for i in indexes]
+        result = await db.todos.insert_many(batch, ordered=False)
+        for i, todo_id in zip(indexes, result.inserted_ids):
+            todo_ids[emails[i % users]].append(str(todo_id))
+
+    await ensure_indexes(db)
+
+    sampler = random.Random(0)
+    return {
+        email: ids if len(ids) <= MAX_SAMPLED_IDS else sampler.sample(ids, MAX_SAMPLED_IDS)
+        for email, ids in todo_ids.items()
+    }
+
+
+async def run_client(client, rng, state, weights: dict, count: int, samples: dict):
+    """Issue ``count`` requests picked from the weighted endpoint mix"""
+    names = list(weights)
+    cumulative = list(weights.values())
+    for _ in range(count):
+        name = rng.choices(names, weights=cumulative)[0]
+        started = time.perf_counter()
+        try:
+            response = await ENDPOINTS[name](client, rng, state)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        samples[name].append(((time.perf_counter() - started) * 1000, ok))
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[max(0, int(len(sorted_values) * fraction) - 1)]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """Summarize (latency_ms, ok) samples"""
+    latencies = sorted(latency for latency, _ in samples)
+    summary = {
+        "requests": len(samples),
+        "errors": sum(1 for _, ok in samples if not ok),
+        "throughput_rps": round(len(samples) / elapsed, 1),
+    }
+    if latencies:
+        summary.update({
+            "p50_ms": round(latencies[len(latencies) // 2], 3),
+            "p95_ms": round(percentile(latencies, 0.95), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+        })
+    return summary
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return a description of every metric that regressed past ``threshold`` percent"""
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous:
+            continue
+        for metric in LATENCY_METRICS:
+            if metric in current and previous.get(metric):
+                change = (current[metric] - previous[metric]) / previous[metric] * 100
+                if change > threshold:
+                    regressions.append(
+                        f"{name} {metric}: {previous[metric]} -> {current[metric]} (+{change:.1f}%)"
+                    )
+        if previous.get("throughput_rps"):
+            change = (previous["throughput_rps"] - current["throughput_rps"]) \
+                / previous["throughput_rps"] * 100
+            if change > threshold:
+                regressions.append(
+                    f"{name} throughput_rps: {previous['throughput_rps']} -> "
+                    f"{current['throughput_rps']} (-{change:.1f}%)"
+                )
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=["mongo", "memory"], default="mongo")
+    parser.add_argument("--database", default="todolist_benchmark")
+    parser.add_argument("--todos", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=10,
+                        help="Users the todos are spread over; clients sign in as them")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"Weighted endpoint mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the request mix")
+    parser.add_argument("--output", help="Write the results JSON to this file")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Fail when a metric regresses by more than this percentage")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    if args.users < 1:
+        raise SystemExit("--users must be at least 1")
+    if args.todos < args.users:
+        weights.pop("get", None)
+        weights.pop("update", None)
+
+    database.MONGODB_DATABASE = args.database
+    # Every simulated client shares one address
+    rate_limiter.enabled = False
+    if args.backend == "memory":
+        from mongomock_motor import AsyncMongoMockClient
+
+        # connect_to_mongo keeps an existing client
+        database.db.client = AsyncMongoMockClient()
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        db = await database.get_database()
+        print(f"Seeding {args.todos} todos and {args.users} users...")
+        todo_ids = await seed(db, args.todos, args.users)
+        search_mode = "prefix" if args.backend == "memory" else "text"
+        emails = list(todo_ids)
+        users = {user["email"]: user["_id"] async for user in db.users.find({}, {"email": 1})}
+        states = []
+        for i in range(args.concurrency):
+            email = emails[i % len(emails)]
+            refresh_token = await issue_refresh_token(db, users[email], email)
+            states.append(LoadState(email, todo_ids[email], search_mode, refresh_token))
+
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                per_client = max(1, args.requests // args.concurrency)
+                warmup = max(1, args.warmup // args.concurrency)
+                samples = {name: [] for name in weights}
+
+                await asyncio.gather(*(
+                    run_client(client, random.Random(-i - 1), states[i], weights, warmup,
+                               {name: [] for name in weights})
+                    for i in range(args.concurrency)
+                ))
+
+                print(f"Running {per_client * args.concurrency} requests "
+                      f"with {args.concurrency} clients...")
+                started = time.perf_counter()
+                await asyncio.gather(*(
+                    run_client(client, random.Random(args.seed + i), states[i], weights,
+                               per_client, samples)
+                    for i in range(args.concurrency)
+                ))
+                elapsed = time.perf_counter() - started
+        finally:
+            await database.db.client.drop_database(args.database)
+
+    results = {
+        "config": {
+            "backend": args.backend,
+            "todos": args.todos,
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "mix": weights,
+            "seed": args.seed,
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "total": summarize([s for values in samples.values() for s in values], elapsed),
+        "endpoints": {name: summarize(values, elapsed) for name, values in samples.items()},
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions over {args.threshold}%:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions over {args.threshold}% against {args.baseline}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
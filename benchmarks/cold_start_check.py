@@ -0,0 +1,90 @@
+"""
+Fail when application cold start regresses.
+
+Profiles cold starts with app.startup_profile and checks the median time to
+serve the first request (import, lifespan startup and first request,
+excluding interpreter start) against --max-ms and/or a stored baseline.
+Exits non-zero on a regression and lists the packages whose import time
+grew the most, which usually points at the new dependency or eager import.
+
+Timings vary between machines, so baselines should be recorded on the same
+runner type that checks against them.
+
+Usage:
+    python -m benchmarks.cold_start_check --output cold_start.json
+    python -m benchmarks.cold_start_check --baseline cold_start.json --threshold 20
+    python -m benchmarks.cold_start_check --max-ms 1500
+"""
+import argparse
+import json
+import sys
+
+from app.startup_profile import profile
+
+
+COLD_START_PHASES = ("import", "startup", "first_request")
+
+
+def cold_start_ms(result: dict) -> float:
+    return round(sum(result["phases_ms"].get(phase, 0) for phase in COLD_START_PHASES), 2)
+
+
+def package_growth(result: dict, baseline: dict, limit: int = 5) -> list:
+    """Return the packages whose import time grew the most since the baseline"""
+    previous = baseline.get("packages_ms", {})
+    growth = [
+        (name, ms - previous.get(name, 0))
+        for name, ms in result["packages_ms"].items()
+    ]
+    growth.sort(key=lambda item: -item[1])
+    return [f"{name}: +{delta:.1f}ms" for name, delta in growth[:limit] if delta > 0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float,
+                        help="Fail when the cold start takes longer than this")
+    parser.add_argument("--baseline", help="Profile JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="Fail when the cold start is this many percent slower than the baseline")
+    parser.add_argument("--output", help="Write the profile JSON to this file")
+    args = parser.parse_args()
+
+    result = profile(args.runs, top=50)
+    result["cold_start_ms"] = cold_start_ms(result)
+    print(json.dumps({
+        "cold_start_ms": result["cold_start_ms"],
+        "phases_ms": result["phases_ms"],
+        "packages_ms": dict(list(result["packages_ms"].items())[:10]),
+    }, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    failures = []
+    if args.max_ms is not None and result["cold_start_ms"] > args.max_ms:
+        failures.append(f"cold start {result['cold_start_ms']}ms exceeds {args.max_ms}ms")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        previous = baseline.get("cold_start_ms") or cold_start_ms(baseline)
+        change = (result["cold_start_ms"] - previous) / previous * 100
+        if change > args.threshold:
+            failures.append(
+                f"cold start {previous}ms -> {result['cold_start_ms']}ms (+{change:.1f}%)"
+            )
+            failures.extend(f"  {line}" for line in package_growth(result, baseline))
+
+    if failures:
+        print("Cold start regression:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("Cold start within limits")
+
+
+if __name__ == "__main__":
+    main()
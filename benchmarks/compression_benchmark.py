@@ -0,0 +1,143 @@
+"""
+Measure the CPU-versus-bytes trade-off of response compression.
+
+Serializes synthetic todo lists of several sizes exactly as the list
+endpoints do, then compresses them with each gzip level and brotli quality
+(when the brotli package is installed) using the encoders of
+CompressionMiddleware. For every payload size and setting it reports the
+compressed size, the CPU time per response on this machine, and:
+
+- transfer_saved_ms: time saved sending the smaller body at --bandwidth-mbps
+- cpu_share: fraction of one CPU spent compressing at --rps responses/s
+
+Streamed exports are measured separately: they are compressed in
+EXPORT_BATCH_SIZE chunks with a flush after each chunk, which costs some
+ratio compared with one-shot compression.
+
+Run it on the instance type you deploy to and pick the setting with the
+best transfer savings whose cpu_share fits the CPU headroom; payload sizes
+where no setting saves meaningful transfer time suggest a higher
+COMPRESSION_MINIMUM_SIZE. No database is needed.
+
+Usage:
+    python -m benchmarks.compression_benchmark
+    python -m benchmarks.compression_benchmark --sizes 1 10 100 1000 --bandwidth-mbps 5 --rps 200
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.routers.todo import EXPORT_BATCH_SIZE, todo_helper
+from app.utils.compression import BrotliEncoder, GzipEncoder, brotli
+from app.utils.serialization import dumps
+from benchmarks.search_benchmark import make_todo
+
+
+GZIP_LEVELS = (1, 4, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+
+
+def make_todos(count: int) -> list:
+    """Build ``count`` synthetic todos in their API representation"""
+    start = datetime.utcnow() - timedelta(seconds=count)
+    user_id = ObjectId()
+    todos = []
+    for i in range(count):
+        todo = make_todo(i, start, user_id)
+        todo["_id"] = ObjectId()
+        todos.append(todo_helper(todo))
+    return todos
+
+
+def encoders() -> dict:
+    """Return a factory per setting, keyed by its name"""
+    settings = {f"gzip-{level}": (lambda level=level: GzipEncoder(level)) for level in GZIP_LEVELS}
+    if brotli is not None:
+        settings.update({
+            f"br-{quality}": (lambda quality=quality: BrotliEncoder(quality))
+            for quality in BROTLI_QUALITIES
+        })
+    return settings
+
+
+def compress(factory, chunks: list) -> bytes:
+    """Compress ``chunks`` the way the middleware does"""
+    encoder = factory()
+    if len(chunks) == 1:
+        return encoder.compress(chunks[0]) + encoder.finish()
+    data = b"".join(encoder.compress(chunk) + encoder.flush() for chunk in chunks[:-1])
+    return data + encoder.compress(chunks[-1]) + encoder.finish()
+
+
+def measure(factory, chunks: list, runs: int) -> tuple:
+    """Return (compressed size, median seconds per response)"""
+    size = len(compress(factory, chunks))
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        compress(factory, chunks)
+        timings.append(time.perf_counter() - started)
+    return size, statistics.median(timings)
+
+
+def report(chunks: list, runs: int, bandwidth_mbps: float, rps: float) -> dict:
+    raw = sum(len(chunk) for chunk in chunks)
+    results = {}
+    for name, factory in encoders().items():
+        size, seconds = measure(factory, chunks, runs)
+        results[name] = {
+            "bytes": size,
+            "ratio": round(raw / size, 2),
+            "cpu_us": round(seconds * 1_000_000, 1),
+            "transfer_saved_ms": round((raw - size) * 8 / (bandwidth_mbps * 1000), 3),
+            "cpu_share": round(seconds * rps, 4),
+        }
+    return {"raw_bytes": raw, "settings": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 20, 100, 1000],
+                        help="Todos per list response")
+    parser.add_argument("--export-size", type=int, default=10000,
+                        help="Todos in the streamed export (0 skips it)")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--bandwidth-mbps", type=float, default=10.0,
+                        help="Client bandwidth used to value the bytes saved")
+    parser.add_argument("--rps", type=float, default=100.0,
+                        help="Compressed responses per second used for cpu_share")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if brotli is None:
+        print("brotli is not installed; reporting gzip only")
+
+    results = {"lists": {}}
+    for size in args.sizes:
+        results["lists"][str(size)] = report(
+            [dumps(make_todos(size))], args.runs, args.bandwidth_mbps, args.rps
+        )
+
+    if args.export_size:
+        lines = [dumps(todo) + b"\n" for todo in make_todos(args.export_size)]
+        chunks = [
+            b"".join(lines[offset:offset + EXPORT_BATCH_SIZE])
+            for offset in range(0, len(lines), EXPORT_BATCH_SIZE)
+        ]
+        results["export"] = {
+            "todos": args.export_size,
+            "chunks": len(chunks),
+            **report(chunks, max(1, args.runs // 10), args.bandwidth_mbps, args.rps),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
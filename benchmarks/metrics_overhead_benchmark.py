@@ -0,0 +1,143 @@
+"""
+Benchmark the overhead of the request metrics middleware.
+
+Drives the application in-process over raw ASGI, alternating rounds with and
+without MetricsMiddleware, so the comparison excludes network and client
+costs and shows the middleware's share of per-request time. Also reports the
+per-command cost of the MongoDB command listener. Exits non-zero when the
+request overhead exceeds --max-overhead percent.
+
+The default path is a MongoDB-backed list read with the read cache enabled,
+as in production; --no-cache sends every request to MongoDB, which makes the
+middleware's share look smaller. It needs a reachable MONGODB_URL and --email
+of an existing user to send a bearer token for; the benchmark stops if the
+warm-up requests fail, since a 401 never reaches the database. The
+middleware adds a fixed couple of microseconds per request, so trivial
+routes such as /health show a larger share; use --path /health to see that
+worst case.
+
+Usage:
+    MONGODB_URL=mongodb://localhost:27017 python -m benchmarks.metrics_overhead_benchmark --email load@example.com
+    python -m benchmarks.metrics_overhead_benchmark --path /health --max-overhead 100
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+from app.config.database import close_mongo_connection, connect_to_mongo
+from app.main import app
+from app.utils.cache import todo_cache
+from app.utils.metrics import MetricsMiddleware, mongo_command_listener
+
+
+async def run_requests(asgi_app, path: str, count: int, headers: list = (),
+                       statuses: set = None) -> float:
+    """Send ``count`` GET requests and return the elapsed seconds"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if statuses is not None and message["type"] == "http.response.start":
+            statuses.add(message["status"])
+
+    path, _, query_string = path.partition("?")
+    started = time.perf_counter()
+    for _ in range(count):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": query_string.encode(),
+            "headers": [(b"host", b"localhost"), *headers],
+            "client": ("127.0.0.1", 50000),
+            "server": ("localhost", 80),
+        }
+        await asgi_app(scope, receive, send)
+    return time.perf_counter() - started
+
+
+def time_command_listener(count: int) -> float:
+    """Return the listener cost per MongoDB command in microseconds"""
+    started_event = SimpleNamespace(
+        command={"find": "todos"}, command_name="find", request_id=0, operation_id=0
+    )
+    succeeded_event = SimpleNamespace(
+        command_name="find", request_id=0, operation_id=0, duration_micros=500
+    )
+    started = time.perf_counter()
+    for _ in range(count):
+        mongo_command_listener.started(started_event)
+        mongo_command_listener.succeeded(succeeded_event)
+    return (time.perf_counter() - started) / count * 1_000_000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--path", default="/api/todos?limit=20")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="Disable the todo read cache")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--email", help="Send a bearer token for this user")
+    parser.add_argument("--max-overhead", type=float, default=3.0,
+                        help="Fail when overhead exceeds this percentage")
+    args = parser.parse_args()
+
+    headers = []
+    if args.email:
+        from app.utils.auth import create_access_token
+        token = create_access_token(data={"sub": args.email})
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+
+    todo_cache.enabled = args.cache
+    instrumented = MetricsMiddleware(app)
+    per_round = max(1, args.requests // args.rounds)
+
+    await connect_to_mongo()
+    try:
+        # Warm up routing, the middleware stack and the connection pool
+        statuses = set()
+        await run_requests(app, args.path, 200, headers, statuses)
+        await run_requests(instrumented, args.path, 200, headers)
+        if any(code >= 400 for code in statuses):
+            sys.exit(f"{args.path} answered {sorted(statuses)}; check --email and MONGODB_URL")
+
+        baseline = []
+        measured = []
+        for _ in range(args.rounds):
+            baseline.append(await run_requests(app, args.path, per_round, headers))
+            measured.append(await run_requests(instrumented, args.path, per_round, headers))
+    finally:
+        await close_mongo_connection()
+
+    # Best round of each, to reduce scheduler noise
+    baseline_us = min(baseline) / per_round * 1_000_000
+    measured_us = min(measured) / per_round * 1_000_000
+    overhead = (measured_us - baseline_us) / baseline_us * 100
+
+    result = {
+        "path": args.path,
+        "requests_per_round": per_round,
+        "rounds": args.rounds,
+        "baseline_us_per_request": round(baseline_us, 2),
+        "instrumented_us_per_request": round(measured_us, 2),
+        "overhead_us_per_request": round(measured_us - baseline_us, 2),
+        "overhead_percent": round(overhead, 2),
+        "command_listener_us_per_command": round(time_command_listener(per_round), 3),
+        "max_overhead_percent": args.max_overhead,
+    }
+    print(json.dumps(result, indent=2))
+    if overhead > args.max_overhead:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
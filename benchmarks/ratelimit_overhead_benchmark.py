@@ -0,0 +1,92 @@
+"""
+Benchmark the per-request overhead of the rate limiting middleware.
+
+Drives the application in-process over raw ASGI, alternating rounds with the
+limiter disabled and with a limiter that applies a (never exhausted) token
+bucket and the in-flight cap to every request. Also times a bare token bucket
+take on the in-memory store. Exits non-zero when the added latency exceeds
+--max-overhead-us microseconds per request.
+
+Usage:
+    python -m benchmarks.ratelimit_overhead_benchmark --requests 20000
+    python -m benchmarks.ratelimit_overhead_benchmark --path /api/auth/me
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from app.main import app
+from app.utils.ratelimit import (
+    MemoryRateLimitStore,
+    RateLimiter,
+    RateLimitMiddleware,
+    rate_limiter,
+)
+from benchmarks.metrics_overhead_benchmark import run_requests
+
+
+async def time_store_take(count: int) -> float:
+    """Return the cost of one in-memory token bucket take in microseconds"""
+    store = MemoryRateLimitStore()
+    started = time.perf_counter()
+    for i in range(count):
+        await store.take(f"127.0.0.{i % 256}:GET /health", 1_000_000, 1_000_000.0)
+    return (time.perf_counter() - started) / count * 1_000_000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--path", default="/health",
+                        help="Request path; /health is the last route to resolve")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--max-overhead-us", type=float, default=20.0)
+    args = parser.parse_args()
+
+    # The application's own limiter stays off; the wrapper below measures a
+    # limiter that checks a bucket for every request
+    rate_limiter.enabled = False
+    limiter = RateLimiter(
+        MemoryRateLimitStore(),
+        rules={},
+        default_limit=(1_000_000, 1_000_000.0),
+        max_in_flight=1_000_000,
+    )
+    limited = RateLimitMiddleware(app, routes=app.routes, limiter=limiter)
+    per_round = max(1, args.requests // args.rounds)
+
+    await run_requests(app, args.path, 200)
+    await run_requests(limited, args.path, 200)
+
+    baseline = []
+    measured = []
+    for _ in range(args.rounds):
+        baseline.append(await run_requests(app, args.path, per_round))
+        measured.append(await run_requests(limited, args.path, per_round))
+
+    # Best round of each, to reduce scheduler noise
+    baseline_us = min(baseline) / per_round * 1_000_000
+    measured_us = min(measured) / per_round * 1_000_000
+    overhead_us = measured_us - baseline_us
+
+    result = {
+        "path": args.path,
+        "requests_per_round": per_round,
+        "rounds": args.rounds,
+        "baseline_us_per_request": round(baseline_us, 2),
+        "limited_us_per_request": round(measured_us, 2),
+        "overhead_us_per_request": round(overhead_us, 2),
+        "overhead_percent": round(overhead_us / baseline_us * 100, 2),
+        "store_take_us": round(await time_store_take(per_round), 3),
+        "rejected": limiter.limited + limiter.shed,
+        "max_overhead_us": args.max_overhead_us,
+    }
+    print(json.dumps(result, indent=2))
+    if overhead_us > args.max_overhead_us or result["rejected"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+"""
+Compare search latency for the legacy regex query against the indexed
+prefix and full-text search modes.
+
+Seeds a dedicated benchmark database with synthetic todos at each requested
+size, spread over --users owners, creates the API indexes and times each
+query shape as issued by GET /api/todos/search (first page, default limit)
+for one user.
+
+Usage:
+    MONGODB_URL=mongodb://localhost:27017 python -m benchmarks.search_benchmark
+    python -m benchmarks.search_benchmark --sizes 10000 100000 1000000 --runs 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId, SON
+
+from app.config.indexes import ensure_indexes
+from app.utils.pagination import DEFAULT_PAGE_SIZE, RELEVANCE_SORT, keyset_sort
+
+
+WORDS = [
+    "buy", "milk", "write", "report", "call", "mom", "fix", "bug", "review",
+    "pull", "request", "book", "flight", "clean", "kitchen", "pay", "rent",
+    "plan", "trip", "read", "chapter", "update", "resume", "water", "plants",
+]
+
+SEED_BATCH_SIZE = 10000
+
+
+def make_todo(index: int, start: datetime, user_id: ObjectId) -> dict:
+    """Build a synthetic todo document owned by ``user_id``"""
+    title = " ".join(random.choices(WORDS, k=random.randint(2, 5))).capitalize()
+    created_at = start + timedelta(seconds=index)
+    return {
+        "userId": user_id,
+        "title": title,
+        "description": " ".join(random.choices(WORDS, k=random.randint(0, 12))) or None,
+        "completed": random.random() < 0.3,
+        "createdAt": created_at,
+        "updatedAt": created_at,
+    }
+
+
+async def seed(collection, size: int, user_ids: list):
+    """Replace the collection contents with ``size`` synthetic todos"""
+    await collection.drop()
+    start = datetime.utcnow() - timedelta(seconds=size)
+    for offset in range(0, size, SEED_BATCH_SIZE):
+        batch = [
+            make_todo(i, start, user_ids[i % len(user_ids)])
+            for i in range(offset, min(offset + SEED_BATCH_SIZE, size))
+        ]
+        await collection.insert_many(batch, ordered=False)
+
+
+async def regex_search(collection, user_id: ObjectId, term: str):
+    """Legacy unanchored, case-insensitive regex search"""
+    query = {"userId": user_id, "title": {"$regex": term, "$options": "i"}}
+    return await collection.find(query).sort(keyset_sort("createdAt")).limit(
+        DEFAULT_PAGE_SIZE + 1
+    ).to_list(length=DEFAULT_PAGE_SIZE + 1)
+
+
+async def prefix_search(collection, user_id: ObjectId, term: str):
+    """Escaped, anchored prefix search backed by the (userId, title) index"""
+    query = {"userId": user_id, "title": {"$regex": f"^{re.escape(term.capitalize())}"}}
+    return await collection.find(query).sort(keyset_sort("createdAt")).limit(
+        DEFAULT_PAGE_SIZE + 1
+    ).to_list(length=DEFAULT_PAGE_SIZE + 1)
+
+
+async def text_search(collection, user_id: ObjectId, term: str):
+    """Full-text search ranked by relevance"""
+    pipeline = [
+        {"$match": {"userId": user_id, "$text": {"$search": term}}},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+        {"$sort": SON(keyset_sort(RELEVANCE_SORT))},
+        {"$limit": DEFAULT_PAGE_SIZE + 1},
+    ]
+    return await collection.aggregate(pipeline).to_list(length=DEFAULT_PAGE_SIZE + 1)
+
+
+async def time_query(query, collection, user_id: ObjectId, runs: int) -> dict:
+    """Run a query ``runs`` times and summarize its latency in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        term = random.choice(WORDS)
+        started = time.perf_counter()
+        await query(collection, user_id, term)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--users", type=int, default=100,
+                        help="Number of owners the todos are spread over")
+    parser.add_argument("--database", default="todolist_benchmark")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    database = client[args.database]
+    user_ids = [ObjectId() for _ in range(args.users)]
+    results = []
+
+    try:
+        for size in args.sizes:
+            print(f"Seeding {size} todos...")
+            await seed(database.todos, size, user_ids)
+            await ensure_indexes(database)
+
+            for name, query in [
+                ("regex", regex_search),
+                ("prefix", prefix_search),
+                ("text", text_search),
+            ]:
+                stats = await time_query(query, database.todos, user_ids[0], args.runs)
+                results.append({"size": size, "mode": name, **stats})
+                print(f"  {name:<7} mean={stats['mean_ms']}ms p50={stats['p50_ms']}ms "
+                      f"p95={stats['p95_ms']}ms")
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Compare the default FastAPI response path for todo lists against the fast
+path used by the list endpoints.
+
+The default path mirrors what FastAPI does for ``response_model=List[TodoResponse]``:
+validate every dict through the model, run jsonable_encoder and encode with
+the stdlib JSON encoder. The fast path encodes the todo_helper dicts directly
+with app.utils.serialization.dumps (orjson when installed).
+
+Usage:
+    python -m benchmarks.serialization_benchmark
+    python -m benchmarks.serialization_benchmark --sizes 100 1000 10000 100000 --runs 5
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.todo import TodoResponse
+from app.routers.todo import todo_helper
+from app.utils.serialization import dumps, orjson
+
+
+def make_documents(count: int) -> list:
+    """Build synthetic MongoDB todo documents"""
+    start = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Todo number {i}",
+            "description": "Benchmark description text" if i % 2 else None,
+            "completed": i % 3 == 0,
+            "createdAt": start + timedelta(milliseconds=i),
+            "updatedAt": start + timedelta(milliseconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+response_adapter = TypeAdapter(List[TodoResponse])
+
+
+def default_path(documents: list) -> bytes:
+    """todo_helper -> response_model validation -> jsonable_encoder -> json.dumps"""
+    todos = [todo_helper(todo) for todo in documents]
+    validated = response_adapter.validate_python(todos)
+    content = jsonable_encoder(validated)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_path(documents: list) -> bytes:
+    """todo_helper -> dumps"""
+    return dumps([todo_helper(todo) for todo in documents])
+
+
+def best_time(func, documents: list, runs: int) -> float:
+    """Return the fastest of ``runs`` executions in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(documents)
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Encoder for fast path: {'orjson' if orjson is not None else 'json (stdlib)'}")
+    results = []
+    for size in args.sizes:
+        documents = make_documents(size)
+        default_ms = best_time(default_path, documents, args.runs)
+        fast_ms = best_time(fast_path, documents, args.runs)
+        results.append({
+            "size": size,
+            "default_ms": round(default_ms, 3),
+            "fast_ms": round(fast_ms, 3),
+            "speedup": round(default_ms / fast_ms, 2) if fast_ms else None,
+        })
+        print(f"{size:>7} todos: default={default_ms:9.2f}ms fast={fast_ms:9.2f}ms "
+              f"speedup={results[-1]['speedup']}x")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
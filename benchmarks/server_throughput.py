@@ -0,0 +1,157 @@
+"""
+Compare HTTP throughput of server setups.
+
+Starts each setup as a real server process on --port, waits for
+GET /health, then drives it over keep-alive connections from --clients
+concurrent clients split across --client-processes load processes for
+--duration seconds. Reports requests/s, p50/p99 latency and errors per
+setup as JSON. Setups:
+
+- single: the previous entrypoint, ``uvicorn app.main:app`` (one process,
+  uvicorn picks its loop and parser)
+- server: ``python -m app.server`` (uvloop, httptools, worker count from
+  CPUs and memory unless WEB_CONCURRENCY is set)
+
+The load processes share the machine with the server, so run the benchmark
+on a host with spare CPUs, or compare setups relative to each other only.
+/health does not touch MongoDB; pass --email with a --path under /api to
+measure database-backed routes (the server environment, including
+MONGODB_URL and SECRET_KEY, is inherited).
+
+Usage:
+    python -m benchmarks.server_throughput --duration 20 --clients 64
+    WEB_CONCURRENCY=4 python -m benchmarks.server_throughput --setups server --client-processes 4
+    python -m benchmarks.server_throughput --path /api/todos?limit=20 --email load@example.com
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+SETUPS = {
+    "single": lambda port: [
+        sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+    ],
+    "server": lambda port: [sys.executable, "-m", "app.server"],
+}
+
+
+def wait_until_ready(url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready within {timeout}s")
+
+
+async def client_loop(client: httpx.AsyncClient, path: str, headers: dict, stop_at: float,
+                      latencies: list, errors: list):
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, headers=headers)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def drive(url: str, path: str, headers: dict, clients: int, duration: float) -> tuple:
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        stop_at = time.monotonic() + duration
+        await asyncio.gather(*(
+            client_loop(client, path, headers, stop_at, latencies, errors)
+            for _ in range(clients)
+        ))
+    return latencies, errors
+
+
+def load_process(args: tuple) -> tuple:
+    return asyncio.run(drive(*args))
+
+
+def run_setup(name: str, args, headers: dict) -> dict:
+    url = f"http://127.0.0.1:{args.port}"
+    process = subprocess.Popen(
+        SETUPS[name](args.port),
+        env={**os.environ, "PORT": str(args.port), "HOST": "127.0.0.1"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(url, args.startup_timeout)
+        # Warm up connections and code paths before measuring
+        asyncio.run(drive(url, args.path, headers, args.clients, 1))
+
+        per_process = max(1, args.clients // args.client_processes)
+        jobs = [(url, args.path, headers, per_process, args.duration)] * args.client_processes
+        started = time.perf_counter()
+        if args.client_processes == 1:
+            results = [load_process(jobs[0])]
+        else:
+            with multiprocessing.get_context("spawn").Pool(args.client_processes) as pool:
+                results = pool.map(load_process, jobs)
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=40)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    errors = [error for result in results for error in result[1]]
+    if not latencies:
+        return {"requests": 0, "errors": len(errors)}
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--setups", nargs="+", choices=sorted(SETUPS), default=["single", "server"])
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--clients", type=int, default=64, help="Concurrent connections in total")
+    parser.add_argument("--client-processes", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--startup-timeout", type=float, default=30)
+    parser.add_argument("--email", help="Send a bearer token for this user")
+    args = parser.parse_args()
+
+    headers = {}
+    if args.email:
+        from app.utils.auth import create_access_token
+        headers["Authorization"] = f"Bearer {create_access_token(data={'sub': args.email})}"
+
+    results = {name: run_setup(name, args, headers) for name in args.setups}
+    if "single" in results and "server" in results and results["single"].get("rps"):
+        results["speedup"] = round(results["server"].get("rps", 0) / results["single"]["rps"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
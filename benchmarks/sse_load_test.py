@@ -0,0 +1,125 @@
+"""
+Load test for the todo change feed (GET /api/todos/events).
+
+Opens N concurrent SSE subscribers against a running API worker, all signed
+in as one user, then creates todos as that user and measures how long each
+event takes to reach every subscriber. The user is registered if needed.
+Increase --subscribers until delivery latency or connection failures show
+the capacity of a single worker.
+
+Usage:
+    uvicorn app.main:app --port 8080 --workers 1 &
+    python -m benchmarks.sse_load_test --url http://localhost:8080 --subscribers 500 --events 20 \
+        --email sse-load@example.com --password sse-load-password
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+
+async def sign_in(url: str, email: str, password: str) -> dict:
+    """Return the Authorization header of the load test user"""
+    async with httpx.AsyncClient(base_url=url) as client:
+        response = await client.post("/api/auth/login", json={"email": email, "password": password})
+        if response.status_code == 401:
+            response = await client.post("/api/auth/register", json={
+                "email": email, "username": email.split("@")[0], "password": password
+            })
+            response.raise_for_status()
+            response = await client.post("/api/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def subscriber(client: httpx.AsyncClient, url: str, headers: dict, expected: int,
+                     arrivals: list, ready: asyncio.Event, connected: list):
+    """Record arrival times until ``expected`` created events have been received"""
+    received = 0
+    async with client.stream("GET", f"{url}/api/todos/events", headers=headers) as response:
+        response.raise_for_status()
+        connected.append(1)
+        ready.set()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            event = json.loads(line[5:])
+            if event.get("type") != "created":
+                continue
+            arrivals.append((event["id"], time.perf_counter()))
+            received += 1
+            if received >= expected:
+                return
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--subscribers", type=int, default=200)
+    parser.add_argument("--events", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--email", default="sse-load@example.com")
+    parser.add_argument("--password", default="sse-load-password")
+    args = parser.parse_args()
+
+    headers = await sign_in(args.url, args.email, args.password)
+
+    limits = httpx.Limits(max_connections=args.subscribers + 10)
+    sent_at = {}
+    arrivals = []
+    connected = []
+
+    async with httpx.AsyncClient(limits=limits, timeout=None) as client:
+        ready_events = [asyncio.Event() for _ in range(args.subscribers)]
+        tasks = [
+            asyncio.create_task(subscriber(
+                client, args.url, headers, args.events, arrivals, ready, connected
+            ))
+            for ready in ready_events
+        ]
+        await asyncio.wait_for(
+            asyncio.gather(*(ready.wait() for ready in ready_events)), args.timeout
+        )
+        print(f"{len(connected)} subscribers connected")
+
+        async with httpx.AsyncClient(base_url=args.url, headers=headers) as writer:
+            for i in range(args.events):
+                started = time.perf_counter()
+                response = await writer.post("/api/todos", json={"title": f"SSE load {i}"})
+                response.raise_for_status()
+                sent_at[response.json()["id"]] = started
+
+        done, pending = await asyncio.wait(tasks, timeout=args.timeout)
+        for task in pending:
+            task.cancel()
+
+        async with httpx.AsyncClient(base_url=args.url, headers=headers) as writer:
+            for todo_id in sent_at:
+                await writer.delete(f"/api/todos/{todo_id}")
+
+    latencies = sorted(
+        (arrived - sent_at[todo_id]) * 1000
+        for todo_id, arrived in arrivals if todo_id in sent_at
+    )
+    expected = args.subscribers * args.events
+    result = {
+        "subscribers": args.subscribers,
+        "events": args.events,
+        "delivered": len(latencies),
+        "expected": expected,
+        "completed_subscribers": len(done) - sum(1 for t in done if t.exception()),
+    }
+    if latencies:
+        result.update({
+            "p50_ms": round(latencies[len(latencies) // 2], 2),
+            "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+            "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+            "max_ms": round(latencies[-1], 2),
+        })
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
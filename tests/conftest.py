@@ -0,0 +1,183 @@
+"""
+Shared fixtures for the API tests.
+
+Tests run against a real MongoDB server when TEST_MONGODB_URL is set (the
+``todolist_test`` database is dropped after each test), and otherwise
+against an in-memory mongomock-motor client. In both cases the client's
+commands are reported to a pymongo CommandListener, so tests can count the
+round trips a request makes. mongomock does not emit monitoring events, so
+for it each collection call is reported as the command the driver would send.
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("MONGO_PREWARM", "false")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ["MONGODB_DATABASE"] = "todolist_test"
+
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+import functools
+
+import httpx
+import pytest
+import pytest_asyncio
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne, monitoring
+
+from app.config import database
+from app.config.indexes import ensure_indexes
+from app.main import app
+from app.utils.auth import create_access_token, user_cache
+
+
+TEST_MONGODB_URL = os.getenv("TEST_MONGODB_URL")
+
+WRITE_COMMANDS = ("insert", "update", "delete", "findAndModify")
+
+# Collection method -> command sent by the driver
+COLLECTION_COMMANDS = {
+    "insert_one": "insert",
+    "insert_many": "insert",
+    "update_one": "update",
+    "update_many": "update",
+    "replace_one": "update",
+    "delete_one": "delete",
+    "delete_many": "delete",
+    "find_one_and_update": "findAndModify",
+    "find_one_and_delete": "findAndModify",
+    "find_one_and_replace": "findAndModify",
+    "find": "find",
+    "find_one": "find",
+    "aggregate": "aggregate",
+    "count_documents": "aggregate",
+    "estimated_document_count": "count",
+    "distinct": "distinct",
+    "drop": "drop",
+    "create_indexes": "createIndexes",
+    "list_indexes": "listIndexes",
+    "index_information": "listIndexes",
+}
+
+# An unordered bulk_write sends one command per operation type
+BULK_COMMANDS = {
+    InsertOne: "insert",
+    UpdateOne: "update",
+    UpdateMany: "update",
+    ReplaceOne: "update",
+    DeleteOne: "delete",
+    DeleteMany: "delete",
+}
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Record the (command, collection) of every command started"""
+
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        self.commands.append((event.command_name, event.command.get(event.command_name)))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def clear(self):
+        self.commands = []
+
+    def on(self, collection: str) -> list:
+        """Command names sent for a collection"""
+        return [name for name, target in self.commands if target == collection]
+
+    def writes(self) -> list:
+        return [(name, target) for name, target in self.commands if name in WRITE_COMMANDS]
+
+
+def report_mock_commands(monkeypatch, recorder: CommandRecorder):
+    """Send a started event to ``recorder`` for each mongomock collection call"""
+    from mongomock_motor import AsyncMongoMockCollection
+
+    def started(name: str, collection):
+        recorder.started(SimpleNamespace(command_name=name, command={name: collection.name}))
+
+    for method_name, command_name in COLLECTION_COMMANDS.items():
+        method = getattr(AsyncMongoMockCollection, method_name)
+
+        def wrap(method, command_name):
+            @functools.wraps(method)
+            def wrapper(self, *args, **kwargs):
+                started(command_name, self)
+                return method(self, *args, **kwargs)
+            return wrapper
+
+        monkeypatch.setattr(AsyncMongoMockCollection, method_name, wrap(method, command_name))
+
+    bulk_write = AsyncMongoMockCollection.bulk_write
+
+    async def recorded_bulk_write(self, requests, *args, **kwargs):
+        for command_name in dict.fromkeys(BULK_COMMANDS[type(request)] for request in requests):
+            started(command_name, self)
+        return await bulk_write(self, requests, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncMongoMockCollection, "bulk_write", recorded_bulk_write)
+
+
+@pytest.fixture
+def commands():
+    return CommandRecorder()
+
+
+@pytest_asyncio.fixture
+async def db(commands, monkeypatch):
+    """Point the application at a fresh database with the indexes in place"""
+    if TEST_MONGODB_URL:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(TEST_MONGODB_URL, event_listeners=[commands])
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+        report_mock_commands(monkeypatch, commands)
+
+    database.db.client = client
+    database.db.reuse_client = True
+    # Users cached by an earlier test would not exist in this database
+    user_cache.clear()
+    test_db = client[database.MONGODB_DATABASE]
+    await ensure_indexes(test_db)
+    commands.clear()
+    yield test_db
+
+    if TEST_MONGODB_URL:
+        await client.drop_database(database.MONGODB_DATABASE)
+        client.close()
+    database.db.client = None
+    database.db.reuse_client = False
+
+
+@pytest_asyncio.fixture
+async def client(db):
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as test_client:
+            yield test_client
+
+
+@pytest_asyncio.fixture
+async def make_user(db):
+    """Create users directly in the database and return their auth headers"""
+    async def create() -> dict:
+        email = f"user-{uuid4().hex[:12]}@example.com"
+        now = datetime.utcnow().replace(microsecond=0)
+        await db.users.insert_one({
+            "email": email,
+            "username": email.split("@")[0],
+            "hashed_password": "not-used",
+            "createdAt": now,
+            "updatedAt": now,
+        })
+        return {"Authorization": f"Bearer {create_access_token(data={'sub': email})}"}
+    return create
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app.utils.cache import MemoryCacheBackend, ReadThroughCache
+
+
+@pytest.mark.asyncio
+async def test_bump_discards_a_load_that_raced_the_write():
+    cache = ReadThroughCache(MemoryCacheBackend(max_size=16, ttl=30))
+    stored = {"value": b"old"}
+    read_done, write_done = asyncio.Event(), asyncio.Event()
+
+    async def slow_load():
+        # Reads the database before the write, stores after it
+        value = stored["value"]
+        read_done.set()
+        await write_done.wait()
+        return value
+
+    async def get(loader):
+        generation = await cache.generation("item:u:1")
+        return await cache.get_or_load(f"item:u:1:{generation}", loader)
+
+    async def fresh_load():
+        return stored["value"]
+
+    stale_read = asyncio.create_task(get(slow_load))
+    await read_done.wait()
+    stored["value"] = b"new"
+    await cache.bump("item:u:1")
+    write_done.set()
+
+    assert await stale_read == b"old"
+    assert await get(fresh_load) == b"new"
+
+
+@pytest.mark.asyncio
+async def test_generations_are_read_together_and_expire(monkeypatch):
+    backend = MemoryCacheBackend(max_size=16, ttl=1)
+    cache = ReadThroughCache(backend)
+    await cache.bump("a", "b")
+    await cache.bump("b")
+    assert await cache.generations("a", "b", "c") == [1, 2, 0]
+
+    now = asyncio.get_running_loop().time()
+    monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now + 10**6)
+    assert await cache.generations("a", "b") == [0, 0]
+
+
+@pytest.mark.asyncio
+async def test_expired_counters_are_swept():
+    backend = MemoryCacheBackend(max_size=16, ttl=1)
+    for key in range(1024):
+        backend._counters[f"gen:{key}"] = (1, 0)
+    await backend.incr("gen:live")
+    assert list(backend._counters) == ["gen:live"]
@@ -0,0 +1,172 @@
+import gzip
+import json
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.utils.compression import CompressionMiddleware, parse_accept_encoding
+
+
+LARGE = [{"id": number, "title": f"Todo {number}", "completed": False} for number in range(100)]
+
+
+async def large(request):
+    return JSONResponse(LARGE, headers={"ETag": '"v1"'})
+
+
+async def small(request):
+    return JSONResponse({"ok": True})
+
+
+async def ndjson(request):
+    async def rows():
+        for row in LARGE[:3]:
+            yield json.dumps(row) + "\n"
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+async def events(request):
+    async def stream():
+        yield "event: todo\ndata: {}\n\n"
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+async def encoded(request):
+    return Response(gzip.compress(b"x" * 2000), media_type="application/json",
+                    headers={"Content-Encoding": "gzip"})
+
+
+async def not_modified(request):
+    return Response(status_code=304, headers={"ETag": '"v1"'})
+
+
+def make_client(**options) -> httpx.AsyncClient:
+    app = Starlette(routes=[
+        Route("/large", large),
+        Route("/small", small),
+        Route("/ndjson", ndjson),
+        Route("/events", events),
+        Route("/encoded", encoded),
+        Route("/not-modified", not_modified),
+    ])
+    app = CompressionMiddleware(app, **{"minimum_size": 1024, **options})
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.5, identity;q=0, *;q=bad") == {
+        "gzip": 1.0, "br": 0.5, "identity": 0.0, "*": 0.0
+    }
+
+
+@pytest.mark.parametrize("accept, brotli_enabled, expected", [
+    ("gzip, deflate, br", True, "br"),
+    ("gzip, deflate, br", False, "gzip"),
+    ("br;q=0, gzip", True, "gzip"),
+    ("*", False, "gzip"),
+    ("gzip;q=0, *", False, None),
+    ("identity", True, None),
+])
+def test_encoding_negotiation(accept, brotli_enabled, expected):
+    middleware = CompressionMiddleware(None)
+    middleware.brotli_enabled = brotli_enabled
+    scope = {"headers": [(b"accept-encoding", accept.encode())]}
+
+    assert middleware.select_encoding(scope) == expected
+
+
+def test_no_accept_encoding_means_no_compression():
+    assert CompressionMiddleware(None).select_encoding({"headers": []}) is None
+
+
+@pytest.mark.asyncio
+async def test_large_response_is_gzipped():
+    async with make_client(brotli_enabled=False) as client:
+        response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert int(response.headers["content-length"]) < len(json.dumps(LARGE))
+    assert response.json() == LARGE
+
+
+@pytest.mark.asyncio
+async def test_large_response_is_brotli_encoded():
+    brotli = pytest.importorskip("brotli")
+    async with make_client(brotli_enabled=True) as client:
+        response = await client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert json.loads(brotli.decompress(response.content)) == LARGE
+
+
+@pytest.mark.asyncio
+async def test_small_response_is_sent_as_is():
+    async with make_client() as client:
+        response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+
+
+@pytest.mark.asyncio
+async def test_minimum_size_is_configurable():
+    async with make_client(minimum_size=1, brotli_enabled=False) as client:
+        response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == {"ok": True}
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_is_compressed_without_content_length():
+    async with make_client(brotli_enabled=False) as client:
+        response = await client.get("/ndjson", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert [json.loads(line) for line in response.text.splitlines()] == LARGE[:3]
+
+
+@pytest.mark.asyncio
+async def test_event_stream_is_not_compressed():
+    async with make_client(minimum_size=1, brotli_enabled=False) as client:
+        response = await client.get("/events", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "event: todo\ndata: {}\n\n"
+
+
+@pytest.mark.asyncio
+async def test_encoded_response_is_not_compressed_again():
+    async with make_client(brotli_enabled=False) as client:
+        response = await client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == b"x" * 2000
+
+
+@pytest.mark.asyncio
+async def test_not_modified_is_sent_as_is():
+    async with make_client(minimum_size=1, brotli_enabled=False) as client:
+        response = await client.get("/not-modified", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 304
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_api_responses_are_compressed(client, make_user):
+    headers = await make_user()
+    for number in range(30):
+        await client.post("/api/todos", json={"title": f"Todo {number}"}, headers=headers)
+
+    response = await client.get("/api/todos", headers={**headers, "Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] in ("gzip", "br")
+    assert len(response.json()) == 30
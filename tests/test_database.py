@@ -0,0 +1,55 @@
+import pytest
+
+from app.config import database
+from app.config.database import POOL_OPTIONS, create_client, get_client_options
+
+
+@pytest.fixture
+def environ(monkeypatch):
+    for name in POOL_OPTIONS:
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+def test_unset_options_keep_driver_defaults(environ):
+    environ.setenv("MONGO_MAX_POOL_SIZE", "")
+    assert get_client_options() == {}
+
+
+def test_options_are_parsed_as_integers(environ):
+    environ.setenv("MONGO_MAX_POOL_SIZE", "50")
+    environ.setenv("MONGO_MIN_POOL_SIZE", "5")
+    environ.setenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")
+
+    assert get_client_options() == {
+        "maxPoolSize": 50,
+        "minPoolSize": 5,
+        "waitQueueTimeoutMS": 2000,
+    }
+
+
+def test_invalid_option_fails_at_startup(environ):
+    environ.setenv("MONGO_SOCKET_TIMEOUT_MS", "5s")
+    with pytest.raises(ValueError):
+        get_client_options()
+
+
+def test_client_is_created_with_the_options(environ):
+    environ.setattr(database.db, "client", None)
+    environ.setenv("MONGODB_URL", "mongodb://localhost:27017")
+    environ.setenv("MONGO_MAX_POOL_SIZE", "40")
+    environ.setenv("MONGO_MIN_POOL_SIZE", "4")
+    environ.setenv("MONGO_MAX_IDLE_TIME_MS", "60000")
+    environ.setenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "3000")
+    environ.setenv("MONGO_CONNECT_TIMEOUT_MS", "2000")
+
+    create_client()
+    client = database.db.client
+    try:
+        pool = client.delegate.options.pool_options
+        assert (pool.max_pool_size, pool.min_pool_size) == (40, 4)
+        assert pool.max_idle_time_seconds == 60
+        assert pool.connect_timeout == 2
+        assert client.delegate.options.server_selection_timeout == 3
+    finally:
+        client.close()
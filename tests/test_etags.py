@@ -0,0 +1,68 @@
+import pytest
+
+
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+async def assert_not_modified(client, url: str, headers: dict, etag: str):
+    response = await client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+async def assert_modified(client, url: str, headers: dict, etag: str) -> str:
+    response = await client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    return response.headers["ETag"]
+
+
+@pytest.mark.asyncio
+async def test_todo_etag_changes_after_update(client, make_user):
+    headers = {**await make_user(), **IDENTITY}
+    todo_id = (await client.post("/api/todos", json={"title": "Cached"}, headers=headers)).json()["id"]
+    url = f"/api/todos/{todo_id}"
+
+    etag = (await client.get(url, headers=headers)).headers["ETag"]
+    await assert_not_modified(client, url, headers, etag)
+
+    await client.put(url, json={"title": "Changed"}, headers=headers)
+    await assert_modified(client, url, headers, etag)
+
+
+@pytest.mark.asyncio
+async def test_list_etag_changes_after_every_write(client, make_user):
+    headers = {**await make_user(), **IDENTITY}
+    url = "/api/todos"
+    first_id = (await client.post("/api/todos", json={"title": "First"}, headers=headers)).json()["id"]
+    etag = (await client.get(url, headers=headers)).headers["ETag"]
+    await assert_not_modified(client, url, headers, etag)
+
+    writes = [
+        lambda: client.post("/api/todos", json={"title": "Second"}, headers=headers),
+        lambda: client.put(f"/api/todos/{first_id}", json={"completed": True}, headers=headers),
+        lambda: client.delete(f"/api/todos/{first_id}", headers=headers),
+        lambda: client.post("/api/todos/bulk", json={
+            "operations": [{"op": "create", "data": {"title": "Bulk"}}]
+        }, headers=headers),
+    ]
+    for write in writes:
+        assert (await write()).status_code < 300
+        etag = await assert_modified(client, url, headers, etag)
+        await assert_not_modified(client, url, headers, etag)
+
+
+@pytest.mark.asyncio
+async def test_weak_etag_from_compression_matches(client, make_user):
+    headers = {**await make_user(), "Accept-Encoding": "gzip"}
+    todo_id = (await client.post("/api/todos", json={
+        "title": "Large", "description": "x" * 1000
+    }, headers=headers)).json()["id"]
+
+    for url in (f"/api/todos/{todo_id}", "/api/todos"):
+        response = await client.get(url, headers=headers)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["ETag"].startswith('W/"')
+        await assert_not_modified(client, url, headers, response.headers["ETag"])
+        # The strong form of the tag matches the compressed response too
+        await assert_not_modified(client, url, headers, response.headers["ETag"][2:])
@@ -0,0 +1,82 @@
+import pytest
+from bson import ObjectId
+
+from app.utils.events import (
+    DROPPED_TODOS_PREFIX,
+    ChangeStreamEventBus,
+    InProcessEventBus,
+    TooManySubscribersError,
+    TooManyUserSubscribersError,
+)
+
+
+def test_per_user_subscription_cap():
+    bus = InProcessEventBus(max_subscribers=10, max_subscribers_per_user=2)
+    first = bus.subscribe("alice")
+    bus.subscribe("alice")
+
+    with pytest.raises(TooManyUserSubscribersError):
+        bus.subscribe("alice")
+    # Other users still get a stream
+    bus.subscribe("bob")
+
+    bus.unsubscribe(first)
+    bus.subscribe("alice")
+
+
+def test_global_subscription_cap():
+    bus = InProcessEventBus(max_subscribers=2, max_subscribers_per_user=2)
+    bus.subscribe("alice")
+    bus.subscribe("bob")
+
+    with pytest.raises(TooManySubscribersError):
+        bus.subscribe("carol")
+
+
+def test_unsubscribe_twice_releases_one_slot():
+    bus = InProcessEventBus(max_subscribers=10, max_subscribers_per_user=1)
+    subscription = bus.subscribe("alice")
+
+    bus.unsubscribe(subscription)
+    bus.unsubscribe(subscription)
+
+    assert bus.user_subscribers == {}
+    bus.subscribe("alice")
+
+
+@pytest.mark.asyncio
+async def test_change_stream_routes_changes_to_their_owner(db):
+    bus = ChangeStreamEventBus()
+    owner = ObjectId()
+    todo_id = ObjectId()
+    job = await db.jobs.insert_one({"userId": owner, "type": "delete_todos"})
+
+    update = {"operationType": "update", "documentKey": {"_id": todo_id},
+              "fullDocument": {"_id": todo_id, "userId": owner}}
+    delete = {"operationType": "delete", "documentKey": {"_id": todo_id},
+              "fullDocumentBeforeChange": {"_id": todo_id, "userId": owner}}
+    renamed = {"operationType": "rename",
+               "to": {"db": db.name, "coll": f"{DROPPED_TODOS_PREFIX}{job.inserted_id}"}}
+
+    assert await bus._event_for(db, update) == ("updated", str(todo_id), str(owner))
+    assert await bus._event_for(db, delete) == ("deleted", str(todo_id), str(owner))
+    assert await bus._event_for(db, renamed) == ("cleared", None, str(owner))
+
+
+@pytest.mark.asyncio
+async def test_change_stream_skips_changes_without_an_owner(db):
+    bus = ChangeStreamEventBus()
+    todo_id = ObjectId()
+
+    changes = [
+        # Delete without a pre-image
+        {"operationType": "delete", "documentKey": {"_id": todo_id}},
+        # Dropped or renamed outside a delete-all job
+        {"operationType": "drop"},
+        {"operationType": "rename", "to": {"db": db.name, "coll": "todos_backup"}},
+        {"operationType": "rename", "to": {"db": db.name, "coll": f"{DROPPED_TODOS_PREFIX}{ObjectId()}"}},
+        {"operationType": "invalidate"},
+    ]
+
+    for change in changes:
+        assert await bus._event_for(db, change) is None
@@ -0,0 +1,146 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+from app.routers import todo as todo_router
+from app.utils import imports
+from app.utils.imports import ImportFormatError, parse_csv, parse_ndjson
+from app.utils.jobs import job_runner
+
+
+async def chunked(data: bytes, size: int = 7):
+    """Yield ``data`` in small chunks, so rows span chunk boundaries"""
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(rows) -> list:
+    return [row async for row in rows]
+
+
+def ndjson(*rows) -> bytes:
+    return b"".join(json.dumps(row).encode() + b"\n" for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_ndjson_skips_blank_lines_and_reports_malformed_ones():
+    data = b'{"title": "One"}\n\n   \n{"title": \n["not", "an", "object"]\n{"title": "Two"}'
+
+    rows = await collect(parse_ndjson(chunked(data)))
+
+    assert rows[0] == (1, {"title": "One"})
+    assert rows[1][0] == 4 and rows[1][1].startswith("Invalid JSON")
+    assert rows[2] == (5, "Expected a JSON object")
+    assert rows[3] == (6, {"title": "Two"})
+    assert len(rows) == 4
+
+
+@pytest.mark.asyncio
+async def test_csv_keeps_quoted_newlines_and_commas():
+    data = (
+        b'title,description,completed\r\n'
+        b'"Buy milk, eggs","Line one\nline two",true\r\n'
+        b'Plain,,\r\n'
+        b'Short row\r\n'
+    )
+
+    rows = await collect(parse_csv(chunked(data)))
+
+    assert rows == [
+        (2, {"title": "Buy milk, eggs", "description": "Line one\nline two", "completed": "true"}),
+        (4, {"title": "Plain"}),
+        (5, "Expected 3 columns, got 1"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_csv_without_title_column_is_rejected():
+    with pytest.raises(ImportFormatError):
+        await collect(parse_csv(chunked(b"name,completed\nx,true\n")))
+
+
+@pytest.mark.asyncio
+async def test_oversize_lines_are_rejected(monkeypatch):
+    monkeypatch.setattr(imports, "IMPORT_MAX_LINE_LENGTH", 32)
+    data = b'{"title": "ok"}\n' + b"x" * 100
+
+    with pytest.raises(ImportFormatError, match="Line 2"):
+        await collect(parse_ndjson(chunked(data)))
+    with pytest.raises(ImportFormatError, match="Unterminated"):
+        await collect(parse_csv(chunked(b'title\n"' + b"x\n" * 40)))
+
+
+@pytest.mark.asyncio
+async def test_inline_import_reports_row_errors(client, make_user):
+    headers = await make_user()
+    data = ndjson({"title": "One"}, {"title": ""}, {"title": "Two", "completed": True})
+
+    response = await client.post("/api/todos/import", content=data, headers=headers)
+
+    summary = response.json()
+    assert response.status_code == 200
+    assert (summary["processed"], summary["imported"], summary["failed"]) == (3, 2, 1)
+    assert summary["errors"][0]["line"] == 2
+    titles = [todo["title"] for todo in (await client.get("/api/todos", headers=headers)).json()]
+    assert sorted(titles) == ["One", "Two"]
+
+
+@pytest.mark.asyncio
+async def test_unparseable_inline_import_is_a_400(client, make_user):
+    headers = await make_user()
+    response = await client.post(
+        "/api/todos/import", content=b"name\nx\n", headers={**headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_uploads_over_the_limit_are_a_413(client, make_user, monkeypatch):
+    monkeypatch.setattr(todo_router, "IMPORT_MAX_BYTES", 64)
+    headers = await make_user()
+    data = ndjson(*({"title": f"Todo {number}"} for number in range(10)))
+
+    # Declared by Content-Length
+    response = await client.post("/api/todos/import", content=data, headers=headers)
+    assert response.status_code == 413
+
+    # Counted while streaming, without a Content-Length
+    response = await client.post("/api/todos/import", content=chunked(data, 16), headers=headers)
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_inline_limit_selects_request_or_background_job(client, make_user, monkeypatch):
+    headers = await make_user()
+    data = ndjson({"title": "First"}, {"title": "Second"})
+    monkeypatch.setattr(todo_router, "IMPORT_INLINE_MAX_BYTES", len(data))
+
+    inline = await client.post("/api/todos/import", content=data, headers=headers)
+    assert inline.status_code == 200
+
+    spooled = await client.post("/api/todos/import", content=data + b"\n", headers=headers)
+    assert spooled.status_code == 202
+    await asyncio.gather(*job_runner.tasks)
+    job = (await client.get(spooled.headers["Location"], headers=headers)).json()
+    assert job["status"] == "completed"
+    assert job["result"]["imported"] == 2
+    assert len((await client.get("/api/todos", headers=headers)).json()) == 4
+
+
+@pytest.mark.asyncio
+async def test_spooled_upload_is_closed_when_the_job_is_cancelled(db, make_user):
+    await make_user()
+    user = await db.users.find_one({})
+    upload = io.BytesIO(ndjson({"title": "Never read"}))
+    started = []
+
+    async def work(progress):
+        started.append(True)
+
+    await job_runner.submit("import_todos", str(user["_id"]), work, cleanup=upload.close)
+    await job_runner.stop()
+
+    assert not started
+    assert upload.closed
@@ -0,0 +1,92 @@
+import pytest
+from pymongo import TEXT
+
+from app.config.indexes import INDEXES, JOB_RETENTION_SECONDS, verify_indexes
+
+
+def server_index_information() -> dict:
+    """index_information() of every collection as MongoDB reports the declared indexes"""
+    collections = {}
+    for collection_name, models in INDEXES.items():
+        information = {"_id_": {"v": 2, "key": [("_id", 1)]}}
+        for model in models:
+            spec = model.document
+            key = [(field, float(direction)) for field, direction in spec["key"].items()
+                   if direction != TEXT]
+            info = {"v": 2}
+            if TEXT in spec["key"].values():
+                key += [("_fts", "text"), ("_ftsx", 1)]
+                info["weights"] = spec["weights"]
+            info["key"] = key
+            for option in ("unique", "expireAfterSeconds"):
+                if option in spec:
+                    info[option] = spec[option]
+            information[spec["name"]] = info
+        collections[collection_name] = information
+    return collections
+
+
+class IndexedDatabase:
+    """Database stub answering index_information() from a dict"""
+
+    def __init__(self, collections: dict):
+        self.collections = collections
+
+    def __getitem__(self, name):
+        database = self
+
+        class Collection:
+            async def index_information(self):
+                return database.collections.get(name, {})
+
+        return Collection()
+
+
+def test_todo_indexes_lead_with_user_id():
+    for model in INDEXES["todos"]:
+        assert next(iter(model.document["key"])) == "userId", model.document["name"]
+
+
+def test_index_names_are_unique_per_collection():
+    for collection_name, models in INDEXES.items():
+        names = [model.document["name"] for model in models]
+        assert len(names) == len(set(names)), collection_name
+
+
+@pytest.mark.asyncio
+async def test_declared_indexes_have_no_drift():
+    assert await verify_indexes(IndexedDatabase(server_index_information())) == []
+
+
+@pytest.mark.asyncio
+async def test_drift_is_reported():
+    collections = server_index_information()
+    del collections["todos"]["userId_title"]
+    collections["todos"]["userId_createdAt_id"]["key"] = [("createdAt", 1.0), ("_id", 1.0)]
+    collections["todos"]["userId_title_description_text"]["weights"] = {"title": 1}
+    collections["users"]["email_unique"]["unique"] = False
+    collections["jobs"]["finishedAt_ttl"]["expireAfterSeconds"] = 60
+    collections["refresh_tokens"]["old_index"] = {"v": 2, "key": [("createdAt", 1)]}
+
+    drift = await verify_indexes(IndexedDatabase(collections))
+
+    assert sorted(drift) == sorted([
+        "todos.userId_title is missing",
+        "todos.userId_createdAt_id has key [('createdAt', 1), ('_id', 1)], "
+        "expected [('userId', 1), ('createdAt', 1), ('_id', 1)]",
+        "todos.userId_title_description_text has key [('userId', 1), 'title'], "
+        "expected [('userId', 1), 'description', 'title']",
+        "users.email_unique has unique=False, expected unique=True",
+        f"jobs.finishedAt_ttl has expireAfterSeconds=60, expected {JOB_RETENTION_SECONDS}",
+        "refresh_tokens.old_index is not declared",
+    ])
+
+
+@pytest.mark.asyncio
+async def test_missing_collection_reports_every_index():
+    collections = server_index_information()
+    del collections["jobs"]
+
+    drift = await verify_indexes(IndexedDatabase(collections))
+
+    assert drift == [f"jobs.{model.document['name']} is missing" for model in INDEXES["jobs"]]
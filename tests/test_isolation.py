@@ -0,0 +1,84 @@
+import json
+
+import pytest
+import pytest_asyncio
+
+from app.utils.events import event_bus
+
+
+@pytest_asyncio.fixture
+async def owner(client, make_user):
+    """User A with one todo"""
+    headers = await make_user()
+    response = await client.post(
+        "/api/todos", json={"title": "Private plan", "description": "Only for A"}, headers=headers
+    )
+    return headers, response.json()
+
+
+@pytest.mark.asyncio
+async def test_other_users_get_404_for_a_todo(client, make_user, owner):
+    owner_headers, todo = owner
+    other = await make_user()
+    url = f"/api/todos/{todo['id']}"
+
+    assert (await client.get(url, headers=other)).status_code == 404
+    assert (await client.put(url, json={"title": "Taken"}, headers=other)).status_code == 404
+    assert (await client.patch(url, json={"completed": True}, headers=other)).status_code == 404
+    assert (await client.delete(url, headers=other)).status_code == 404
+
+    unchanged = (await client.get(url, headers=owner_headers)).json()
+    assert unchanged["title"] == "Private plan"
+    assert unchanged["completed"] is False
+
+
+@pytest.mark.asyncio
+async def test_other_users_never_see_a_todo(client, make_user, owner):
+    owner_headers, todo = owner
+    other = await make_user()
+    await client.post("/api/todos", json={"title": "Private note"}, headers=other)
+
+    listed = (await client.get("/api/todos", headers=other)).json()
+    assert [item["title"] for item in listed] == ["Private note"]
+
+    found = (await client.get(
+        "/api/todos/search", params={"title": "Private", "mode": "prefix"}, headers=other
+    )).json()
+    assert [item["title"] for item in found] == ["Private note"]
+
+    exported = (await client.get("/api/todos/export", headers=other)).text.splitlines()
+    assert [json.loads(line)["title"] for line in exported] == ["Private note"]
+
+    for operation in (
+        {"op": "update", "id": todo["id"], "data": {"completed": True}},
+        {"op": "delete", "id": todo["id"]},
+    ):
+        bulk = (await client.post(
+            "/api/todos/bulk", json={"operations": [operation]}, headers=other
+        )).json()
+        assert [result["status"] for result in bulk["results"]] == [404]
+
+    stats = (await client.get("/api/todos/stats", headers=other)).json()
+    assert (stats["total"], stats["completed"]) == (1, 0)
+
+    unchanged = (await client.get(f"/api/todos/{todo['id']}", headers=owner_headers)).json()
+    assert unchanged["completed"] is False
+
+
+@pytest.mark.asyncio
+async def test_events_only_reach_the_owner(client, make_user):
+    owner_headers = await make_user()
+    other = await make_user()
+    owner_id = (await client.get("/api/auth/me", headers=owner_headers)).json()["id"]
+    other_id = (await client.get("/api/auth/me", headers=other)).json()["id"]
+    owner_events = event_bus.subscribe(owner_id)
+    other_events = event_bus.subscribe(other_id)
+    try:
+        todo = (await client.post("/api/todos", json={"title": "Mine"}, headers=owner_headers)).json()
+        await client.delete(f"/api/todos/{todo['id']}", headers=owner_headers)
+
+        assert owner_events.queue.qsize() == 2
+        assert other_events.queue.empty()
+    finally:
+        event_bus.unsubscribe(owner_events)
+        event_bus.unsubscribe(other_events)
@@ -0,0 +1,235 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+
+from app.routers import todo as todo_router
+from app.utils import jobs
+from app.utils.jobs import JobProgress, TooManyJobsError, job_runner
+
+
+@pytest_asyncio.fixture
+async def runner(db):
+    yield job_runner
+    await job_runner.stop()
+
+
+async def wait_for_jobs():
+    await asyncio.gather(*job_runner.tasks)
+
+
+async def create_todos(client, headers, *titles) -> list:
+    ids = []
+    for title in titles:
+        response = await client.post("/api/todos", json={"title": title}, headers=headers)
+        assert response.status_code == 201
+        ids.append(response.json()["id"])
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_never_exceed_the_limit(runner, db, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_MAX_ACTIVE_PER_USER", 2)
+    user_id = str(ObjectId())
+    release = asyncio.Event()
+
+    async def work(progress):
+        await release.wait()
+        return {}
+
+    results = await asyncio.gather(
+        *(runner.submit("test", user_id, work) for _ in range(5)),
+        return_exceptions=True
+    )
+
+    assert sum(isinstance(result, dict) for result in results) == 2
+    assert sum(isinstance(result, TooManyJobsError) for result in results) == 3
+    assert await db.jobs.count_documents({}) == 2
+
+    release.set()
+    await wait_for_jobs()
+    assert await db.job_slots.count_documents({}) == 0
+    await runner.submit("test", user_id, work)
+
+
+@pytest.mark.asyncio
+async def test_limit_is_per_user(runner, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_MAX_ACTIVE_PER_USER", 1)
+    release = asyncio.Event()
+
+    async def work(progress):
+        await release.wait()
+
+    await runner.submit("test", str(ObjectId()), work)
+    await runner.submit("test", str(ObjectId()), work)
+    release.set()
+
+
+@pytest.mark.asyncio
+async def test_stale_slot_is_reclaimed(runner, db, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_MAX_ACTIVE_PER_USER", 1)
+    user_id = str(ObjectId())
+    # A job of a worker that died without finishing it
+    dead_job = ObjectId()
+    await db.jobs.insert_one({
+        "_id": dead_job,
+        "userId": ObjectId(user_id),
+        "status": jobs.RUNNING,
+        "updatedAt": datetime.utcnow() - timedelta(seconds=jobs.JOB_STALE_SECONDS + 1),
+    })
+    await db.job_slots.insert_one({"_id": f"{user_id}:0", "userId": ObjectId(user_id), "jobId": dead_job})
+
+    async def work(progress):
+        return {}
+
+    job = await runner.submit("test", user_id, work)
+
+    slot = await db.job_slots.find_one({"_id": f"{user_id}:0"})
+    assert slot["jobId"] == job["_id"]
+
+
+@pytest.mark.asyncio
+async def test_live_slot_is_not_reclaimed(runner, db, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_MAX_ACTIVE_PER_USER", 1)
+    user_id = str(ObjectId())
+    other_job = ObjectId()
+    await db.jobs.insert_one({
+        "_id": other_job,
+        "userId": ObjectId(user_id),
+        "status": jobs.RUNNING,
+        "updatedAt": datetime.utcnow(),
+    })
+    await db.job_slots.insert_one({"_id": f"{user_id}:0", "userId": ObjectId(user_id), "jobId": other_job})
+
+    with pytest.raises(TooManyJobsError):
+        await runner.submit("test", user_id, lambda progress: asyncio.sleep(0))
+
+
+@pytest.mark.asyncio
+async def test_job_records_progress_result_and_failure(runner, db):
+    user_id = str(ObjectId())
+
+    async def work(progress):
+        await progress.report(1, 2)
+        await progress.report(2)
+        return {"done": True}
+
+    async def fail(progress):
+        raise ValueError("bad input")
+
+    done = await runner.submit("test", user_id, work)
+    failed = await runner.submit("test", user_id, fail)
+    await wait_for_jobs()
+
+    done = await runner.get(str(done["_id"]), user_id)
+    assert done["status"] == jobs.COMPLETED
+    assert (done["processed"], done["total"], done["result"]) == (2, 2, {"done": True})
+    failed = await runner.get(str(failed["_id"]), user_id)
+    assert (failed["status"], failed["error"]) == (jobs.FAILED, "bad input")
+    assert await runner.get(str(done["_id"]), str(ObjectId())) is None
+
+
+@pytest.mark.asyncio
+async def test_stop_interrupts_jobs_and_frees_their_slots(db):
+    user_id = str(ObjectId())
+
+    async def work(progress):
+        await asyncio.sleep(60)
+
+    running = await job_runner.submit("test", user_id, work)
+    await asyncio.sleep(0)
+    # Cancelled before its first step
+    pending = await job_runner.submit("test", user_id, work)
+    await job_runner.stop()
+
+    for job in (running, pending):
+        job = await job_runner.get(str(job["_id"]), user_id)
+        assert job["status"] == jobs.INTERRUPTED
+    assert await db.job_slots.count_documents({}) == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_all_in_batches(client, make_user, runner, monkeypatch):
+    monkeypatch.setattr(todo_router, "DELETE_BATCH_SIZE", 2)
+    monkeypatch.setattr(todo_router, "DELETE_BATCH_PAUSE_MS", 0)
+    user, other = await make_user(), await make_user()
+    await create_todos(client, user, "One", "Two", "Three")
+    await create_todos(client, other, "Kept")
+
+    response = await client.delete("/api/todos", headers=user)
+    assert response.status_code == 202
+    assert response.headers["Location"] == f"/api/jobs/{response.json()['id']}"
+    await wait_for_jobs()
+
+    job = (await client.get(response.headers["Location"], headers=user)).json()
+    assert job["status"] == "completed"
+    assert job["result"] == {"deleted": 3}
+    assert (await client.get("/api/todos", headers=user)).json() == []
+    assert len((await client.get("/api/todos", headers=other)).json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_all_drop_is_refused_when_disabled_or_shared(client, make_user, runner, monkeypatch):
+    user, other = await make_user(), await make_user()
+    await create_todos(client, user, "Mine")
+
+    response = await client.delete("/api/todos?mode=drop", headers=user)
+    assert response.status_code == 403
+
+    monkeypatch.setattr(todo_router, "DELETE_ALLOW_DROP", True)
+    await create_todos(client, other, "Theirs")
+    response = await client.delete("/api/todos?mode=drop", headers=user)
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_delete_all_drop(client, db, make_user, runner, monkeypatch):
+    monkeypatch.setattr(todo_router, "DELETE_ALLOW_DROP", True)
+    user = await make_user()
+    await create_todos(client, user, "One", "Two")
+
+    response = await client.delete("/api/todos?mode=drop", headers=user)
+    assert response.status_code == 202
+    await wait_for_jobs()
+
+    job = (await client.get(response.headers["Location"], headers=user)).json()
+    assert job["result"] == {"deleted": 2}
+    assert (await client.get("/api/todos", headers=user)).json() == []
+    assert "userId_createdAt_id" in await db.todos.index_information()
+
+
+@pytest.mark.asyncio
+async def test_drop_keeps_todos_of_other_users_created_after_the_check(client, db, make_user, monkeypatch):
+    user, other = await make_user(), await make_user()
+    await create_todos(client, user, "Mine")
+    user_id = (await client.get("/api/auth/me", headers=user)).json()["id"]
+
+    async def created_after_the_check(db, user_id):
+        await create_todos(client, other, "Theirs")
+        return False
+
+    monkeypatch.setattr(todo_router, "has_other_owners", created_after_the_check)
+    job_id = ObjectId()
+    result = await todo_router.drop_todos(user_id, JobProgress(job_id))
+
+    assert result == {"deleted": 1}
+    assert (await client.get("/api/todos", headers=user)).json() == []
+    theirs = (await client.get("/api/todos", headers=other)).json()
+    assert [todo["title"] for todo in theirs] == ["Theirs"]
+    assert f"todos_drop_{job_id}" not in await db.list_collection_names()
+
+
+@pytest.mark.asyncio
+async def test_delete_all_returns_429_when_too_many_jobs(client, make_user, runner, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_MAX_ACTIVE_PER_USER", 1)
+    user = await make_user()
+    user_id = (await client.get("/api/auth/me", headers=user)).json()["id"]
+    release = asyncio.Event()
+    await runner.submit("test", user_id, lambda progress: release.wait())
+
+    response = await client.delete("/api/todos", headers=user)
+
+    assert response.status_code == 429
+    release.set()
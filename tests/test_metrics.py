@@ -0,0 +1,42 @@
+import httpx
+import pytest
+
+from app.main import app, collect_runtime_stats
+from app.utils.auth import password_hash_metrics, user_cache
+from app.utils.metrics import (
+    MetricsMiddleware, http_request_duration, http_requests_in_flight, registry
+)
+
+
+def test_runtime_stats_include_user_cache_and_password_hashing(monkeypatch):
+    monkeypatch.setitem(password_hash_metrics, "rejected", 3)
+    monkeypatch.setitem(password_hash_metrics, "verify", {"count": 2, "total_seconds": 0.5, "max_seconds": 0.3})
+    user_cache.get("nobody@example.com")
+
+    gauges = collect_runtime_stats()
+
+    assert gauges["user_cache_misses"] >= 1
+    assert gauges["user_cache_max_size"] == user_cache.max_size
+    assert gauges["password_hash_rejected"] == 3
+    assert gauges["password_hash_verify_count"] == 2
+    assert gauges["password_hash_verify_max_seconds"] == 0.3
+    assert "password_hash_hash_total_seconds" in gauges
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_by_route_template_and_status(client, make_user):
+    headers = await make_user()
+    instrumented = MetricsMiddleware(app)
+    transport = httpx.ASGITransport(app=instrumented)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as metrics_client:
+        for _ in range(2):
+            await metrics_client.get("/api/todos", headers=headers)
+        await metrics_client.get("/api/todos/0123456789abcdef01234567", headers=headers)
+        await metrics_client.get("/no-such-path")
+
+    rendered = registry.render()
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/todos",status="200"}' in rendered
+    assert 'route="/api/todos/{todo_id}",status="404"' in rendered
+    assert 'route="unmatched",status="404"' in rendered
+    assert http_request_duration.series("GET", "/api/todos", "200")[-1] > 0
+    assert http_requests_in_flight._values[("GET",)] == 0
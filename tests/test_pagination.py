@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+
+from app.utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+@pytest_asyncio.fixture
+async def seeded(client, db, make_user):
+    """A user with seven todos, several of them created at the same instant"""
+    headers = await make_user()
+    user_id = ObjectId((await client.get("/api/auth/me", headers=headers)).json()["id"])
+    start = datetime(2025, 1, 1)
+    created = [start, start, start, start + timedelta(seconds=1), start + timedelta(seconds=1),
+               start + timedelta(seconds=2), start + timedelta(seconds=3)]
+    await db.todos.insert_many([
+        {"userId": user_id, "title": f"Todo {number}", "description": None, "completed": False,
+         "createdAt": at, "updatedAt": at}
+        for number, at in enumerate(created)
+    ])
+    todos = await db.todos.find({"userId": user_id}).to_list(length=None)
+    return headers, todos
+
+
+async def walk(client, headers, sort: str, limit: int) -> list:
+    """Follow X-Next-Cursor through every page; return the pages of IDs"""
+    pages = []
+    params = {"sort": sort, "limit": limit}
+    while True:
+        response = await client.get("/api/todos", params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append([todo["id"] for todo in response.json()])
+        if "X-Next-Cursor" not in response.headers:
+            return pages
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort, reverse", [("createdAt", False), ("-createdAt", True)])
+async def test_cursor_pages_cover_every_todo_once(client, seeded, sort, reverse):
+    headers, todos = seeded
+    expected = [str(todo["_id"]) for todo in
+                sorted(todos, key=lambda todo: (todo["createdAt"], todo["_id"]), reverse=reverse)]
+
+    pages = await walk(client, headers, sort, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [todo_id for page in pages for todo_id in page] == expected
+
+
+@pytest.mark.asyncio
+async def test_last_full_page_has_no_cursor(client, seeded):
+    headers, todos = seeded
+
+    pages = await walk(client, headers, "createdAt", limit=len(todos))
+
+    assert len(pages) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", "eyJ2IjoxLCJpIjoieCIsInMiOiJjcmVhdGVkQXQifQ"])
+async def test_invalid_cursor_is_rejected(client, seeded, cursor):
+    headers, _ = seeded
+
+    response = await client.get("/api/todos", params={"cursor": cursor}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.asyncio
+async def test_cursor_of_another_sort_order_is_rejected(client, seeded):
+    headers, todos = seeded
+    cursor = encode_cursor(todos[0], "-createdAt")
+
+    response = await client.get(
+        "/api/todos", params={"cursor": cursor, "sort": "createdAt"}, headers=headers
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor does not match the requested sort order"
+
+
+def test_cursor_round_trip():
+    todo = {"_id": ObjectId(), "createdAt": datetime(2025, 1, 1, 12, 30, 0, 123000)}
+
+    assert decode_cursor(encode_cursor(todo, "createdAt"), "createdAt") == (
+        todo["createdAt"], todo["_id"]
+    )
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(todo, "createdAt"), "-createdAt")
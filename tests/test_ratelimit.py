@@ -0,0 +1,56 @@
+import pytest
+
+from app.utils.ratelimit import RateLimitMiddleware, parse_limit, parse_rules
+
+
+def scope(*headers, client="10.0.0.1"):
+    return {
+        "type": "http",
+        "client": (client, 50000),
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+    }
+
+
+def middleware(**options) -> RateLimitMiddleware:
+    return RateLimitMiddleware(app=None, routes=[], **options)
+
+
+def test_forwarded_addresses_are_ignored_unless_trusted():
+    request = scope(("x-forwarded-for", "203.0.113.7"))
+    assert middleware(trust_forwarded=False).client_address(request) == "10.0.0.1"
+
+
+def test_spoofed_forwarded_entries_are_skipped():
+    # The client sent "1.2.3.4"; the proxy appended the address it saw
+    request = scope(("x-forwarded-for", "1.2.3.4, 203.0.113.7"))
+    assert middleware(trust_forwarded=True, trusted_hops=1).client_address(request) == "203.0.113.7"
+
+
+def test_trusted_hops_count_from_the_right_across_headers():
+    request = scope(
+        ("x-forwarded-for", "1.2.3.4, 203.0.113.7"),
+        ("x-forwarded-for", "10.1.0.5"),
+    )
+    limiter = middleware(trust_forwarded=True, trusted_hops=2)
+    assert limiter.client_address(request) == "203.0.113.7"
+    assert middleware(trust_forwarded=True, trusted_hops=5).client_address(request) == "1.2.3.4"
+
+
+def test_client_ip_header_takes_precedence():
+    request = scope(("x-forwarded-for", "1.2.3.4"), ("fly-client-ip", "198.51.100.9"))
+    limiter = middleware(trust_forwarded=True, client_ip_header="Fly-Client-IP")
+    assert limiter.client_address(request) == "198.51.100.9"
+    assert limiter.client_address(scope(("x-forwarded-for", "1.2.3.4"))) == "1.2.3.4"
+
+
+def test_parse_limit():
+    assert parse_limit("10/60") == (10, 10 / 60)
+    assert parse_limit("5") == (5, 5.0)
+
+
+@pytest.mark.parametrize("spec", ["0/60", "-1/60", "10/0"])
+def test_parse_limit_rejects_non_positive_values(spec):
+    with pytest.raises(ValueError):
+        parse_limit(spec)
+    with pytest.raises(ValueError):
+        parse_rules(f"POST /api/auth/login={spec}")
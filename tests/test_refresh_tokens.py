@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+
+from app.utils.auth import hash_refresh_token, issue_refresh_token, user_cache
+
+
+@pytest_asyncio.fixture
+async def login(client):
+    """Register a user and return a function that logs them in"""
+    username = f"refresh-{uuid4().hex[:12]}"
+    credentials = {"email": f"{username}@example.com", "password": "secret-password"}
+    await client.post("/api/auth/register", json={**credentials, "username": username})
+
+    async def create() -> dict:
+        response = await client.post("/api/auth/login", json=credentials)
+        assert response.status_code == 200
+        return response.json()
+    return create
+
+
+async def refresh(client, token: str):
+    return await client.post("/api/auth/refresh", json={"refresh_token": token})
+
+
+async def is_active(db, token: str) -> bool:
+    stored = await db.refresh_tokens.find_one({"_id": hash_refresh_token(token)})
+    return stored is not None and stored["revokedAt"] is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_the_token(client, db, login):
+    tokens = await login()
+    me = await client.get(
+        "/api/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"}
+    )
+
+    response = await refresh(client, tokens["refresh_token"])
+
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    rotated_me = await client.get(
+        "/api/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"}
+    )
+    assert rotated_me.json()["id"] == me.json()["id"]
+    assert not await is_active(db, tokens["refresh_token"])
+    assert await is_active(db, rotated["refresh_token"])
+
+
+@pytest.mark.asyncio
+async def test_reusing_a_rotated_token_revokes_the_family(client, db, login):
+    tokens = await login()
+    other_session = await login()
+    rotated = (await refresh(client, tokens["refresh_token"])).json()
+
+    response = await refresh(client, tokens["refresh_token"])
+
+    assert response.status_code == 401
+    assert not await is_active(db, rotated["refresh_token"])
+    assert (await refresh(client, rotated["refresh_token"])).status_code == 401
+    assert await is_active(db, other_session["refresh_token"])
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_rejected(client, db, login):
+    tokens = await login()
+    await db.refresh_tokens.update_one(
+        {"_id": hash_refresh_token(tokens["refresh_token"])},
+        {"$set": {"expiresAt": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+    )
+
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_unknown_token_is_rejected(client, login):
+    await login()
+    assert (await refresh(client, "not-a-token")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_one_family(client, db, login):
+    tokens = await login()
+    rotated = (await refresh(client, tokens["refresh_token"])).json()
+    other_session = await login()
+
+    response = await client.post("/api/auth/logout", json={"refresh_token": rotated["refresh_token"]})
+
+    assert response.status_code == 204
+    assert (await refresh(client, rotated["refresh_token"])).status_code == 401
+    assert await is_active(db, other_session["refresh_token"])
+
+
+@pytest.mark.asyncio
+async def test_logout_all_revokes_every_token_of_the_user(client, db, login, make_user):
+    first = await login()
+    second = await login()
+    other = await make_user()
+    other_id = (await client.get("/api/auth/me", headers=other)).json()["id"]
+    other_token = await issue_refresh_token(db, ObjectId(other_id), "other@example.com")
+
+    response = await client.post(
+        "/api/auth/logout-all", headers={"Authorization": f"Bearer {first['access_token']}"}
+    )
+
+    assert response.status_code == 204
+    for tokens in (first, second):
+        assert not await is_active(db, tokens["refresh_token"])
+        assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+    assert await is_active(db, other_token)
+
+
+@pytest.mark.asyncio
+async def test_logout_all_drops_the_cached_user(client, login):
+    tokens = await login()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    email = (await client.get("/api/auth/me", headers=headers)).json()["email"]
+    assert user_cache.get(email) is not None
+
+    await client.post("/api/auth/logout-all", headers=headers)
+
+    assert user_cache.get(email) is None
+
+
+@pytest.mark.asyncio
+async def test_registering_again_replaces_the_cached_user(client, db):
+    credentials = {"email": f"again-{uuid4().hex[:12]}@example.com", "password": "secret-password"}
+    account = {**credentials, "username": f"again-{uuid4().hex[:12]}"}
+    await client.post("/api/auth/register", json=account)
+    token = (await client.post("/api/auth/login", json=credentials)).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    old_id = (await client.get("/api/auth/me", headers=headers)).json()["id"]
+    # Removed outside the API, then registered again
+    await db.users.delete_one({"_id": ObjectId(old_id)})
+
+    response = await client.post("/api/auth/register", json=account)
+
+    assert (await client.get("/api/auth/me", headers=headers)).json()["id"] == response.json()["id"]
+    assert response.json()["id"] != old_id
@@ -0,0 +1,59 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_create_todo_is_one_write(client, make_user, commands):
+    headers = await make_user()
+    await client.get("/api/auth/me", headers=headers)
+    commands.clear()
+
+    response = await client.post("/api/todos", json={"title": "Write tests"}, headers=headers)
+
+    assert response.status_code == 201
+    assert commands.writes() == [("insert", "todos")]
+    # The response is built from the inserted document, not read back
+    assert commands.on("todos") == ["insert"]
+
+
+@pytest.mark.asyncio
+async def test_update_todo_is_one_write(client, make_user, commands):
+    headers = await make_user()
+    created = await client.post("/api/todos", json={"title": "Draft"}, headers=headers)
+    todo_id = created.json()["id"]
+    commands.clear()
+
+    response = await client.put(
+        f"/api/todos/{todo_id}", json={"title": "Final", "completed": True}, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Final"
+    assert response.json()["completed"] is True
+    assert commands.writes() == [("findAndModify", "todos")]
+    assert commands.on("todos") == ["findAndModify"]
+
+
+@pytest.mark.asyncio
+async def test_register_is_one_write(client, commands):
+    response = await client.post("/api/auth/register", json={
+        "email": "round-trips@example.com",
+        "username": "roundtrips",
+        "password": "secret1"
+    })
+
+    assert response.status_code == 201
+    # Uniqueness is left to the unique indexes, so there is no lookup first
+    assert commands.writes() == [("insert", "users")]
+    assert commands.on("users") == ["insert"]
+
+
+@pytest.mark.asyncio
+async def test_register_returns_created_at_like_me(client):
+    credentials = {"email": "same-format@example.com", "password": "secret1"}
+    registered = await client.post(
+        "/api/auth/register", json={**credentials, "username": "sameformat"}
+    )
+    token = (await client.post("/api/auth/login", json=credentials)).json()["access_token"]
+    me = await client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert registered.json()["createdAt"] == me.json()["createdAt"]
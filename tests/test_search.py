@@ -0,0 +1,83 @@
+import pytest
+
+
+async def create_todos(client, headers, *titles):
+    for title in titles:
+        response = await client.post("/api/todos", json={"title": title}, headers=headers)
+        assert response.status_code == 201
+
+
+async def prefix_search(client, headers, title: str, **params):
+    return await client.get(
+        "/api/todos/search", params={"title": title, "mode": "prefix", **params}, headers=headers
+    )
+
+
+@pytest.mark.asyncio
+async def test_prefix_search_is_anchored_and_case_sensitive(client, make_user):
+    headers = await make_user()
+    await create_todos(client, headers, "Buy milk", "Buy bread", "buy eggs", "Go buy tea")
+
+    response = await prefix_search(client, headers, "Buy")
+
+    assert response.status_code == 200
+    assert [todo["title"] for todo in response.json()] == ["Buy milk", "Buy bread"]
+
+
+@pytest.mark.asyncio
+async def test_prefix_search_escapes_regex_characters(client, make_user):
+    headers = await make_user()
+    await create_todos(client, headers, "a.b (x)", "axb (x)", "a.b [y]")
+
+    response = await prefix_search(client, headers, "a.b (")
+
+    assert [todo["title"] for todo in response.json()] == ["a.b (x)"]
+    response = await prefix_search(client, headers, "a.b")
+    assert [todo["title"] for todo in response.json()] == ["a.b (x)", "a.b [y]"]
+
+
+@pytest.mark.asyncio
+async def test_prefix_search_only_finds_own_todos(client, make_user):
+    user, other = await make_user(), await make_user()
+    await create_todos(client, user, "Shared prefix mine")
+    await create_todos(client, other, "Shared prefix theirs")
+
+    response = await prefix_search(client, user, "Shared")
+
+    assert [todo["title"] for todo in response.json()] == ["Shared prefix mine"]
+
+
+@pytest.mark.asyncio
+async def test_prefix_search_pages_with_cursor(client, make_user):
+    headers = await make_user()
+    await create_todos(client, headers, *(f"Task {number}" for number in range(5)), "Other")
+
+    titles = []
+    params = {"limit": 2, "sort": "-createdAt"}
+    while True:
+        response = await prefix_search(client, headers, "Task", **params)
+        titles += [todo["title"] for todo in response.json()]
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    assert titles == [f"Task {number}" for number in reversed(range(5))]
+
+
+@pytest.mark.asyncio
+async def test_prefix_search_rejects_an_invalid_cursor(client, make_user):
+    headers = await make_user()
+    await create_todos(client, headers, "Task")
+
+    response = await prefix_search(client, headers, "Task", cursor="not-a-cursor")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_empty_search_is_rejected(client, make_user):
+    headers = await make_user()
+
+    response = await prefix_search(client, headers, "")
+
+    assert response.status_code == 422
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.models.todo import TodoResponse
+from app.routers import todo as todo_router
+from app.routers.todo import todo_helper
+from app.utils import serialization
+from app.utils.serialization import decode_todo, dumps, encode_todo
+
+
+TODOS = [
+    {"_id": ObjectId(), "title": 'Café ✓ "quoted" \\ <b>', "description": None, "completed": True,
+     "createdAt": datetime(2025, 1, 1, 12, 30, 0, 123000), "updatedAt": datetime(2025, 1, 1)},
+    {"_id": ObjectId(), "title": "Plain", "description": "Line one\nline two\t😀", "completed": False,
+     "createdAt": datetime(2025, 2, 3, 4, 5, 6, 7000), "updatedAt": datetime(2025, 2, 3, 4, 5, 6, 7000)},
+]
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "orjson":
+        if serialization.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    return request.param
+
+
+@pytest.mark.parametrize("todo", TODOS, ids=["unicode", "multiline"])
+def test_fast_path_matches_pydantic(encoder, todo):
+    helper = todo_helper(todo)
+
+    assert dumps(helper) == TodoResponse(**helper).model_dump_json().encode()
+
+
+def test_cached_todo_round_trips(encoder):
+    for todo in TODOS:
+        assert decode_todo(encode_todo(todo)) == todo
+
+
+@pytest.mark.asyncio
+async def test_list_is_the_same_with_and_without_fast_responses(client, make_user, monkeypatch):
+    headers = await make_user()
+    for title in ("Café ✓", "Second"):
+        await client.post("/api/todos", json={"title": title, "description": "x\ny"}, headers=headers)
+
+    fast = await client.get("/api/todos", headers=headers)
+    monkeypatch.setattr(todo_router, "FAST_RESPONSES", False)
+    # A new query string keeps the page out of the todo cache
+    validated = await client.get("/api/todos?limit=99", headers=headers)
+
+    assert fast.status_code == validated.status_code == 200
+    assert fast.headers["content-type"] == validated.headers["content-type"]
+    assert fast.json() == validated.json()
@@ -0,0 +1,50 @@
+import importlib.util
+import os
+
+import pytest
+
+from app import server
+from app.server import configure_worker_environment, http_setup, loop_setup
+
+
+@pytest.fixture
+def environ(monkeypatch):
+    for name in ("WRITE_BEHIND_ENABLED", "TODO_STATS_RECONCILE_SECONDS", "LIST_ETAGS",
+                 "TODO_CACHE_ENABLED", "TODO_CACHE_BACKEND"):
+        # Set first so that values the server adds are removed afterwards
+        monkeypatch.setenv(name, "")
+        monkeypatch.delenv(name)
+    return monkeypatch
+
+
+def test_several_workers_recount_stats_often(environ):
+    configure_worker_environment(4)
+    assert os.environ["TODO_STATS_RECONCILE_SECONDS"] == "5"
+    assert os.environ["LIST_ETAGS"] == "false"
+
+
+def test_explicit_reconcile_interval_is_kept(environ):
+    environ.setenv("TODO_STATS_RECONCILE_SECONDS", "60")
+    configure_worker_environment(4)
+    assert os.environ["TODO_STATS_RECONCILE_SECONDS"] == "60"
+
+
+def test_several_workers_refuse_write_behind(environ):
+    environ.setenv("WRITE_BEHIND_ENABLED", "true")
+    with pytest.raises(SystemExit, match="WRITE_BEHIND_ENABLED"):
+        configure_worker_environment(2)
+
+
+def test_single_worker_keeps_defaults(environ):
+    environ.setenv("WRITE_BEHIND_ENABLED", "true")
+    configure_worker_environment(1)
+    assert "TODO_STATS_RECONCILE_SECONDS" not in os.environ
+
+
+def test_fast_loop_and_parser_are_optional(monkeypatch):
+    installed = importlib.util.find_spec("uvloop") is not None
+    assert loop_setup() == ("uvloop" if installed else "asyncio")
+
+    monkeypatch.setattr(server.importlib.util, "find_spec", lambda name: None)
+    assert loop_setup() == "asyncio"
+    assert http_setup() == "h11"
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.utils.stats import UserTodoStats
+
+
+def test_apply_adjusts_cached_counters():
+    stats = UserTodoStats(max_users=10, ttl=60)
+    stats.reset("user")
+
+    stats.apply("user", 2, 1)
+    stats.apply("user", 0, -1)
+
+    assert stats.for_user("user").snapshot()["total"] == 2
+    assert stats.for_user("user").snapshot()["completed"] == 0
+
+
+@pytest.mark.parametrize("total_delta,completed_delta", [(-1, 0), (0, -1), (0, 1)])
+def test_apply_out_of_range_forces_recount(total_delta, completed_delta):
+    stats = UserTodoStats(max_users=10, ttl=60)
+    stats.reset("user")
+
+    stats.apply("user", total_delta, completed_delta)
+
+    assert stats.for_user("user").initialized is False
+
+
+@pytest.mark.asyncio
+async def test_stats_never_negative_after_repeated_bulk_delete(client, make_user):
+    headers = await make_user()
+    todo_id = (await client.post("/api/todos", json={"title": "Once"}, headers=headers)).json()["id"]
+    await client.get("/api/todos/stats", headers=headers)
+
+    await client.post("/api/todos/bulk", json={"operations": [
+        {"op": "delete", "id": todo_id},
+        {"op": "delete", "id": todo_id}
+    ]}, headers=headers)
+    response = await client.get("/api/todos/stats", headers=headers)
+
+    assert response.json()["total"] == 0
+    assert response.json()["completed"] == 0
+
+
+class SlowCountDatabase:
+    """Database stub whose todo count waits until released"""
+
+    def __init__(self, groups: list):
+        self.groups = groups
+        self.counting = asyncio.Event()
+        self.release = asyncio.Event()
+        self.todos = self
+
+    async def aggregate(self, pipeline):
+        self.counting.set()
+        await self.release.wait()
+        for group in self.groups:
+            yield group
+
+
+@pytest.mark.asyncio
+async def test_recount_is_kept_when_nothing_changed_meanwhile():
+    stats = UserTodoStats(max_users=10, ttl=60)
+    db = SlowCountDatabase([{"_id": True, "count": 2}, {"_id": False, "count": 3}])
+    db.release.set()
+
+    counted = await stats.for_user("user").recount(db)
+
+    assert (counted["total"], counted["completed"]) == (5, 2)
+    assert stats.for_user("user").initialized is True
+    assert stats.for_user("user").snapshot()["total"] == 5
+
+
+@pytest.mark.asyncio
+async def test_recount_is_discarded_when_a_write_lands_meanwhile():
+    stats = UserTodoStats(max_users=10, ttl=60)
+    db = SlowCountDatabase([{"_id": False, "count": 3}])
+    recount = asyncio.create_task(stats.for_user("user").recount(db))
+    await db.counting.wait()
+
+    # A create whose insert may or may not be in the count
+    stats.apply("user", 1, 0)
+    db.release.set()
+    counted = await recount
+
+    assert counted["total"] == 3
+    assert stats.for_user("user").initialized is False
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+
+from app.utils.writebehind import ToggleQueue, toggle_queue
+
+
+@pytest_asyncio.fixture
+async def write_behind(client, monkeypatch):
+    """Enable the application's toggle queue with a short flush interval"""
+    monkeypatch.setattr(toggle_queue, "enabled", True)
+    monkeypatch.setattr(toggle_queue, "flush_interval", 0.01)
+    yield toggle_queue
+    await toggle_queue.stop()
+
+
+async def todo_in_db(db, todo_id: str) -> dict:
+    return await db.todos.find_one({"_id": ObjectId(todo_id)})
+
+
+def test_repeated_toggles_collapse_into_the_latest():
+    queue = ToggleQueue(enabled=True)
+    first, second = datetime(2024, 1, 1), datetime(2024, 1, 2)
+
+    queue.enqueue("a" * 24, "user", True, first)
+    queue.enqueue("a" * 24, "user", False, second)
+    queue.enqueue("b" * 24, "user", True, first)
+
+    assert len(queue.pending) == 2
+    assert queue.stats()["coalesced"] == 1
+    todo = {"_id": ObjectId("a" * 24), "completed": True, "updatedAt": first}
+    assert queue.overlay(todo, "user")["completed"] is False
+    assert queue.overlay(todo, "other user") is todo
+
+
+@pytest.mark.asyncio
+async def test_get_todo_shows_a_queued_toggle_and_stop_drains_it(client, db, make_user, write_behind):
+    headers = await make_user()
+    todo = (await client.post("/api/todos", json={"title": "Queued"}, headers=headers)).json()
+
+    response = await client.patch(f"/api/todos/{todo['id']}", json={"completed": True}, headers=headers)
+
+    assert response.status_code == 202
+    assert (await todo_in_db(db, todo["id"]))["completed"] is False
+    read = (await client.get(f"/api/todos/{todo['id']}", headers=headers)).json()
+    assert read["completed"] is True
+
+    await write_behind.stop()
+    assert not write_behind.pending
+    assert (await todo_in_db(db, todo["id"]))["completed"] is True
+
+
+@pytest.mark.asyncio
+async def test_missing_and_foreign_todos_are_not_queued(client, make_user, write_behind):
+    owner = await make_user()
+    other = await make_user()
+    todo = (await client.post("/api/todos", json={"title": "Owned"}, headers=owner)).json()
+
+    missing = await client.patch(f"/api/todos/{ObjectId()}", json={"completed": True}, headers=owner)
+    foreign = await client.patch(f"/api/todos/{todo['id']}", json={"completed": True}, headers=other)
+
+    assert (missing.status_code, foreign.status_code) == (404, 404)
+    assert not write_behind.pending
+
+
+@pytest.mark.asyncio
+async def test_flusher_survives_a_batch_that_cannot_be_written(client, db, make_user, write_behind):
+    headers = await make_user()
+    todo = (await client.post("/api/todos", json={"title": "Later"}, headers=headers)).json()
+    user_id = str((await todo_in_db(db, todo["id"]))["userId"])
+    await write_behind.start()
+
+    # Not an ObjectId, so building the update raises outside PyMongo
+    write_behind.enqueue("not-an-object-id", user_id, True, datetime.utcnow())
+    for _ in range(100):
+        if not write_behind.pending and not write_behind.flushing:
+            break
+        await asyncio.sleep(0.01)
+    assert write_behind.stats()["dropped"] == 1
+
+    await client.patch(f"/api/todos/{todo['id']}", json={"completed": True}, headers=headers)
+    for _ in range(100):
+        if (await todo_in_db(db, todo["id"]))["completed"]:
+            break
+        await asyncio.sleep(0.01)
+    assert (await todo_in_db(db, todo["id"]))["completed"] is True
+
+
+@pytest.mark.asyncio
+async def test_toggles_of_deleted_todos_are_counted_as_unmatched(db):
+    queue = ToggleQueue(enabled=True)
+    queue.enqueue(str(ObjectId()), str(ObjectId()), True, datetime.utcnow())
+
+    await queue.flush()
+
+    assert queue.stats()["unmatched"] == 1
+    assert not queue.pending